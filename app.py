@@ -1,54 +1,141 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 
+# pandas and plotly are imported where first needed so the page header
+# paints before the heavy imports run
 st.set_page_config(layout="wide", page_title="Ethiopia Financial Inclusion Dashboard")
 
+st.title("🇪🇹 Ethiopia Financial Inclusion Forecasting (Global Findex)")
+st.markdown(
+    "Forecasting **Access** and **Usage** metrics against national targets (National Bank of Ethiopia)."
+)
+
+
+@st.cache_resource
+def data_service():
+    # One service per worker process; the data itself lives in a shared
+    # memory-mapped cache that reloads when the pipeline publishes
+    from src.dashboard_data import DashboardData
+
+    return DashboardData("data/processed")
+
 
-@st.cache_data
 def load_data():
-    df = pd.read_csv("data/processed/inclusion_forecast.csv")
-    df["date"] = pd.to_datetime(df["date"])
-    impacts = pd.read_csv("data/processed/impact_matrix.csv")
-    return df, impacts
+    frames = data_service().get()
+    return frames["inclusion_forecast"], frames["impact_matrix"]
+
+
+@st.cache_data
+def summary_lookup(version):
+    # One dict per published version: every card below is a key lookup
+    from src.summary import lookup
+
+    return lookup(data_service().get()["summary_index"])
+
+
+def load_impact_links():
+    # Built into the dashboard cache of each published version: never stale
+    return data_service().get()["impact_links"]
+
+
+@st.cache_data
+def load_sensitivity(version):
+    # Jacobian of every linked forecast row, from one pass over the links
+    from src.sensitivity import sensitivity
+
+    return sensitivity(data_service().get()["series_forecast"], load_impact_links())
 
 
 try:
     df, impacts = load_data()
-except:
-    st.error("Run src/modeling.py first")
+except FileNotFoundError:
+    st.error("No published outputs yet. Run `python -m src run` first.")
     st.stop()
 
-st.title("🇪🇹 Ethiopia Financial Inclusion Forecasting (Global Findex)")
-st.markdown(
-    "Forecasting **Access** and **Usage** metrics against national targets (National Bank of Ethiopia)."
-)
+# KPI values are lookups in the summary index of the published version
+from src.summary import USAGE_KEY
+
+usage = None
+if "summary_index" in data_service().get():
+    usage = summary_lookup(data_service().version).get(USAGE_KEY)
+if usage is None:  # versions published before the index held the usage score
+    usage = {
+        "last_value": df["value"].iloc[-1],
+        "value_max": df["value"].max(),
+        "last_forecast": df["Forecast"].iloc[-1],
+    }
 
 # --- SIDEBAR SCENARIOS ---
 st.sidebar.header("Scenario Planning")
 growth_rate = st.sidebar.slider("Projected Digital Adoption Rate (%)", -10, 20, 0)
 target_val = st.sidebar.number_input(
-    "2026 Inclusion Target (txn volume)", value=float(df["value"].max() * 1.2)
+    "2026 Inclusion Target (txn volume)", value=float(usage["value_max"] * 1.2)
 )
 
-# Adjust forecast based on scenario
-df["Scenario_Forecast"] = df["Forecast"] * (1 + growth_rate / 100)
+# Adjust forecast based on scenario (assign: cached frames are shared, read-only)
+df = df.assign(Scenario_Forecast=df["Forecast"] * (1 + growth_rate / 100))
 
 # --- KPI ROW ---
 col1, col2, col3 = st.columns(3)
-curr_val = df["value"].iloc[-1]
-proj_val = df["Scenario_Forecast"].iloc[-1]
+curr_val = usage["last_value"]
+proj_val = usage["last_forecast"] * (1 + growth_rate / 100)
 gap = target_val - proj_val
 
 col1.metric("Current Usage Metric", f"{curr_val:,.0f}")
 col2.metric("Scenario Projection", f"{proj_val:,.0f}", delta=f"{growth_rate}%")
 col3.metric("Gap to Target", f"{gap:,.0f}", delta_color="inverse")
 
+# --- INDICATOR SNAPSHOT (precomputed summary index) ---
+if "summary_index" in data_service().get():
+    import pandas as pd
+
+    from src.summary import CONFIDENCE_COLUMNS
+
+    snapshot = summary_lookup(data_service().version)
+    totals = sorted(
+        key for key in snapshot if key[2:] == ("all", "all") and key != USAGE_KEY
+    )
+    key = st.sidebar.selectbox(
+        "Indicator snapshot", totals, format_func=lambda k: f"{k[1]} ({k[0]})"
+    )
+    row = snapshot[key]
+    col1, col2, col3 = st.columns(3)
+    cagr = row["cagr"]
+    col1.metric(
+        f"{row['indicator_code']} (latest)",
+        f"{row['last_value']:,.2f}",
+        delta=None if pd.isna(cagr) else f"{cagr:.1%} CAGR",
+    )
+    col2.metric(
+        "Observations",
+        row["n_obs"],
+        delta=f"{row['first_date']:%Y} - {row['last_date']:%Y}",
+        delta_color="off",
+    )
+    col3.metric(
+        "Latest linked event",
+        row["latest_event_name"] if isinstance(row["latest_event_name"], str) else "-",
+        delta=(
+            None
+            if pd.isna(row["latest_event_date"])
+            else f"{row['latest_event_date']:%b %Y}"
+        ),
+        delta_color="off",
+    )
+    with st.expander("Data quality: confidence mix"):
+        st.write({c.removeprefix("n_"): row[c] for c in CONFIDENCE_COLUMNS})
+        if "anomaly" in df:
+            flagged = df.loc[df["anomaly"].astype(bool), ["date", "value"]]
+            st.caption(f"Usage score anomalies left out of the fit: {len(flagged)}")
+            st.dataframe(flagged, hide_index=True)
+
 # --- CHARTS ---
-tab1, tab2 = st.tabs(["📈 Inclusion Forecast", "🔥 Impact Heatmap"])
+tab1, tab2, tab3 = st.tabs(
+    ["📈 Inclusion Forecast", "🔥 Impact Heatmap", "🎲 Event Scenarios"]
+)
 
 with tab1:
+    import plotly.graph_objects as go
+
     st.subheader("Financial Usage Forecast with Confidence Intervals")
     fig = go.Figure()
 
@@ -58,6 +145,18 @@ with tab1:
             x=df["date"], y=df["value"], name="Actual Usage", line=dict(color="blue")
         )
     )
+    # Reports flagged by a robust run (`--model huber`) and left out of its fit
+    if "anomaly" in df:
+        flagged = df[df["anomaly"].astype(bool)]
+        fig.add_trace(
+            go.Scatter(
+                x=flagged["date"],
+                y=flagged["value"],
+                mode="markers",
+                name=f"Anomalies ({len(flagged)})",
+                marker=dict(color="red", symbol="x", size=9),
+            )
+        )
 
     # Forecast
     fig.add_trace(
@@ -103,16 +202,124 @@ with tab1:
     st.plotly_chart(fig, use_container_width=True)
 
 with tab2:
+    import plotly.express as px
+
+    from src.sensitivity import sensitivity_matrix
+
     st.subheader("Event-Indicator Impact Matrix")
-    # Heatmap of coefficients
-    fig_heat = px.density_heatmap(
-        impacts,
-        x="Feature",
-        y="Coefficient",
-        z="Coefficient",
-        color_continuous_scale="Viridis",
-    )
-    st.plotly_chart(fig_heat)
-    st.markdown(
-        "**Insight:** Holidays negatively impact digital usage, suggesting reliance on physical branches."
+    table = load_sensitivity(data_service().version)
+    measure = st.radio(
+        "Sensitivity at the forecast horizon",
+        ["elasticity", "d_estimate", "d_lag"],
+        format_func={
+            "elasticity": "Elasticity (% level per % effect)",
+            "d_estimate": "Level per effect point",
+            "d_lag": "Level per month of lag",
+        }.get,
+        horizontal=True,
+    )
+    matrix = sensitivity_matrix(table, measure)
+    fig_heat = px.imshow(
+        matrix,
+        color_continuous_scale="RdBu",
+        color_continuous_midpoint=0,
+        aspect="auto",
+        labels=dict(x="Indicator", y="Event", color=measure),
+    )
+    st.plotly_chart(fig_heat, use_container_width=True)
+    if measure == "elasticity" and matrix.size:
+        event, indicator = matrix.abs().stack().idxmax()
+        st.markdown(
+            f"**Insight:** {event} moves {indicator} the most: a 1% change in its "
+            f"effect estimate shifts the forecast by {matrix.loc[event, indicator]:.2f}%."
+        )
+    with st.expander("Usage score regression coefficients"):
+        st.dataframe(impacts)
+
+with tab3:
+    import plotly.graph_objects as go
+
+    from src.scenarios import simulate
+
+    st.subheader("Event Scenarios (Monte Carlo over impact uncertainty)")
+    links = load_impact_links()
+    series = data_service().get()["series_forecast"]
+    series = series[series["indicator_code"].isin(links["indicator_code"])]
+    c1, c2, c3 = st.columns(3)
+    indicator = c1.selectbox("Indicator", sorted(series["indicator_code"].unique()))
+    event = c2.selectbox("Event", sorted(links["event_code"].unique()))
+    shift = c3.slider("Shift event (months, negative = earlier)", -24, 24, 0)
+
+    baseline = series[series["indicator_code"] == indicator]
+    fan = simulate(baseline, links, shifts={event: shift})
+    fig_fan = go.Figure()
+    fig_fan.add_trace(
+        go.Scatter(
+            x=fan["date"],
+            y=fan["p95"],
+            mode="lines",
+            line=dict(width=0),
+            showlegend=False,
+        )
+    )
+    fig_fan.add_trace(
+        go.Scatter(
+            x=fan["date"],
+            y=fan["p5"],
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor="rgba(255, 165, 0, 0.2)",
+            name="5-95%",
+        )
+    )
+    fig_fan.add_trace(
+        go.Scatter(
+            x=fan["date"],
+            y=fan["p75"],
+            mode="lines",
+            line=dict(width=0),
+            showlegend=False,
+        )
+    )
+    fig_fan.add_trace(
+        go.Scatter(
+            x=fan["date"],
+            y=fan["p25"],
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor="rgba(255, 165, 0, 0.4)",
+            name="25-75%",
+        )
+    )
+    fig_fan.add_trace(
+        go.Scatter(
+            x=fan["date"],
+            y=fan["p50"],
+            name="Median scenario",
+            line=dict(color="orange"),
+        )
+    )
+    fig_fan.add_trace(
+        go.Scatter(
+            x=fan["date"],
+            y=fan["Forecast"],
+            name="Baseline",
+            line=dict(color="blue", dash="dash"),
+        )
+    )
+    st.plotly_chart(fig_fan, use_container_width=True)
+    st.dataframe(
+        links[links["indicator_code"] == indicator][
+            [
+                "event_name",
+                "event_date",
+                "impact_direction",
+                "impact_magnitude",
+                "mean",
+                "lag_months",
+                "evidence_basis",
+            ]
+        ]
     )
@@ -1,21 +1,27 @@
 import sys
 import os
+from functools import lru_cache
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import matplotlib.dates as mdates
 from src.data import load_data, get_observations, get_enriched_data, get_events
 
-# Setup
-os.makedirs("reports/figures", exist_ok=True)
-sns.set_theme(style="whitegrid")
+
+@lru_cache(maxsize=None)
+def _plotting():
+    """Import and set up matplotlib/seaborn on first use, only when plotting."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    os.makedirs("reports/figures", exist_ok=True)
+    sns.set_theme(style="whitegrid")
+    return plt, sns
 
 
 def plot_data_quality_summary(df):
     """Task 1: Explicit Data Quality & Coverage Analysis"""
+    plt, sns = _plotting()
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     sns.countplot(data=df, x="record_type", ax=axes[0], palette="viridis")
     axes[0].set_title("Dataset Composition by Record Type")
@@ -35,6 +41,9 @@ def plot_data_quality_summary(df):
 
 def plot_event_timeline_dedicated(df):
     """Task 2: Dedicated Event Timeline Visualization"""
+    import matplotlib.dates as mdates
+
+    plt, sns = _plotting()
     events = (
         get_events(df)
         .copy()
@@ -85,6 +94,7 @@ def plot_registered_vs_active(df):
     mpesa_act = df[df["indicator_code"] == "USG_MPESA_ACTIVE"].copy()
     if mpesa_reg.empty or mpesa_act.empty:
         return
+    plt, sns = _plotting()
     mpesa_reg["Label"] = "Registered"
     mpesa_act["Label"] = "90-Day Active"
     data = pd.concat([mpesa_reg, mpesa_act])
@@ -105,6 +115,7 @@ def plot_infrastructure_vs_usage(df):
     usage = df[df["indicator_code"] == "USG_P2P_COUNT"].sort_values("Year")
     if infra.empty or usage.empty:
         return
+    plt, sns = _plotting()
     fig, ax1 = plt.subplots(figsize=(10, 6))
     color = "tab:red"
     ax1.set_xlabel("Year")
@@ -133,6 +144,7 @@ def plot_affordability_shock(df):
     )
     if affordability.empty:
         return
+    plt, sns = _plotting()
     plt.figure(figsize=(10, 5))
     sns.lineplot(
         data=affordability,
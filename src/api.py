@@ -0,0 +1,318 @@
+"""
+Asyncio HTTP service exposing the published pipeline outputs.
+
+Endpoints (GET, JSON):
+    /health                         liveness
+    /version                        currently served output version
+    /forecast                       aggregate usage forecast
+    /forecast?indicator=..&country=..  per-series forecasts
+    /quantiles?indicator=..&country=..&q=0.05,0.95
+                                    per-series forecast quantiles
+    /impacts?indicator=..&country=..&event=..
+                                    event effects estimated from the data
+    /impacts?view=sensitivity&indicator=..
+                                    sensitivity of the linked forecasts to
+                                    each impact link (src/sensitivity.py)
+    /impacts?view=regression        usage score regression coefficients
+    /scenario?indicator=..&country=..&shift=EVT_CODE:-6&paths=10000
+                                    Monte Carlo event scenario fan of the
+                                    per-series forecasts (src/scenarios.py)
+    /scenario?growth_rate=5         aggregate forecast under a uniform growth
+                                    rate (the usage score has no linked events)
+
+Tables come from the memory-mapped DashboardData cache of the current
+published version, loaded by a small bounded reader pool. Identical
+concurrent queries are coalesced into one computation and responses are
+cached per (version, query), so repeat queries are served from memory.
+Quantiles are not held in memory: a miss reads the compact Parquet grid,
+touching only the requested columns and matching row groups. Scenario
+and sensitivity queries are computed on the reader pool.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from src.dashboard_data import DashboardData
+from src.publish import current_version, open_version
+from src.quantiles import read_quantiles
+from src.scenarios import simulate
+from src.sensitivity import sensitivity
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_RESPONSES = 4096
+MAX_PATHS = 100_000
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+    503: "Unavailable",
+}
+# Query parameters filtering table rows, by column
+FILTERS = {"indicator": "indicator_code", "country": "country", "event": "event_code"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ForecastService:
+    """Query handlers plus the coalescing, caching and artifact pool behind them."""
+
+    def __init__(self, output_dir="data/processed", readers=4):
+        self.data = DashboardData(output_dir)
+        self.output_dir = self.data.output_dir
+        self.readers = ThreadPoolExecutor(max_workers=readers)
+        self.routes = {
+            "/health": self.health,
+            "/version": self.version,
+            "/forecast": self.forecast,
+            "/quantiles": self.quantiles,
+            "/impacts": self.impacts,
+            "/scenario": self.scenario,
+        }
+        self._load_lock = asyncio.Lock()
+        self._frames, self._version = None, None
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self.computations = 0  # handler executions, i.e. cache/coalesce misses
+
+    async def frames(self) -> dict:
+        """Tables of the current version; reloads once per published version."""
+        version = current_version(self.output_dir)
+        if version != self._version:
+            async with self._load_lock:
+                if version != self._version:
+                    loop = asyncio.get_running_loop()
+                    self._frames = await loop.run_in_executor(
+                        self.readers, self.data.get
+                    )
+                    self._version = self.data.version
+        return self._frames
+
+    async def respond(self, path: str, query: dict) -> bytes:
+        """JSON body for a request, via the response cache and coalescing."""
+        handler = self.routes.get(path)
+        if handler is None:
+            raise HTTPError(404, f"Unknown endpoint {path}")
+        if path == "/health":
+            return await handler(query)
+
+        key = (current_version(self.output_dir), path, tuple(sorted(query.items())))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.computations += 1
+            body = await handler(query)
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(body)
+        self._cache[key] = body
+        if len(self._cache) > MAX_CACHED_RESPONSES:
+            self._cache.popitem(last=False)
+        return body
+
+    # --- handlers ---
+
+    async def health(self, query):
+        return _json({"status": "ok"})
+
+    async def version(self, query):
+        await self.frames()
+        return _json({"version": self._version})
+
+    async def forecast(self, query):
+        frames = await self.frames()
+        if "indicator" not in query and "country" not in query:
+            return _records(frames["inclusion_forecast"])
+        return _records(_filter(frames["series_forecast"], query))
+
+    async def quantiles(self, query):
+        if "indicator" not in query:
+            raise HTTPError(400, "indicator is required")
+        keys = {"indicator_code": query["indicator"]}
+        if "country" in query:
+            keys["country"] = query["country"]
+        try:
+            levels = [float(q) for q in query["q"].split(",")] if "q" in query else None
+        except ValueError:
+            raise HTTPError(400, "q must be comma-separated numbers")
+        path = open_version(self.output_dir).path / "series_quantiles.parquet"
+        if not path.exists():
+            raise HTTPError(404, "No quantiles in the current version")
+        loop = asyncio.get_running_loop()
+        try:
+            table = await loop.run_in_executor(
+                self.readers, lambda: read_quantiles(path, levels, **keys)
+            )
+        except ValueError as exc:
+            raise HTTPError(400, str(exc))
+        return _records(table)
+
+    async def impacts(self, query):
+        frames = await self.frames()
+        view = query.get("view", "estimates")
+        if view == "regression":
+            return _records(frames["impact_matrix"])
+        if view == "estimates":
+            if "impact_estimates" not in frames:
+                raise HTTPError(404, "No impact estimates in the current version")
+            return _records(_filter(frames["impact_estimates"], query))
+        if view != "sensitivity":
+            raise HTTPError(400, "view must be estimates, sensitivity or regression")
+        baseline = _filter(frames["series_forecast"], query, ("indicator", "country"))
+        loop = asyncio.get_running_loop()
+        table = await loop.run_in_executor(
+            self.readers, sensitivity, baseline, frames["impact_links"]
+        )
+        return _records(_filter(table, query))
+
+    async def scenario(self, query):
+        if "indicator" in query:
+            return await self.event_scenario(query)
+        try:
+            growth_rate = float(query.get("growth_rate", 0))
+        except ValueError:
+            raise HTTPError(400, "growth_rate must be a number")
+        forecast = (await self.frames())["inclusion_forecast"]
+        scenario = forecast[["date", "value", "Forecast"]].assign(
+            Scenario_Forecast=forecast["Forecast"] * (1 + growth_rate / 100)
+        )
+        return _records(scenario)
+
+    async def event_scenario(self, query):
+        try:
+            n_paths = int(query.get("paths", 10_000))
+            shifts = _shifts(query["shift"]) if "shift" in query else {}
+        except ValueError:
+            raise HTTPError(400, "paths must be an integer, shift EVENT:months[,...]")
+        if not 1 <= n_paths <= MAX_PATHS:
+            raise HTTPError(400, f"paths must be between 1 and {MAX_PATHS}")
+        frames = await self.frames()
+        baseline = _filter(frames["series_forecast"], query, ("indicator", "country"))
+        if baseline.empty:
+            raise HTTPError(404, "No forecast for this indicator")
+        loop = asyncio.get_running_loop()
+        fan = await loop.run_in_executor(
+            self.readers,
+            lambda: simulate(baseline, frames["impact_links"], n_paths, shifts),
+        )
+        return _records(fan)
+
+    # --- HTTP ---
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection (HTTP/1.1 keep-alive)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                method, target, protocol = request_line.decode("latin-1").split()
+                status, body = await self._dispatch(method, target)
+                keep_alive = protocol == "HTTP/1.1" and (
+                    headers.get("connection", "").lower() != "close"
+                )
+                writer.write(
+                    f"{protocol} {status} {REASONS.get(status, '')}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target):
+        if method != "GET":
+            return 400, _json({"error": "only GET is supported"})
+        url = urlsplit(target)
+        try:
+            return 200, await self.respond(url.path, dict(parse_qsl(url.query)))
+        except HTTPError as exc:
+            return exc.status, _json({"error": str(exc)})
+        except FileNotFoundError as exc:
+            return 503, _json({"error": str(exc)})
+        except Exception as exc:
+            # A failing handler still answers, and the connection stays usable
+            logger.exception("Error serving %s", target)
+            return 500, _json({"error": f"{type(exc).__name__}: {exc}"})
+
+
+def _filter(table, query: dict, params=tuple(FILTERS)):
+    """Rows of `table` matching the FILTERS `params` present in the query."""
+    mask = pd.Series(True, index=table.index)
+    for param in params:
+        column = FILTERS[param]
+        if param in query and column in table:
+            mask &= table[column] == query[param]
+    return table[mask]
+
+
+def _shifts(value: str) -> dict:
+    """{event code: months} from "EVT_A:-6,EVT_B:3"."""
+    shifts = {}
+    for item in value.split(","):
+        event, sep, months = item.rpartition(":")
+        if not sep or not event:
+            raise ValueError(f"Bad shift '{item}'")
+        shifts[event] = float(months)
+    return shifts
+
+
+def _json(payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def _records(frame) -> bytes:
+    return frame.to_json(orient="records", date_format="iso").encode()
+
+
+async def start_server(service: ForecastService, host="127.0.0.1", port=8000):
+    """Start serving; returns the asyncio Server (port 0 picks a free port)."""
+    return await asyncio.start_server(service.handle_connection, host, port)
+
+
+def serve(output_dir="data/processed", host="127.0.0.1", port=8000, readers=4):
+    """Run the service until interrupted."""
+
+    async def main():
+        service = ForecastService(output_dir, readers=readers)
+        server = await start_server(service, host, port)
+        print(f"Serving {service.output_dir} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
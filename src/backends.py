@@ -0,0 +1,363 @@
+import copy
+import multiprocessing
+import os
+import warnings
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Registry of forecasting backends, keyed by the name used in configs/CLI
+MODEL_REGISTRY = {}
+
+
+def register_model(name):
+    """Class decorator adding a backend to MODEL_REGISTRY under `name`."""
+
+    def decorator(cls):
+        cls.name = name
+        MODEL_REGISTRY[name] = cls
+        return cls
+
+    return decorator
+
+
+def get_model(name, **params):
+    """Instantiate a registered backend by name."""
+    if name not in MODEL_REGISTRY:
+        raise ValueError(
+            f"Unknown model '{name}'. Available: {', '.join(sorted(MODEL_REGISTRY))}"
+        )
+    return MODEL_REGISTRY[name](**params)
+
+
+class ModelBackend(ABC):
+    """
+    Common fit/predict/interval interface shared by all backends.
+
+    Rows of X passed to `predict` are aligned with the training rows, followed
+    by any future rows to forecast. Regression backends use the features
+    directly; time-series backends only use the row count.
+    """
+
+    name = None
+    cost = "cheap"  # "cheap" or "expensive", used by the selection stage
+    min_obs = 2
+    # Feature-store features (see src/features.py) added to the trend design
+    # of per-series fits; date-based only, as forecast rows have no values
+    features = ()
+
+    def __init__(self, **params):
+        self.params = params
+        self.state = {}
+        self.resid_std_ = 0.0
+
+    @abstractmethod
+    def fit(self, X, y, warm_start=None):
+        """Fit on (X, y), optionally resuming from a previous `state`."""
+
+    @abstractmethod
+    def predict(self, X):
+        """Predictions for the rows of X."""
+
+    def interval(self, X, z=1.96):
+        """Symmetric band of `z` residual standard deviations (95% by default)."""
+        predictions = self.predict(X)
+        margin = z * self.resid_std_
+        return predictions - margin, predictions + margin
+
+    def _check_length(self, y):
+        if len(y) < self.min_obs:
+            raise ValueError(
+                f"{self.name} needs at least {self.min_obs} observations, got {len(y)}"
+            )
+
+    def _set_residuals(self, y, fitted):
+        residuals = np.asarray(y, dtype=float) - np.asarray(fitted, dtype=float)
+        self.resid_std_ = float(np.std(residuals))
+        self.state["resid_std"] = self.resid_std_
+
+
+@register_model("naive")
+class NaiveBackend(ModelBackend):
+    """Last observed value carried forward, the fallback for very short series."""
+
+    min_obs = 1
+
+    def fit(self, X, y, warm_start=None):
+        self._check_length(y)
+        y = np.asarray(y, dtype=float)
+        self.state = {"last": float(y[-1])}
+        # Fitted value of each row is the previous observation
+        self._set_residuals(y, np.concatenate([y[:1], y[:-1]]))
+        return self
+
+    def predict(self, X):
+        return np.full(len(X), self.state["last"])
+
+
+@register_model("linear")
+class LinearBackend(ModelBackend):
+    """Ordinary least squares, the original InclusionModeler model."""
+
+    def fit(self, X, y, warm_start=None):
+        # Closed-form fit, nothing to warm-start from
+        from sklearn.linear_model import LinearRegression
+
+        self._check_length(y)
+        self.model = LinearRegression(**self.params).fit(X, y)
+        self.state = {
+            "coef": np.asarray(self.model.coef_, dtype=float),
+            "intercept": float(self.model.intercept_),
+        }
+        self._set_residuals(y, self.model.predict(X))
+        return self
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+@register_model("ridge")
+class RidgeBackend(ModelBackend):
+    """
+    Standardised ridge regression. The penalty is chosen by efficient
+    leave-one-out CV; a warm start reuses the previously chosen alpha.
+    """
+
+    def __init__(self, alphas=(0.01, 0.1, 1.0, 10.0, 100.0), **params):
+        super().__init__(**params)
+        self.alphas = alphas
+
+    def fit(self, X, y, warm_start=None):
+        from sklearn.linear_model import Ridge, RidgeCV
+        from sklearn.preprocessing import StandardScaler
+
+        self._check_length(y)
+        self.scaler = StandardScaler().fit(X)
+        Xs = self.scaler.transform(X)
+        if warm_start and "alpha" in warm_start:
+            self.model = Ridge(alpha=warm_start["alpha"], **self.params).fit(Xs, y)
+            alpha = warm_start["alpha"]
+        else:
+            self.model = RidgeCV(alphas=self.alphas, **self.params).fit(Xs, y)
+            alpha = float(self.model.alpha_)
+        self.state = {
+            "alpha": alpha,
+            "coef": np.asarray(self.model.coef_, dtype=float),
+            "intercept": float(self.model.intercept_),
+            "scaler_mean": self.scaler.mean_,
+            "scaler_scale": self.scaler.scale_,
+        }
+        self._set_residuals(y, self.model.predict(Xs))
+        return self
+
+    def predict(self, X):
+        return self.model.predict(self.scaler.transform(X))
+
+
+@register_model("gbm")
+class GradientBoostingBackend(ModelBackend):
+    """
+    Gradient-boosted trees. A warm start continues boosting from a copy of
+    the previous ensemble, adding `warm_trees` trees instead of refitting all
+    of them; once that would exceed `max_trees` (2 * n_estimators by
+    default) the ensemble is refitted from scratch.
+    """
+
+    cost = "expensive"
+    min_obs = 3
+    features = ("days_since_event", "days_to_event")
+
+    def __init__(self, n_estimators=100, warm_trees=10, max_trees=None, **params):
+        super().__init__(**params)
+        self.n_estimators = n_estimators
+        self.warm_trees = warm_trees
+        self.max_trees = max_trees or 2 * n_estimators
+
+    def fit(self, X, y, warm_start=None):
+        from sklearn.ensemble import GradientBoostingRegressor
+
+        self._check_length(y)
+        estimator = warm_start.get("estimator") if warm_start else None
+        if (
+            estimator is not None
+            and estimator.n_features_in_ == np.shape(X)[1]
+            and estimator.n_estimators + self.warm_trees <= self.max_trees
+        ):
+            # The previous state may be shared (e.g. a store entry): copy it
+            estimator = copy.deepcopy(estimator)
+            estimator.set_params(
+                warm_start=True, n_estimators=estimator.n_estimators + self.warm_trees
+            )
+        else:
+            # Fixed seed: with several features, tied splits are broken at
+            # random, and reruns must reproduce the published forecasts
+            estimator = GradientBoostingRegressor(
+                n_estimators=self.n_estimators, **{"random_state": 0, **self.params}
+            )
+        self.model = estimator.fit(X, y)
+        self.state = {"estimator": self.model}
+        self._set_residuals(y, self.model.predict(X))
+        return self
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+class _RobustBackend(ModelBackend):
+    """
+    Linear model fitted by IRLS (see src/robust.py). The residual scale is
+    the MAD-based robust scale, so outliers neither pull the fit nor widen
+    the interval. A warm start resumes IRLS from the previous coefficients.
+    """
+
+    loss = None
+    min_obs = 3
+
+    def fit(self, X, y, warm_start=None):
+        from src.robust import irls
+
+        self._check_length(y)
+        X = np.asarray(X, dtype=float)
+        design = np.column_stack([np.ones(len(X)), X])
+        start = None
+        if warm_start and len(warm_start.get("coef", ())) == X.shape[1]:
+            start = np.r_[warm_start["intercept"], warm_start["coef"]][None]
+        beta, scale, _ = irls(
+            design[None],
+            np.asarray(y, dtype=float)[None],
+            loss=self.loss,
+            start=start,
+            **self.params,
+        )
+        self.state = {"coef": beta[0, 1:], "intercept": float(beta[0, 0])}
+        self.resid_std_ = float(scale[0])
+        self.state["resid_std"] = self.resid_std_
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.state["coef"] + self.state["intercept"]
+
+
+@register_model("huber")
+class HuberBackend(_RobustBackend):
+    """Huber loss: least squares near the fit, absolute loss for outliers."""
+
+    loss = "huber"
+
+
+@register_model("quantile")
+class QuantileBackend(_RobustBackend):
+    """Quantile (by default median) regression, `quantile` in (0, 1)."""
+
+    loss = "quantile"
+
+
+class _StatsmodelsBackend(ModelBackend):
+    """Shared logic for univariate statsmodels backends."""
+
+    cost = "expensive"
+
+    @abstractmethod
+    def _build(self, y):
+        """The unfitted statsmodels model of series y."""
+
+    def fit(self, X, y, warm_start=None):
+        self._check_length(y)
+        y = np.asarray(y, dtype=float)
+        start_params = warm_start.get("params") if warm_start else None
+        model = self._build(y)
+        with warnings.catch_warnings():
+            # Short series routinely trip convergence warnings; the holdout
+            # score is what decides whether the fit is usable
+            warnings.simplefilter("ignore")
+            if start_params is not None and len(start_params) != len(
+                model.start_params
+            ):
+                start_params = None
+            self.results = self._fit(model, start_params)
+        self.n_train_ = len(y)
+        self.state = {"params": np.asarray(self.results.params, dtype=float)}
+        self._set_residuals(y, self.results.fittedvalues)
+        return self
+
+    def _fit(self, model, start_params):
+        return model.fit(start_params=start_params)
+
+    def predict(self, X):
+        n_rows = len(X)
+        fitted = np.asarray(self.results.fittedvalues, dtype=float)[:n_rows]
+        horizon = n_rows - self.n_train_
+        if horizon <= 0:
+            return fitted
+        return np.concatenate([fitted, np.asarray(self.results.forecast(horizon))])
+
+
+@register_model("ets")
+class ETSBackend(_StatsmodelsBackend):
+    """Additive-error exponential smoothing with an additive trend."""
+
+    min_obs = 4
+
+    def _build(self, y):
+        from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+        return ETSModel(y, error="add", trend="add", **self.params)
+
+    def _fit(self, model, start_params):
+        return model.fit(start_params=start_params, disp=False)
+
+
+@register_model("arima")
+class ARIMABackend(_StatsmodelsBackend):
+    """ARIMA(p, d, q), (1, 1, 0) by default."""
+
+    min_obs = 5
+
+    def __init__(self, order=(1, 1, 0), **params):
+        super().__init__(**params)
+        self.order = order
+
+    def _build(self, y):
+        from statsmodels.tsa.arima.model import ARIMA
+
+        return ARIMA(y, order=self.order, **self.params)
+
+
+def process_pool(n_jobs):
+    """
+    Process pool for parallel fits. Workers are spawned rather than forked so
+    pools are safe to create from pipeline stages running in threads.
+    """
+    return ProcessPoolExecutor(
+        max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _fit_task(task):
+    key, name, params, X, y, warm_start = task
+    return key, get_model(name, **params).fit(X, y, warm_start=warm_start)
+
+
+def fit_many(series, model="linear", n_jobs=1, warm_starts=None, **params):
+    """
+    Fit one backend per series.
+
+    `series` maps a series key to its (X, y) pair and `warm_starts` maps keys
+    to the `state` of a previous fit. With n_jobs > 1 (or -1 for all cores)
+    series are fitted in parallel worker processes.
+    Returns {key: fitted backend}.
+    """
+    warm_starts = warm_starts or {}
+    tasks = [
+        (key, model, params, X, y, warm_starts.get(key))
+        for key, (X, y) in series.items()
+    ]
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1 or len(tasks) <= 1:
+        return dict(map(_fit_task, tasks))
+
+    chunksize = max(1, len(tasks) // (n_jobs * 4))
+    with process_pool(n_jobs) as pool:
+        return dict(pool.map(_fit_task, tasks, chunksize=chunksize))
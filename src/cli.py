@@ -0,0 +1,300 @@
+"""
+Command-line entry point: `python -m src <command>`.
+
+Commands:
+    run        Run the modeling pipeline
+    merge      Merge outputs of pipeline runs sharded by indicator set
+    partition  Convert unified CSVs to the partitioned multi-country dataset
+    serve      Serve forecasts, impacts and scenarios over HTTP
+    ingest     Append new observations and update the published outputs
+    dag        Run the project's stages, skipping those whose inputs are unchanged
+    sources    Fetch and cache the source documents behind the records
+
+Heavy modules are imported inside the command handlers so `--help` stays fast.
+"""
+
+import argparse
+import logging
+
+FORMATS = ("csv", "parquet", "arrow")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src", description="Ethiopia financial inclusion pipeline"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="log stage metrics to stderr"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the modeling pipeline")
+    run.add_argument(
+        "--input",
+        default="data/raw/ethiopia_fi_unified_data.csv",
+        help="unified CSV or partitioned dataset directory (default: %(default)s)",
+    )
+    run.add_argument(
+        "--output-dir",
+        default="data/processed",
+        help="directory for outputs (default: %(default)s)",
+    )
+    run.add_argument(
+        "--country",
+        action="append",
+        dest="countries",
+        help="only this country code (repeatable)",
+    )
+    run.add_argument(
+        "--indicator",
+        action="append",
+        dest="indicators",
+        help="only this indicator_code (repeatable), e.g. to shard the job",
+    )
+    run.add_argument(
+        "--workers", type=int, default=1, help="parallel workers (-1 for all cores)"
+    )
+    run.add_argument("--format", choices=FORMATS, default="csv", dest="fmt")
+    run.add_argument(
+        "--budget",
+        type=float,
+        default=60.0,
+        help="model selection time budget in seconds (default: %(default)s)",
+    )
+    run.add_argument(
+        "--engine",
+        choices=("pandas", "auto", "duckdb", "arrow"),
+        default="pandas",
+        help="aggregate the usage score in a query engine over the input files "
+        "(default: %(default)s)",
+    )
+    run.add_argument(
+        "--model",
+        choices=("linear", "huber", "quantile"),
+        default="linear",
+        help="backend of the aggregate forecast; huber/quantile fit robustly "
+        "and flag anomalies (default: %(default)s)",
+    )
+    run.add_argument("--metrics-log", help="append stage metrics (JSON lines) here")
+    run.add_argument("--prometheus", help="write stage metrics as a textfile here")
+    run.add_argument("--profile-dir", help="write a cProfile dump per stage here")
+    run.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="record per-stage tracemalloc peaks (runs stages one at a time)",
+    )
+
+    merge = commands.add_parser("merge", help="merge sharded pipeline outputs")
+    merge.add_argument("output_dir", help="directory for the merged outputs")
+    merge.add_argument(
+        "shards", nargs="+", help="output directories of the shards (current versions)"
+    )
+    merge.add_argument("--format", choices=FORMATS, default="csv", dest="fmt")
+
+    partition = commands.add_parser(
+        "partition", help="write unified CSVs as a country/pillar/year dataset"
+    )
+    partition.add_argument("inputs", nargs="+", help="unified CSV files")
+    partition.add_argument(
+        "--output", default="data/partitioned", help="dataset directory"
+    )
+    partition.add_argument(
+        "--country", help="country code for inputs without a country column"
+    )
+
+    serve = commands.add_parser("serve", help="serve published outputs over HTTP")
+    serve.add_argument("--output-dir", default="data/processed")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--readers", type=int, default=4, help="artifact reader pool")
+
+    ingest = commands.add_parser(
+        "ingest", help="append observations and update outputs incrementally"
+    )
+    ingest.add_argument(
+        "files",
+        nargs="*",
+        help="JSON-lines or CSV record files; '-' or none reads JSON lines from stdin",
+    )
+    ingest.add_argument(
+        "--input",
+        default="data/raw/ethiopia_fi_unified_data.csv",
+        help="unified CSV or partitioned dataset to append to (default: %(default)s)",
+    )
+    ingest.add_argument("--output-dir", default="data/processed")
+    ingest.add_argument("--watch", metavar="INBOX", help="poll this drop directory")
+    ingest.add_argument(
+        "--interval", type=float, default=5.0, help="inbox poll interval in seconds"
+    )
+    ingest.add_argument(
+        "--batch-size", type=int, default=500, help="stdin records per micro-batch"
+    )
+    ingest.add_argument(
+        "--budget",
+        type=float,
+        default=10.0,
+        help="model selection budget per micro-batch in seconds",
+    )
+
+    dag = commands.add_parser(
+        "dag", help="run data, EDA, modeling and dashboard stages as needed"
+    )
+    dag.add_argument("targets", nargs="*", help="stages to bring up to date (all)")
+    dag.add_argument("--jobs", type=int, default=2, help="stages run in parallel")
+    dag.add_argument("--force", action="store_true", help="ignore the content hashes")
+    dag.add_argument("--list", action="store_true", help="list stages and exit")
+
+    sources = commands.add_parser(
+        "sources", help="fetch and cache the records' source_url documents"
+    )
+    sources.add_argument(
+        "--input",
+        default="data/raw/ethiopia_fi_unified_data.csv",
+        help="unified CSV or partitioned dataset (default: %(default)s)",
+    )
+    sources.add_argument("--cache-dir", default="data/sources")
+    sources.add_argument(
+        "--ttl-days",
+        type=float,
+        default=7.0,
+        help="refetch cached documents older than this (default: %(default)s)",
+    )
+    sources.add_argument(
+        "--connections", type=int, default=16, help="concurrent HTTP connections"
+    )
+    sources.add_argument(
+        "--refresh", action="store_true", help="refetch everything, ignoring the TTL"
+    )
+    return parser
+
+
+def cmd_run(args):
+    from src.modeling import run_pipeline
+    from src.profiling import PipelineProfiler
+
+    profiler = PipelineProfiler(
+        trace_memory=args.trace_memory,
+        profile_dir=args.profile_dir,
+        log_path=args.metrics_log,
+    )
+    run_pipeline(
+        input_path=args.input,
+        output_dir=args.output_dir,
+        countries=args.countries,
+        indicators=args.indicators,
+        workers=args.workers,
+        fmt=args.fmt,
+        budget_seconds=args.budget,
+        profiler=profiler,
+        prometheus_path=args.prometheus,
+        engine=args.engine,
+        model=args.model,
+    )
+
+
+def cmd_merge(args):
+    from src.publish import merge_published
+
+    version = merge_published(args.shards, args.output_dir, args.fmt)
+    print(f"Published merged version {version}")
+
+
+def cmd_partition(args):
+    from src.data import DEFAULT_COUNTRY, load_data, write_partitioned
+
+    for path in args.inputs:
+        df = load_data(path, default_country=args.country or DEFAULT_COUNTRY)
+        write_partitioned(df, args.output)
+        print(f"Partitioned {path} -> {args.output}")
+
+
+def cmd_serve(args):
+    from src.api import serve
+
+    serve(args.output_dir, args.host, args.port, args.readers)
+
+
+def cmd_ingest(args):
+    import pandas as pd
+
+    from src.ingest import ingest_batch, ingest_stream, read_records, watch_inbox
+
+    options = dict(
+        data_path=args.input, output_dir=args.output_dir, budget_seconds=args.budget
+    )
+    if args.watch:
+        summaries = watch_inbox(args.watch, args.interval, **options)
+    elif args.files and args.files != ["-"]:
+        records = pd.concat([read_records(path) for path in args.files])
+        summaries = [ingest_batch(records, **options)]
+    else:
+        summaries = ingest_stream(batch_size=args.batch_size, **options)
+
+    for summary in summaries:
+        print(
+            f"Accepted {summary['accepted']}, rejected {summary['rejected']}, "
+            f"updated {len(summary['series'])} series"
+            + (f" -> version {summary['version']}" if summary["version"] else "")
+        )
+        for record in summary["rejects"].to_dict("records"):
+            print(f"  rejected {record.get('record_id')}: {record['reason']}")
+
+
+def cmd_dag(args):
+    import os
+
+    from src.dag import dependencies, project_stages, run_dag
+    from src.data import PROJECT_ROOT
+
+    # Stage scripts write paths relative to the project root
+    os.chdir(PROJECT_ROOT)
+    stages = project_stages()
+    if args.list:
+        for name, upstream in dependencies(stages).items():
+            print(
+                f"{name}" + (f" <- {', '.join(sorted(upstream))}" if upstream else "")
+            )
+        return
+    report = run_dag(stages, args.targets, jobs=args.jobs, force=args.force)
+    print(report.drop(columns="hash").fillna("").to_string(index=False))
+
+
+def cmd_sources(args):
+    from src.data import load_data
+    from src.outputs import write_output
+    from src.sources import resolve_sources
+
+    links = resolve_sources(
+        load_data(args.input),
+        cache_dir=args.cache_dir,
+        ttl=args.ttl_days * 86_400,
+        max_connections=args.connections,
+        refresh=args.refresh,
+    )
+    path = write_output(links, args.cache_dir, "record_sources")
+    failed = links[links["error"] != ""]
+    print(
+        f"Linked {len(links)} records to {links['source_url'].nunique()} sources "
+        f"({int(links['from_cache'].sum())} from cache, {len(failed)} failed) "
+        f"-> {path}"
+    )
+    for record in failed.to_dict("records"):
+        print(f"  {record['record_id']}: {record['source_url']}: {record['error']}")
+
+
+COMMANDS = {
+    "run": cmd_run,
+    "merge": cmd_merge,
+    "partition": cmd_partition,
+    "serve": cmd_serve,
+    "ingest": cmd_ingest,
+    "dag": cmd_dag,
+    "sources": cmd_sources,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    COMMANDS[args.command](args)
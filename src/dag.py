@@ -0,0 +1,314 @@
+"""
+Dependency-aware executor for the project's stages.
+
+Each `Stage` declares the files it reads (`inputs`), the files it writes
+(`outputs`) and the code it depends on (`code`: source files or Python
+callables). A stage depends on every stage that writes one of its inputs.
+Before a stage runs, its inputs and code are content-hashed; if the hash
+matches the last successful run and its outputs exist, it is skipped. So
+editing one figure's plotting function reruns that figure only, and a new
+dataset reruns everything downstream of it.
+
+Independent stages run in parallel threads; stages sharing a `lock` (e.g.
+the matplotlib figures) run one at a time. Every stage is timed through a
+PipelineProfiler and the run is recorded in a JSON state file.
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import DEFAULT_DATA_PATH, PROJECT_ROOT
+from src.profiling import PipelineProfiler
+
+DEFAULT_STATE_PATH = "data/processed/.dag_state.json"
+
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=(), code=(), lock=None):
+        self.name = name
+        self.func = func
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.code = list(code)
+        self.lock = lock
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def _hash_path(path: Path, digest):
+    """Feed a file, or every file under a directory, into `digest`."""
+    if path.is_dir():
+        for child in sorted(path.rglob("*")):
+            if child.is_file():
+                digest.update(str(child.relative_to(path)).encode())
+                digest.update(child.read_bytes())
+    elif path.is_file():
+        digest.update(path.read_bytes())
+    else:
+        digest.update(b"<missing>")
+
+
+def stage_hash(stage: Stage, root: Path) -> str:
+    """Content hash of a stage's inputs and code."""
+    digest = hashlib.sha256(stage.name.encode())
+    for path in stage.inputs:
+        digest.update(str(path).encode())
+        _hash_path(root / path, digest)
+    for code in stage.code:
+        if callable(code):
+            digest.update(inspect.getsource(code).encode())
+        else:
+            _hash_path(root / code, digest)
+    return digest.hexdigest()
+
+
+def _overlaps(a: Path, b: Path) -> bool:
+    return a == b or a in b.parents or b in a.parents
+
+
+def dependencies(stages: list) -> dict:
+    """{stage name: names of the stages writing its inputs}; rejects cycles."""
+    deps = {
+        stage.name: {
+            other.name
+            for other in stages
+            if other is not stage
+            and any(_overlaps(i, o) for i in stage.inputs for o in other.outputs)
+        }
+        for stage in stages
+    }
+    # Kahn's algorithm, only to detect cycles
+    remaining = {name: set(upstream) for name, upstream in deps.items()}
+    while remaining:
+        ready = [name for name, upstream in remaining.items() if not upstream]
+        if not ready:
+            raise ValueError(f"Stages form a cycle: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for upstream in remaining.values():
+            upstream.difference_update(ready)
+    return deps
+
+
+def _upstream_closure(targets, deps) -> set:
+    selected, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in deps:
+            raise ValueError(f"Unknown stage '{name}'")
+        if name not in selected:
+            selected.add(name)
+            stack.extend(deps[name])
+    return selected
+
+
+def run_dag(
+    stages: list,
+    targets=None,
+    jobs: int = 1,
+    force: bool = False,
+    root=PROJECT_ROOT,
+    state_path=DEFAULT_STATE_PATH,
+    profiler: PipelineProfiler = None,
+) -> pd.DataFrame:
+    """
+    Run `stages` (or only `targets` and what they depend on) in dependency
+    order, skipping stages whose inputs and code are unchanged unless
+    `force`. Returns one row per stage: name, status (ran, skipped, failed,
+    blocked), seconds and hash. Raises RuntimeError if any stage failed.
+    """
+    root = Path(root)
+    state_path = root / state_path
+    profiler = profiler or PipelineProfiler("dag")
+    deps = dependencies(stages)
+    selected = _upstream_closure(targets, deps) if targets else set(deps)
+    by_name = {stage.name: stage for stage in stages if stage.name in selected}
+
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+    locks = {stage.lock: threading.Lock() for stage in stages if stage.lock}
+    state_lock = threading.Lock()
+    results = {}
+
+    def execute(stage):
+        digest = stage_hash(stage, root)
+        previous = state.get(stage.name, {})
+        outputs_exist = all((root / path).exists() for path in stage.outputs)
+        if not force and previous.get("hash") == digest and outputs_exist:
+            return {"status": "skipped", "seconds": 0.0, "hash": digest}
+
+        lock = locks.get(stage.lock)
+        with lock or nullcontext():
+            with profiler.stage(stage.name) as record:
+                stage.func()
+        result = {"status": "ran", "seconds": record["wall_seconds"], "hash": digest}
+        with state_lock:
+            state[stage.name] = {**result, "finished": pd.Timestamp.now().isoformat()}
+            _write_state(state_path, state)
+        return result
+
+    pending = dict(by_name)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+        while pending or running:
+            for name, stage in list(pending.items()):
+                upstream = deps[name] & selected
+                if any(
+                    results.get(u, {}).get("status") in ("failed", "blocked")
+                    for u in upstream
+                ):
+                    results[name] = {"status": "blocked", "seconds": 0.0, "hash": ""}
+                    del pending[name]
+                elif all(u in results for u in upstream):
+                    running[pool.submit(execute, stage)] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as exc:
+                    results[name] = {"status": "failed", "seconds": 0.0, "hash": ""}
+                    results[name]["error"] = repr(exc)
+
+    report = pd.DataFrame(
+        [{"stage": name, **results[name]} for name in by_name]
+    ).reindex(columns=["stage", "status", "seconds", "hash", "error"])
+    failed = report[report["status"] == "failed"]
+    if not failed.empty:
+        raise RuntimeError(
+            "Stages failed: "
+            + "; ".join(f"{r.stage}: {r.error}" for r in failed.itertuples())
+        )
+    return report
+
+
+def _write_state(path: Path, state: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, path)
+
+
+# --- the project's stages ---
+
+# EDA figure functions in notebooks/run_eda.py and the file each one writes
+FIGURES = {
+    "plot_data_quality_summary": "reports/figures/data_quality_summary.png",
+    "plot_event_timeline_dedicated": "reports/figures/event_timeline.png",
+    "plot_registered_vs_active": "reports/figures/registered_vs_active.png",
+    "plot_infrastructure_vs_usage": "reports/figures/infrastructure_vs_usage.png",
+    "plot_affordability_shock": "reports/figures/affordability_trend.png",
+}
+
+
+def module_files(module: str, root: Path = PROJECT_ROOT) -> list:
+    """
+    Source files (relative to `root`) of `module` and of every project
+    module it imports, directly or not, including imports inside functions.
+    Read from the source, so a module a stage starts using joins its code
+    hash without being listed anywhere.
+    """
+    package = module.split(".")[0]
+    seen, files, stack = set(), [], [module]
+    while stack:
+        name = stack.pop()
+        path = Path(*name.split(".")).with_suffix(".py")
+        if name in seen or not (root / path).is_file():
+            continue
+        seen.add(name)
+        files.append(path.as_posix())
+        for node in ast.walk(ast.parse((root / path).read_text())):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # `from src import x` imports the module src.x
+                names = [node.module] + [
+                    f"{node.module}.{alias.name}" for alias in node.names
+                ]
+            else:
+                continue
+            stack += [n for n in names if n.split(".")[0] == package]
+    return sorted(files)
+
+
+def project_stages(data_path=DEFAULT_DATA_PATH, output_dir="data/processed") -> list:
+    """
+    Stages of the project, run from the project root: dataset generation,
+    one stage per EDA figure, the modeling pipeline and the dashboard cache.
+    """
+    sys.path.insert(0, str(PROJECT_ROOT / "notebooks"))
+    import run_eda
+
+    current = f"{output_dir}/current"
+
+    def generate_data():
+        subprocess.run([sys.executable, "generate_data.py"], check=True)
+
+    def figure(plot):
+        def draw():
+            plot(run_eda.get_enriched_data(run_eda.load_data(data_path)))
+
+        return draw
+
+    def modeling():
+        from src.modeling import run_pipeline
+
+        run_pipeline(data_path, output_dir)
+
+    def dashboard_prep():
+        from src.dashboard_data import DashboardData
+
+        DashboardData(output_dir, raw_path=data_path).get()
+
+    stages = [
+        Stage(
+            "generate_data",
+            generate_data,
+            inputs=["generate_data.py"],
+            outputs=[data_path, "data/raw/reference_codes.csv"],
+        )
+    ]
+    for name, path in FIGURES.items():
+        plot = getattr(run_eda, name)
+        stages.append(
+            Stage(
+                f"figure:{Path(path).stem}",
+                figure(plot),
+                inputs=[data_path],
+                outputs=[path],
+                code=[plot, run_eda._plotting, "src/data.py"],
+                lock="matplotlib",
+            )
+        )
+    stages += [
+        Stage(
+            "modeling",
+            modeling,
+            inputs=[data_path],
+            outputs=[current],
+            code=module_files("src.modeling"),
+        ),
+        Stage(
+            "dashboard_prep",
+            dashboard_prep,
+            inputs=[current, data_path],
+            outputs=[f"{output_dir}/.dashboard_cache"],
+            code=module_files("src.dashboard_data"),
+        ),
+    ]
+    return stages
@@ -0,0 +1,148 @@
+"""
+Dashboard data service backed by a shared on-disk cache.
+
+The pipeline publishes immutable versions (see src/publish.py). The first
+dashboard worker to see a new current version pins it and converts that
+version's outputs (plus precomputed aggregates and the impact links of
+the raw data) to uncompressed Arrow IPC
+files under `.dashboard_cache/<scope>/<version>/` (scope: the countries
+served, or "all"); every worker then memory-maps
+those files. Numeric columns come back as read-only zero-copy views of the
+page cache, so workers share one copy of the data and nothing is pickled.
+"""
+
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import DEFAULT_DATA_PATH, load_data, resolve_path
+from src.publish import current_version, open_version
+from src.scenarios import impact_links
+
+# Tables served to the dashboard, in addition to the aggregates and links
+TABLES = (
+    "inclusion_forecast",
+    "impact_matrix",
+    "impact_estimates",
+    "series_forecast",
+    "summary_index",
+)
+CACHE_DIR_NAME = ".dashboard_cache"
+KEEP_VERSIONS = 2
+
+
+def build_aggregates(raw: pd.DataFrame, series_forecast: pd.DataFrame) -> pd.DataFrame:
+    """Per country/pillar counts and date coverage for the dashboard."""
+    obs = raw[raw["record_type"] == "observation"]
+    aggregates = (
+        obs.groupby(["country", "pillar"])
+        .agg(
+            n_observations=("value_numeric", "count"),
+            n_indicators=("indicator_code", "nunique"),
+            first_date=("observation_date", "min"),
+            last_date=("observation_date", "max"),
+        )
+        .reset_index()
+    )
+    if not series_forecast.empty:
+        pillars = obs.drop_duplicates("indicator_code").set_index("indicator_code")
+        forecast_pillar = series_forecast["indicator_code"].map(pillars["pillar"])
+        counts = series_forecast.assign(pillar=forecast_pillar).groupby("pillar")[
+            "indicator_code"
+        ]
+        aggregates["n_forecast_series"] = (
+            aggregates["pillar"].map(counts.nunique()).fillna(0).astype(int)
+        )
+    return aggregates
+
+
+class DashboardData:
+    """
+    Versioned, memory-mapped view of the pipeline outputs.
+
+    `get()` returns {table name: DataFrame} for the current version. Results
+    are held in-process until the published version changes; treat the
+    frames as read-only (use `.assign` to derive columns).
+    """
+
+    def __init__(
+        self, output_dir="data/processed", raw_path=DEFAULT_DATA_PATH, countries=None
+    ):
+        self.output_dir = resolve_path(output_dir)
+        self.raw_path = raw_path
+        # Single-market views only read that market's partitions
+        self.countries = countries
+        self.cache_root = self.output_dir / CACHE_DIR_NAME
+        self._version = None
+        self._frames = None
+
+    def get(self) -> dict:
+        version = current_version(self.output_dir)
+        if version != self._version or self._frames is None:
+            pinned = open_version(self.output_dir, version)
+            scope = "-".join(self.countries) if self.countries else "all"
+            cache_dir = self.cache_root / scope / version
+            if not cache_dir.exists():
+                self._build(pinned, cache_dir)
+            self._frames = self._map(cache_dir)
+            self._version = version
+        return self._frames
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def _build(self, pinned, cache_dir: Path):
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        # Versions published before a table existed simply lack it
+        frames = {name: pinned.read(name) for name in TABLES if name in pinned.names}
+        for frame in frames.values():
+            for column in frame.columns:
+                if column == "date" or column.endswith("_date"):
+                    frame[column] = pd.to_datetime(frame[column])
+        raw = load_data(self.raw_path, countries=self.countries)
+        frames["aggregates"] = build_aggregates(
+            raw, frames.get("series_forecast", pd.DataFrame())
+        )
+        frames["impact_links"] = impact_links(raw)
+
+        # Build beside the final directory and rename into place, so a
+        # concurrent worker either sees a complete cache or none
+        tmp = cache_dir.with_name(f"{cache_dir.name}.{uuid.uuid4().hex}.tmp")
+        tmp.mkdir(parents=True)
+        for name, frame in frames.items():
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            with ipc.new_file(tmp / f"{name}.arrow", table.schema) as writer:
+                writer.write_table(table)
+        try:
+            tmp.rename(cache_dir)
+        except OSError:
+            shutil.rmtree(tmp)  # another worker published it first
+        self._prune(cache_dir)
+
+    def _map(self, cache_dir: Path) -> dict:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        frames = {}
+        for path in sorted(cache_dir.glob("*.arrow")):
+            table = ipc.open_file(pa.memory_map(str(path))).read_all()
+            frames[path.stem] = table.to_pandas(split_blocks=True, self_destruct=False)
+        return frames
+
+    def _prune(self, keep: Path):
+        """
+        Remove all but the newest cached versions of this scope; workers
+        serving other countries keep theirs.
+        """
+        versions = sorted(
+            (p for p in keep.parent.iterdir() if not p.name.endswith(".tmp")),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for path in versions[:-KEEP_VERSIONS]:
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
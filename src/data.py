@@ -1,24 +1,65 @@
+import hashlib
+import uuid
 import pandas as pd
 from pathlib import Path
 
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DATA_PATH = "data/raw/ethiopia_fi_unified_data.csv"
 
-def load_data(path: str = "data/raw/ethiopia_fi_unified_data.csv") -> pd.DataFrame:
+# The unified dataset predates multi-country support; rows without a
+# country belong to Ethiopia
+DEFAULT_COUNTRY = "ETH"
+
+# Hive partition columns of the multi-country Parquet dataset layout
+PARTITION_COLS = ["country", "pillar", "year"]
+
+
+def resolve_path(path) -> Path:
     """
-    Loads the unified financial inclusion dataset.
-    Ensures dates are parsed and numeric columns are correct.
+    Resolve a data path: absolute paths and paths that exist relative to the
+    working directory are used as-is, anything else is taken relative to the
+    project root.
     """
-    # Use path relative to the script execution or absolute
-    base_path = Path(__file__).parent.parent
-    full_path = base_path / path
+    path = Path(path)
+    if path.is_absolute() or path.exists():
+        return path
+    return PROJECT_ROOT / path
 
-    if not full_path.exists():
-        # Fallback for running from root
-        full_path = path
 
-    df = pd.read_csv(full_path)
+def load_data(
+    path: str = DEFAULT_DATA_PATH,
+    countries: list = None,
+    pillars: list = None,
+    start=None,
+    end=None,
+    columns: list = None,
+    default_country: str = DEFAULT_COUNTRY,
+) -> pd.DataFrame:
+    """
+    Loads the unified financial inclusion dataset.
+    Ensures dates are parsed and numeric columns are correct.
+    With `columns`, only those of them that exist are read. Inputs without
+    a country column get `default_country`.
+
+    `path` is either the single CSV file or a partitioned Parquet dataset
+    directory (see `write_partitioned`). For a dataset, the country, pillar
+    and date-range filters are pushed down so only matching partitions are
+    read; for a CSV they are applied after reading.
+    """
+    path = resolve_path(path)
+    if path.is_dir():
+        df = _read_partitioned(path, countries, pillars, start, end, columns)
+    else:
+        df = pd.read_csv(
+            path, usecols=None if columns is None else lambda c: c in columns
+        )
+    if "country" not in df.columns:
+        df["country"] = default_country
 
-    # Parse Dates
-    df["observation_date"] = pd.to_datetime(df["observation_date"], errors="coerce")
+    # Parse Dates (years like "2021" and full dates like "2021-05-17" are mixed)
+    df["observation_date"] = pd.to_datetime(
+        df["observation_date"], format="mixed", errors="coerce"
+    )
 
     # Ensure numeric columns
     numeric_cols = ["value_numeric", "impact_estimate", "lag_months"]
@@ -26,7 +67,101 @@ def load_data(path: str = "data/raw/ethiopia_fi_unified_data.csv") -> pd.DataFra
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    return df
+    mask = pd.Series(True, index=df.index)
+    if countries:
+        mask &= df["country"].isin(countries)
+    if pillars:
+        mask &= df["pillar"].isin(pillars)
+    if start is not None:
+        mask &= df["observation_date"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["observation_date"] <= pd.Timestamp(end)
+    return df[mask].reset_index(drop=True)
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = pa.schema(
+        [("country", pa.string()), ("pillar", pa.string()), ("year", pa.int32())]
+    )
+    return ds.partitioning(schema, flavor="hive")
+
+
+def _read_partitioned(path, countries, pillars, start, end, columns=None):
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet", partitioning=_partitioning())
+    conditions = []
+    if countries:
+        conditions.append(ds.field("country").isin(countries))
+    if pillars:
+        conditions.append(ds.field("pillar").isin(pillars))
+    if start is not None:
+        conditions.append(ds.field("year") >= pd.Timestamp(start).year)
+    if end is not None:
+        conditions.append(ds.field("year") <= pd.Timestamp(end).year)
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    if columns is not None:
+        columns = [c for c in dataset.schema.names if c in columns]
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas().drop(columns="year", errors="ignore")
+
+
+def write_partitioned(df: pd.DataFrame, root, append: bool = False) -> Path:
+    """
+    Write records (as returned by `load_data`) to a Parquet dataset
+    partitioned by country / pillar / year. Partitions present in `df`
+    replace existing ones, so markets can be (re)loaded one at a time;
+    with `append`, the records are added next to the existing files.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    df = df.assign(year=df["observation_date"].dt.year.astype("Int32"))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if append and Path(root).exists():
+        # Appended files must match the schema of the existing ones
+        schema = ds.dataset(root, format="parquet", partitioning=_partitioning()).schema
+        table = table.select(schema.names).cast(schema)
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=_partitioning(),
+        existing_data_behavior="overwrite_or_ignore" if append else "delete_matching",
+        basename_template=(
+            f"append-{uuid.uuid4().hex}-{{i}}.parquet" if append else "part-{i}.parquet"
+        ),
+    )
+    return Path(root)
+
+
+def filter_records(
+    df: pd.DataFrame,
+    countries: list = None,
+    indicators: list = None,
+    keep_events: bool = True,
+) -> pd.DataFrame:
+    """
+    Keep rows for the given countries and/or indicator codes. Events have
+    their own codes but belong to every indicator set (impact links refer
+    to them), so they are kept unless `keep_events` is False.
+    """
+    mask = pd.Series(True, index=df.index)
+    if countries:
+        country = df["country"] if "country" in df.columns else DEFAULT_COUNTRY
+        mask &= pd.Series(country, index=df.index).isin(countries)
+    if indicators:
+        selected = df["indicator_code"].isin(indicators)
+        if keep_events and "record_type" in df.columns:
+            selected |= df["record_type"] == "event"
+        mask &= selected
+    return df[mask]
 
 
 def get_observations(df: pd.DataFrame, pillar: str = None) -> pd.DataFrame:
@@ -49,3 +184,59 @@ def get_enriched_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     df["Year"] = df["observation_date"].dt.year
     return df
+
+
+# Columns identifying one modelled series: an indicator within a market and slice
+SERIES_KEYS = ["country", "indicator_code", "gender", "location"]
+
+# Record columns the modeling stages read (free-text ones like notes and
+# source_url are not needed to fit anything)
+MODEL_COLUMNS = [
+    "record_id",
+    "record_type",
+    "pillar",
+    "indicator",
+    "indicator_code",
+    "indicator_direction",
+    "value_numeric",
+    "observation_date",
+    "confidence",
+    "country",
+    "gender",
+    "location",
+    "parent_id",
+    "impact_direction",
+    "impact_magnitude",
+    "impact_estimate",
+    "lag_months",
+    "evidence_basis",
+]
+
+
+def get_series(df: pd.DataFrame, keys: list = None) -> dict:
+    """
+    Split observations into one series per key. Missing slice values
+    (e.g. no gender breakdown) become "all".
+    Returns {key tuple: DataFrame[date, value]} sorted by date.
+    """
+    keys = keys or SERIES_KEYS
+    obs = get_observations(df).dropna(subset=["observation_date", "value_numeric"])
+    obs[keys] = obs[keys].fillna("all")
+    obs = obs.rename(columns={"observation_date": "date", "value_numeric": "value"})
+    obs = obs.sort_values("date", kind="stable")
+    return {
+        key: group[["date", "value"]].reset_index(drop=True)
+        for key, group in obs.groupby(keys, sort=True)
+    }
+
+
+def fingerprint(df: pd.DataFrame, extra: str = "") -> str:
+    """Stable content hash of a frame, optionally salted with a config string."""
+    return hash_rows(pd.util.hash_pandas_object(df, index=False).to_numpy(), extra)
+
+
+def hash_rows(row_hashes, extra: str = "") -> str:
+    """`fingerprint` from precomputed per-row hashes (see Panel.row_hashes)."""
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(extra.encode())
+    return digest.hexdigest()
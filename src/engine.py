@@ -0,0 +1,387 @@
+"""
+Out-of-core aggregation over the raw or partitioned dataset.
+
+The aggregations the pipeline and the EDA need (the daily usage score,
+per-indicator coverage, record counts) reduce the dataset to a few hundred
+rows. Instead of loading every record into pandas first, `group_stats` runs
+them inside a query engine directly over the files and returns only the
+aggregated rows:
+
+    duckdb  embedded DuckDB, multithreaded, spills to `temp_dir` when the
+            aggregation exceeds `memory_limit` (optional dependency)
+    arrow   streams record batches through Arrow compute, so memory is
+            bounded by the number of groups, not the dataset size
+    pandas  loads the dataset with `load_data` (the reference behaviour)
+
+"auto" picks the first engine that is installed. Dates are grouped as
+stored (raw strings in the CSV, where "2021" and "2021-05-17" are mixed)
+and parsed afterwards on the small result.
+"""
+
+import pandas as pd
+
+from src.data import (
+    DEFAULT_COUNTRY,
+    DEFAULT_DATA_PATH,
+    _partitioning,
+    filter_records,
+    load_data,
+    resolve_path,
+)
+
+ENGINES = ("auto", "duckdb", "arrow", "pandas")
+# Record types that are not measurements (see usage_score)
+NON_MEASUREMENTS = ("event", "impact_link")
+STATS = ["n_records", "n_values", "value_sum", "value_min", "value_max"]
+DATE_STATS = ["first_date", "last_date"]
+# Partial aggregates combine with: {column: Arrow aggregation}
+COMBINE = {
+    "n_records": "sum",
+    "n_values": "sum",
+    "value_sum": "sum",
+    "value_min": "min",
+    "value_max": "max",
+    "first_date": "min",
+    "last_date": "max",
+}
+# CSV bytes per Arrow record batch; partial aggregates of this many
+# batches are folded into one
+CSV_BLOCK_SIZE = 16 << 20
+COMPACT_EVERY = 64
+# Dates stored as strings enter first/last_date only in ISO form, which sorts
+# like the dates themselves ("2021" < "2021-05-17" < "2022")
+ISO_DATE = r"^\d{4}(-\d{2}(-\d{2}([ T].*)?)?)?$"
+
+
+def resolve_engine(engine: str = "auto") -> str:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+    if engine != "auto":
+        return engine
+    for candidate in ("duckdb", "pyarrow"):
+        try:
+            __import__(candidate)
+        except ImportError:
+            continue
+        return "arrow" if candidate == "pyarrow" else candidate
+    return "pandas"
+
+
+def group_stats(
+    path=DEFAULT_DATA_PATH,
+    by=("observation_date",),
+    countries=None,
+    indicators=None,
+    measurements_only=True,
+    engine="auto",
+    temp_dir=None,
+    memory_limit=None,
+) -> pd.DataFrame:
+    """
+    Per-group statistics of the records in `path` (CSV or partitioned
+    dataset): `by` columns, n_records, n_values (non-null values),
+    value_sum (NaN without values), value_min, value_max, first_date and
+    last_date (observation_date as stored; see ISO_DATE). Events and impact links are
+    left out with `measurements_only`. `temp_dir` and `memory_limit`
+    (e.g. "4GB") only apply to DuckDB.
+    """
+    by = list(by)
+    engine = resolve_engine(engine)
+    if engine == "duckdb":
+        stats = _duckdb_stats(
+            path, by, countries, indicators, measurements_only, temp_dir, memory_limit
+        )
+    elif engine == "arrow":
+        stats = _arrow_stats(path, by, countries, indicators, measurements_only)
+    else:
+        stats = _pandas_stats(path, by, countries, indicators, measurements_only)
+    stats = stats.reindex(columns=by + STATS + DATE_STATS)
+    stats[["n_records", "n_values"]] = stats[["n_records", "n_values"]].astype("int64")
+    return stats.sort_values(by, kind="stable").reset_index(drop=True)
+
+
+def _pandas_stats(path, by, countries, indicators, measurements_only):
+    # Strict code filter, like the SQL and Arrow engines
+    raw = filter_records(
+        load_data(path, countries=countries), indicators=indicators, keep_events=False
+    )
+    if measurements_only:
+        raw = raw[~raw["record_type"].isin(NON_MEASUREMENTS)]
+    grouped = raw.groupby(by, sort=True)
+    return pd.DataFrame(
+        {
+            "n_records": grouped.size(),
+            "n_values": grouped["value_numeric"].count(),
+            "value_sum": grouped["value_numeric"].sum(min_count=1),
+            "value_min": grouped["value_numeric"].min(),
+            "value_max": grouped["value_numeric"].max(),
+            "first_date": grouped["observation_date"].min(),
+            "last_date": grouped["observation_date"].max(),
+        }
+    ).reset_index()
+
+
+# --- Arrow ---
+
+
+def _arrow_batches(path, columns, countries):
+    """Record batches of `columns` (the CSV read as strings), country filter pushed down."""
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as ds
+
+    path = resolve_path(path)
+    if path.is_dir():
+        dataset = ds.dataset(path, format="parquet", partitioning=_partitioning())
+        present = [c for c in columns if c in dataset.schema.names]
+        condition = ds.field("country").isin(countries) if countries else None
+        yield from dataset.to_batches(columns=present, filter=condition)
+        return
+
+    import pyarrow as pa
+
+    header = pd.read_csv(path, nrows=0).columns
+    present = [c for c in columns if c in header]
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=present, column_types={c: pa.string() for c in present}
+        ),
+    )
+    yield from reader
+
+
+def _to_float(array):
+    """Numeric values, unparseable strings as nulls (like pd.to_numeric(errors="coerce"))."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        return pc.cast(array, pa.float64())
+    except pa.ArrowInvalid:
+        return pa.array(pd.to_numeric(array.to_pandas(), errors="coerce"), pa.float64())
+
+
+def _iso_dates(array):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if not pa.types.is_string(array.type):
+        return array
+    return pc.if_else(pc.match_substring_regex(array, ISO_DATE), array, None)
+
+
+def _arrow_stats(path, by, countries, indicators, measurements_only):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns = list(
+        dict.fromkeys(
+            by
+            + [
+                "country",
+                "record_type",
+                "indicator_code",
+                "value_numeric",
+                "observation_date",
+            ]
+        )
+    )
+    aggregations = [
+        ([], "count_all"),
+        ("value", "count"),
+        ("value", "sum"),
+        ("value", "min"),
+        ("value", "max"),
+        ("iso_date", "min"),
+        ("iso_date", "max"),
+    ]
+    names = STATS + DATE_STATS
+    # Output columns Arrow names after the aggregation, e.g. value_sum
+    generated = [f"{column}_{how}" if column else how for column, how in aggregations]
+
+    partials = []
+    for batch in _arrow_batches(path, columns, countries):
+        table = pa.Table.from_batches([batch])
+        if "country" not in table.column_names:
+            table = table.append_column(
+                "country", pa.array([DEFAULT_COUNTRY] * len(table), pa.string())
+            )
+        mask = pa.array([True] * len(table))
+        if measurements_only:
+            non_measurement = pc.is_in(
+                table["record_type"], pa.array(NON_MEASUREMENTS, pa.string())
+            )
+            mask = pc.and_(mask, pc.invert(non_measurement))
+        if countries:
+            mask = pc.and_(mask, pc.is_in(table["country"], pa.array(countries)))
+        if indicators:
+            mask = pc.and_(
+                mask, pc.is_in(table["indicator_code"], pa.array(indicators))
+            )
+        table = table.filter(mask)
+        table = table.append_column("value", _to_float(table["value_numeric"]))
+        table = table.append_column("iso_date", _iso_dates(table["observation_date"]))
+        partial = table.group_by(by, use_threads=True).aggregate(aggregations)
+        partials.append(partial.select(by + generated).rename_columns(by + names))
+        if len(partials) >= COMPACT_EVERY:
+            partials = [_combine(partials, by)]
+
+    if not partials:
+        return pd.DataFrame(columns=by + names)
+    stats = _combine(partials, by).to_pandas()
+    # Arrow groups missing keys together; pandas leaves them out
+    return stats.dropna(subset=by)
+
+
+def _combine(partials, by):
+    """Fold partial aggregates of several batches into one."""
+    import pyarrow as pa
+
+    table = pa.concat_tables(partials)
+    combined = table.group_by(by, use_threads=True).aggregate(
+        [(column, how) for column, how in COMBINE.items()]
+    )
+    generated = [f"{column}_{how}" for column, how in COMBINE.items()]
+    return combined.select(by + generated).rename_columns(by + list(COMBINE))
+
+
+# --- DuckDB ---
+
+
+def _sql_string(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _duckdb_stats(
+    path, by, countries, indicators, measurements_only, temp_dir, memory_limit
+):
+    import duckdb
+
+    path = resolve_path(path)
+    con = duckdb.connect()
+    try:
+        if temp_dir:
+            con.execute(f"SET temp_directory = {_sql_string(temp_dir)}")
+        if memory_limit:
+            con.execute(f"SET memory_limit = {_sql_string(memory_limit)}")
+        if path.is_dir():
+            source = (
+                f"read_parquet({_sql_string(path / '**' / '*.parquet')}, "
+                "hive_partitioning = true)"
+            )
+        else:
+            source = f"read_csv({_sql_string(path)}, header = true, all_varchar = true)"
+        present = {
+            row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        }
+        # Single-country files have no country column: project the default
+        columns = (
+            "*"
+            if "country" in present
+            else f"*, {_sql_string(DEFAULT_COUNTRY)} AS country"
+        )
+
+        conditions, params = [], [ISO_DATE]
+        if measurements_only:
+            conditions.append(
+                "coalesce(record_type, '') NOT IN ('event', 'impact_link')"
+            )
+        if countries:
+            conditions.append(f"country IN ({', '.join('?' * len(countries))})")
+            params += list(countries)
+        if indicators:
+            conditions.append(f"indicator_code IN ({', '.join('?' * len(indicators))})")
+            params += list(indicators)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        keys = ", ".join(by)
+        query = f"""
+            SELECT {keys},
+                count(*) AS n_records,
+                count(value) AS n_values,
+                sum(value) AS value_sum,
+                min(value) AS value_min,
+                max(value) AS value_max,
+                min(iso_date) AS first_date,
+                max(iso_date) AS last_date
+            FROM (
+                SELECT {columns},
+                    TRY_CAST(value_numeric AS DOUBLE) AS value,
+                    CASE
+                        WHEN regexp_matches(CAST(observation_date AS VARCHAR), ?)
+                        THEN CAST(observation_date AS VARCHAR)
+                    END AS iso_date
+                FROM {source}
+            )
+            {where}
+            GROUP BY {keys}
+        """
+        stats = con.execute(query, params).df()
+    finally:
+        con.close()
+    return stats.dropna(subset=by)
+
+
+# --- aggregations used by the pipeline and the EDA ---
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, format="mixed", errors="coerce")
+
+
+def aggregate_usage(
+    path=DEFAULT_DATA_PATH, countries=None, indicators=None, engine="auto", **options
+) -> pd.DataFrame:
+    """
+    The daily "Usage Score" series (see `modeling.usage_score`) aggregated
+    by the query engine: date, value, is_holiday.
+    """
+    stats = group_stats(
+        path, ["observation_date"], countries, indicators, engine=engine, **options
+    )
+    # Date strings like "2021" and "2021-01-01" are the same day: re-sum per date
+    stats = stats[stats["n_values"] > 0].assign(
+        date=_parse_dates(stats["observation_date"])
+    )
+    daily = (
+        stats.dropna(subset=["date"])
+        .groupby("date")["value_sum"]
+        .sum()
+        .rename("value")
+        .reset_index()
+    )
+    daily["is_holiday"] = (daily["date"].dt.dayofweek >= 5).astype("int64")
+    return daily
+
+
+def indicator_summary(
+    path=DEFAULT_DATA_PATH, countries=None, engine="auto", **options
+) -> pd.DataFrame:
+    """
+    Coverage of every indicator in every market: country, indicator_code,
+    n_obs, first_date, last_date, value_min, value_mean, value_max.
+    """
+    stats = group_stats(
+        path, ["country", "indicator_code"], countries, engine=engine, **options
+    )
+    stats = stats[stats["n_values"] > 0]
+    return pd.DataFrame(
+        {
+            "country": stats["country"],
+            "indicator_code": stats["indicator_code"],
+            "n_obs": stats["n_values"],
+            "first_date": _parse_dates(stats["first_date"]),
+            "last_date": _parse_dates(stats["last_date"]),
+            "value_min": stats["value_min"],
+            "value_mean": stats["value_sum"] / stats["n_values"],
+            "value_max": stats["value_max"],
+        }
+    ).reset_index(drop=True)
+
+
+def record_counts(
+    path=DEFAULT_DATA_PATH, by=("record_type",), engine="auto", **options
+) -> pd.Series:
+    """Number of records per `by` group, events and impact links included."""
+    stats = group_stats(path, by, measurements_only=False, engine=engine, **options)
+    return stats.set_index(list(by))["n_records"]
@@ -0,0 +1,169 @@
+"""
+Event impact estimation from the data (interrupted time series).
+
+For every impact link and every observed series of the linked indicator in
+the event's market, fit
+
+    value = a + b * t + c * ramp(t)
+
+where t is years since the first observation and ramp is the lag-window
+ramp used by the scenario engine (0 before the event, linear to 1 over
+`lag_months`). `c` is the level shift once the effect is fully in place;
+it is reported as a percent of the pre-event trend level at the event
+date, the unit of `impact_estimate`, next to the prior from the data.
+
+All regressions are solved together as one batch of weighted normal
+equations, with shorter series zero-padded; with n_jobs > 1 the batch is
+split across worker processes.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.backends import process_pool
+from src.forecast import DAYS_PER_YEAR
+from src.scenarios import months_between, ramp
+
+N_PARAMS = 3  # intercept, trend, event
+MIN_PRE = 2  # pre-event points needed to pin down the trend
+MIN_POST = 1
+# Regressions per worker below which a process pool costs more than it saves
+MIN_CHUNK = 5000
+# Columns of estimate_effects, also when there is nothing to estimate
+ESTIMATE_COLUMNS = [
+    "country",
+    "indicator_code",
+    "gender",
+    "location",
+    "link_id",
+    "event_code",
+    "event_date",
+    "prior_estimate",
+    "n_obs",
+    "n_pre",
+    "n_post",
+    "estimate",
+    "std_error",
+    "lower",
+    "upper",
+    "status",
+]
+
+
+def its_designs(series: dict, links: pd.DataFrame):
+    """
+    Stack one ITS regression per (link, series) pair.
+    Returns (pairs DataFrame, X (B, n, 3), y (B, n), weights (B, n)).
+    """
+    pairs, designs = [], []
+    for key, frame in series.items():
+        country, indicator = key[0], key[1]
+        matching = links[
+            (links["country"] == country) & (links["indicator_code"] == indicator)
+        ]
+        if matching.empty:
+            continue
+        dates = frame["date"].to_numpy()
+        t = (dates - dates[0]) / np.timedelta64(1, "D") / DAYS_PER_YEAR
+        for link in matching.itertuples():
+            event_date = np.datetime64(link.event_date)
+            elapsed = months_between(event_date, dates)
+            X = np.column_stack([np.ones_like(t), t, ramp(elapsed, link.lag_months)])
+            t_event = (event_date - dates[0]) / np.timedelta64(1, "D") / DAYS_PER_YEAR
+            pairs.append(
+                {
+                    **dict(
+                        zip(("country", "indicator_code", "gender", "location"), key)
+                    ),
+                    "link_id": link.record_id,
+                    "event_code": link.event_code,
+                    "event_date": link.event_date,
+                    "prior_estimate": link.sign * link.mean,
+                    "n_obs": len(frame),
+                    "n_pre": int((elapsed < 0).sum()),
+                    "n_post": int((elapsed >= 0).sum()),
+                    "t_event": t_event,
+                }
+            )
+            designs.append((X, frame["value"].to_numpy(dtype=float)))
+
+    n_max = max((len(y) for _, y in designs), default=0)
+    X = np.zeros((len(designs), n_max, N_PARAMS))
+    y = np.zeros((len(designs), n_max))
+    w = np.zeros((len(designs), n_max))
+    for i, (Xi, yi) in enumerate(designs):
+        X[i, : len(yi)], y[i, : len(yi)], w[i, : len(yi)] = Xi, yi, 1.0
+    return pd.DataFrame(pairs), X, y, w
+
+
+def fit_batch(X: np.ndarray, y: np.ndarray, w: np.ndarray):
+    """
+    Weighted least squares for a stack of regressions via the normal
+    equations. Returns (coefficients (B, k), standard errors (B, k)); rows
+    that are rank deficient or lack residual degrees of freedom get NaN.
+    """
+    Xw = X * w[..., None]
+    xtx = np.einsum("bni,bnj->bij", Xw, X)
+    xty = np.einsum("bni,bn->bi", Xw, y)
+    k = X.shape[-1]
+    full_rank = np.linalg.matrix_rank(xtx) == k
+    xtx_inv = np.linalg.pinv(xtx)
+    beta = np.einsum("bij,bj->bi", xtx_inv, xty)
+
+    resid = (y - np.einsum("bni,bi->bn", X, beta)) * w
+    dof = w.sum(axis=1) - k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = np.where(dof > 0, (resid**2).sum(axis=1) / dof, np.nan)
+    se = np.sqrt(sigma2[:, None] * np.diagonal(xtx_inv, axis1=1, axis2=2))
+
+    invalid = ~full_rank | ~(dof > 0)
+    beta[invalid], se[invalid] = np.nan, np.nan
+    return beta, se
+
+
+def estimate_effects(
+    series: dict, links: pd.DataFrame, n_jobs: int = 1, z: float = 1.96
+) -> pd.DataFrame:
+    """
+    Estimated effect of every event on every linked series, in percent of
+    the pre-event trend level, with standard error and a `z` interval,
+    next to the prior estimate. `status` is "estimated" or
+    "insufficient_data" (too few points before/after the event).
+    """
+    pairs, X, y, w = its_designs(series, links)
+    if pairs.empty:
+        return pd.DataFrame(columns=ESTIMATE_COLUMNS)
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs > 1 and len(pairs) >= n_jobs * MIN_CHUNK:
+        chunks = np.array_split(np.arange(len(pairs)), n_jobs)
+        with process_pool(n_jobs) as pool:
+            results = list(
+                pool.map(fit_batch, *zip(*((X[i], y[i], w[i]) for i in chunks)))
+            )
+        beta = np.concatenate([b for b, _ in results])
+        se = np.concatenate([s for _, s in results])
+    else:
+        beta, se = fit_batch(X, y, w)
+
+    level = beta[:, 0] + beta[:, 1] * pairs["t_event"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(level != 0, 100 / np.abs(level), np.nan)
+    identified = (
+        (pairs["n_pre"] >= MIN_PRE)
+        & (pairs["n_post"] >= MIN_POST)
+        & np.isfinite(beta[:, 2])
+    )
+    estimate = np.where(identified, beta[:, 2] * scale, np.nan)
+    std_error = np.where(identified, se[:, 2] * scale, np.nan)
+
+    return pairs.drop(columns="t_event").assign(
+        estimate=estimate,
+        std_error=std_error,
+        lower=estimate - z * std_error,
+        upper=estimate + z * std_error,
+        status=np.where(identified, "estimated", "insufficient_data"),
+    )
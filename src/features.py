@@ -0,0 +1,236 @@
+"""
+Feature store for engineered time-series features.
+
+Features are requested by name:
+
+    lag_<k>                 value k rows earlier
+    rolling_<stat>_<w>      trailing window of w rows, stat in mean/std/min/max
+    day_of_week, month, quarter, year
+    days_since_event        days since the latest event on or before the date
+    days_to_event           days until the next event after the date
+
+Rolling statistics are O(n) whatever the window: mean and std from
+cumulative sums, min and max with the van Herk/Gil-Werman block algorithm.
+Like pandas' `rolling(w)`, the first w - 1 rows are NaN.
+
+`FeatureStore` computes features once per series and persists them as one
+Parquet file per series. When a series grows by new dates, only the new
+rows (plus the trailing context the features need) are computed.
+Per-series model backends request features by name through
+`ModelBackend.features` (see `backend_design` in src/forecast.py).
+"""
+
+import hashlib
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Fixed-name features, {name: function(frame, events) -> array}
+FEATURE_REGISTRY = {}
+PATTERNS = {
+    "lag": re.compile(r"lag_(\d+)$"),
+    "rolling": re.compile(r"rolling_(mean|std|min|max)_(\d+)$"),
+}
+
+
+def register_feature(name):
+    """Decorator adding a fixed-name feature to FEATURE_REGISTRY."""
+
+    def decorator(func):
+        FEATURE_REGISTRY[name] = func
+        return func
+
+    return decorator
+
+
+@register_feature("day_of_week")
+def _day_of_week(frame, events):
+    return frame["date"].dt.dayofweek.to_numpy()
+
+
+@register_feature("month")
+def _month(frame, events):
+    return frame["date"].dt.month.to_numpy()
+
+
+@register_feature("quarter")
+def _quarter(frame, events):
+    return frame["date"].dt.quarter.to_numpy()
+
+
+@register_feature("year")
+def _year(frame, events):
+    return frame["date"].dt.year.to_numpy()
+
+
+@register_feature("days_since_event")
+def _days_since_event(frame, events):
+    dates, events = _as_days(frame["date"]), _as_days(events)
+    idx = np.searchsorted(events, dates, side="right") - 1
+    since = dates - events[np.clip(idx, 0, None)] if len(events) else dates
+    return np.where(idx >= 0, since, np.nan)
+
+
+@register_feature("days_to_event")
+def _days_to_event(frame, events):
+    dates, events = _as_days(frame["date"]), _as_days(events)
+    idx = np.searchsorted(events, dates, side="right")
+    until = events[np.clip(idx, None, len(events) - 1)] - dates if len(events) else 0
+    return np.where(idx < len(events), until, np.nan)
+
+
+def _as_days(dates) -> np.ndarray:
+    days = pd.to_datetime(pd.Series(dates)).to_numpy("datetime64[D]")
+    return np.sort(days.astype(np.int64)).astype(float)
+
+
+def lag(values: np.ndarray, k: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if k < len(values):
+        out[k:] = values[: len(values) - k]
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        csum = np.concatenate([[0.0], np.cumsum(values)])
+        out[window - 1 :] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Sample standard deviation (ddof=1), as pandas."""
+    out = np.full(len(values), np.nan)
+    if 1 < window <= len(values):
+        # Centre first so the sum of squares keeps its precision
+        centred = values - values.mean()
+        mean = rolling_mean(centred, window)[window - 1 :]
+        csum2 = np.concatenate([[0.0], np.cumsum(centred**2)])
+        sq = (csum2[window:] - csum2[:-window]) / window
+        var = np.clip(sq - mean**2, 0.0, None) * window / (window - 1)
+        out[window - 1 :] = np.sqrt(var)
+    return out
+
+
+def rolling_extreme(values: np.ndarray, window: int, op=np.maximum) -> np.ndarray:
+    """
+    Trailing window max (or min with op=np.minimum) in O(n): prefix and
+    suffix extremes within blocks of `window` rows combine into any window.
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+    fill = -np.inf if op is np.maximum else np.inf
+    n_blocks = -(-n // window)
+    padded = np.full(n_blocks * window, fill)
+    padded[:n] = values
+    blocks = padded.reshape(n_blocks, window)
+    prefix = op.accumulate(blocks, axis=1).ravel()
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    start = np.arange(n - window + 1)
+    out[window - 1 :] = op(suffix[start], prefix[start + window - 1])
+    return out
+
+
+ROLLING = {
+    "mean": rolling_mean,
+    "std": rolling_std,
+    "min": lambda values, window: rolling_extreme(values, window, np.minimum),
+    "max": lambda values, window: rolling_extreme(values, window, np.maximum),
+}
+
+
+def context_rows(names) -> int:
+    """Trailing rows a feature needs to be computed for the next row."""
+    rows = 0
+    for name in names:
+        if match := PATTERNS["lag"].match(name):
+            rows = max(rows, int(match.group(1)))
+        elif match := PATTERNS["rolling"].match(name):
+            rows = max(rows, int(match.group(2)) - 1)
+    return rows
+
+
+def compute_features(frame: pd.DataFrame, names, events=()) -> pd.DataFrame:
+    """Features `names` for a frame with date and value columns."""
+    values = frame["value"].to_numpy(dtype=float)
+    columns = {}
+    for name in names:
+        if name in FEATURE_REGISTRY:
+            columns[name] = FEATURE_REGISTRY[name](frame, events)
+        elif match := PATTERNS["lag"].match(name):
+            columns[name] = lag(values, int(match.group(1)))
+        elif match := PATTERNS["rolling"].match(name):
+            stat, window = match.group(1), int(match.group(2))
+            columns[name] = ROLLING[stat](values, window)
+        else:
+            raise ValueError(f"Unknown feature '{name}'")
+    return pd.DataFrame(columns, index=frame.index)
+
+
+class FeatureStore:
+    """
+    Persistent per-series features under `root`, one Parquet file per series
+    (and event set). `get` returns features aligned with the rows of the
+    frame passed in, computing only what is not already stored.
+    """
+
+    def __init__(self, root="data/processed/features", events=()):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.events = pd.to_datetime(pd.Series(list(events), dtype=object))
+        self._lock = threading.Lock()
+
+    @property
+    def events_key(self) -> str:
+        """The event dates, as part of cache keys of results using them."""
+        return ",".join(str(d.date()) for d in sorted(self.events))
+
+    def path(self, key) -> Path:
+        digest = hashlib.sha1(f"{key!r}|{self.events_key}".encode()).hexdigest()[:16]
+        return self.root / f"{digest}.parquet"
+
+    def get(self, key, frame: pd.DataFrame, names) -> pd.DataFrame:
+        names = list(names)
+        frame = frame[["date", "value"]].reset_index(drop=True)
+        with self._lock:
+            stored = self._read(key)
+            features = self._update(stored, frame, names)
+            if features is not stored:
+                features.to_parquet(self.path(key), index=False)
+        return features[names]
+
+    def _read(self, key):
+        path = self.path(key)
+        return pd.read_parquet(path) if path.exists() else None
+
+    def _update(self, stored, frame, names) -> pd.DataFrame:
+        if stored is None or not set(names) <= set(stored.columns):
+            known = [] if stored is None else list(stored.columns[2:])
+            names = list(dict.fromkeys(known + names))
+            return pd.concat(
+                [frame, compute_features(frame, names, self.events)], axis=1
+            )
+
+        n_old = len(stored)
+        prefix = frame.iloc[:n_old]
+        if len(frame) < n_old or not (
+            np.array_equal(prefix["date"].to_numpy(), stored["date"].to_numpy())
+            and np.array_equal(prefix["value"].to_numpy(), stored["value"].to_numpy())
+        ):
+            # History changed: recompute everything
+            return self._update(None, frame, list(stored.columns[2:]))
+        if len(frame) == n_old:
+            return stored
+
+        # Appended dates: compute the new rows from their trailing context
+        feature_names = list(stored.columns[2:])
+        start = max(0, n_old - context_rows(feature_names))
+        tail = compute_features(frame.iloc[start:], feature_names, self.events)
+        new_rows = pd.concat([frame.iloc[n_old:], tail.iloc[n_old - start :]], axis=1)
+        return pd.concat([stored, new_rows], ignore_index=True)
@@ -0,0 +1,306 @@
+import numpy as np
+import pandas as pd
+
+from src.backends import MODEL_REGISTRY, fit_many
+from src.data import SERIES_KEYS, hash_rows
+from src.features import FEATURE_REGISTRY, compute_features
+from src.panel import Panel
+
+# Observation dates are annual, so series are modelled on fractional years
+DAYS_PER_YEAR = 365.25
+DAY_NS = 86_400 * 10**9
+
+
+def series_design(dates, origin=None) -> pd.DataFrame:
+    """Trend design matrix: years elapsed since `origin` (first date by default)."""
+    dates = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+    origin = dates.iloc[0] if origin is None else origin
+    return pd.DataFrame({"t": (dates - origin).dt.days / DAYS_PER_YEAR})
+
+
+def backend_design(
+    model: str, frame: pd.DataFrame, dates=(), events=(), features=None, key=None
+) -> pd.DataFrame:
+    """
+    Design matrix of backend `model` for the rows of `frame` (date, value)
+    followed by future `dates`: the trend (see series_design) plus the
+    features the backend requests (ModelBackend.features). Those of the
+    history come from the FeatureStore `features` under `key` when given
+    (with its events), else are computed with `events`. A missing event
+    distance (no event on that side) is -1.
+    """
+    names = list(MODEL_REGISTRY[model].features)
+    unknown = [name for name in names if name not in FEATURE_REGISTRY]
+    if unknown:
+        raise ValueError(f"{model} requests {unknown}: only date-based features")
+    frame = frame[["date", "value"]].reset_index(drop=True)
+    future = pd.DataFrame({"date": pd.to_datetime(pd.Series(dates)), "value": np.nan})
+    X = series_design(
+        pd.concat([frame["date"], future["date"]], ignore_index=True),
+        origin=frame["date"].iloc[0],
+    )
+    if not names:
+        return X
+    if features is not None:
+        history, events = features.get(key, frame, names), features.events
+    else:
+        history = compute_features(frame, names, events)
+    extra = pd.concat([history, compute_features(future, names, events)])
+    return pd.concat([X, extra.reset_index(drop=True).fillna(-1)], axis=1)
+
+
+def future_dates(last_date, horizon: int = 3) -> pd.DatetimeIndex:
+    """Yearly dates following `last_date`."""
+    return pd.date_range(
+        last_date + pd.DateOffset(years=1), periods=horizon, freq=pd.DateOffset(years=1)
+    )
+
+
+def forecast_series(
+    series,
+    models: dict,
+    horizon: int = 3,
+    warm_starts: dict = None,
+    store=None,
+    n_jobs: int = 1,
+    features=None,
+):
+    """
+    Refit each series with its selected model and forecast `horizon` years ahead.
+
+    `series` is a Panel (see src/panel.py) or {key: DataFrame[date, value]}
+    as returned by get_series. `models` maps series keys to backend names
+    (e.g. the winners of `select_models`). With a `ModelStore`, series whose
+    data and config are unchanged reuse their stored forecast without
+    fitting, and changed series warm-start from the last stored state of
+    the same model.
+    Series using a PANEL_MODELS model are fitted together by
+    `forecast_panel` (same numbers up to floating-point rounding); from a
+    Panel they are sliced out of its arrays, without a frame per series.
+    The other series are fitted one by one, in parallel with n_jobs > 1,
+    on the design of `backend_design` (features from the FeatureStore
+    `features`, if any).
+    Returns (forecast DataFrame, {key: backend fitted one series at a time}).
+    """
+    if not isinstance(series, Panel):
+        series = Panel.from_series(series)
+    panel = series
+    warm_starts = warm_starts or {}
+    hashes = panel.row_hashes() if store is not None else None
+    rows, fitted, single = {}, {}, {}
+    batched = {model: {} for model in PANEL_MODELS}
+    for i in range(panel.n_series):
+        key = panel.key(i)
+        model = models.get(key, "naive")
+        warm_start = warm_starts.get(key)
+        data_fingerprint = None
+        if store is not None:
+            config = f"{key}|{model}|horizon={horizon}"
+            if MODEL_REGISTRY[model].features and features is not None:
+                config += f"|events={features.events_key}"
+            data_fingerprint = hash_rows(
+                hashes[panel.offsets[i] : panel.offsets[i + 1]], config
+            )
+            entry = store.get(data_fingerprint)
+            if entry is not None:
+                rows[key] = entry["forecast"]
+                continue
+        if model in batched and panel.lengths[i] >= MODEL_REGISTRY[model].min_obs:
+            # Closed-form fits, nothing to warm-start: fitted below in one batch
+            batched[model][key] = (i, data_fingerprint)
+            continue
+        if store is not None:
+            previous = store.latest(key)
+            if warm_start is None and previous and previous["model"] == model:
+                warm_start = previous["state"]
+
+        single.setdefault(model, {})[key] = (i, warm_start, data_fingerprint)
+
+    # Other models one series at a time, in `n_jobs` processes (see fit_many)
+    for model, members in single.items():
+        frames = {key: panel.series_frame(i) for key, (i, _, _) in members.items()}
+        dates = {
+            key: future_dates(frame["date"].iloc[-1], horizon)
+            for key, frame in frames.items()
+        }
+        designs = {
+            key: backend_design(model, frame, dates[key], features=features, key=key)
+            for key, frame in frames.items()
+        }
+        backends = fit_many(
+            {
+                key: (designs[key].iloc[: len(frame)], frame["value"])
+                for key, frame in frames.items()
+            },
+            model,
+            n_jobs=n_jobs,
+            warm_starts={key: start for key, (_, start, _) in members.items()},
+        )
+        for key, (_, _, data_fingerprint) in members.items():
+            backend, n, X_all = backends[key], len(frames[key]), designs[key]
+            fitted[key] = backend
+            predictions = np.asarray(backend.predict(X_all))[n:]
+            lower, upper = backend.interval(X_all)
+            result = pd.DataFrame(
+                {
+                    **_key_columns(key),
+                    "date": dates[key],
+                    "Forecast": predictions,
+                    "Lower_Bound": np.asarray(lower)[n:],
+                    "Upper_Bound": np.asarray(upper)[n:],
+                    "model": backend.name,
+                }
+            )
+            rows[key] = result
+            if store is not None:
+                store.put(
+                    data_fingerprint,
+                    key,
+                    model,
+                    {"model": model, "state": backend.state, "forecast": result},
+                )
+
+    for model, members in batched.items():
+        if not members:
+            continue
+        ids = [i for i, _ in members.values()]
+        forecast, states = forecast_panel(
+            panel.take(ids), model, horizon, return_states=True
+        )
+        for j, (key, (_, data_fingerprint)) in enumerate(members.items()):
+            result = forecast.iloc[j * horizon : (j + 1) * horizon]
+            rows[key] = result.reset_index(drop=True)
+            if store is not None:
+                store.put(
+                    data_fingerprint,
+                    key,
+                    model,
+                    {"model": model, "state": states[j], "forecast": rows[key]},
+                )
+
+    ordered = [rows[panel.key(i)] for i in range(panel.n_series)]
+    forecast = pd.concat(ordered, ignore_index=True) if ordered else pd.DataFrame()
+    return forecast, fitted
+
+
+# Models forecast_panel fits over all series at once: closed form, or
+# batched IRLS for the robust ones
+PANEL_MODELS = ("naive", "linear", "huber", "quantile")
+ROBUST_MODELS = ("huber", "quantile")
+
+
+def panel_trend(panel):
+    """
+    Least-squares linear trend of every series in a Panel, on years since
+    each series' first date. Returns (t per observation, intercepts,
+    slopes); series with a single distinct date get a zero slope.
+    """
+    ids, lengths = panel.series_ids, panel.lengths
+    origin = panel.dates[panel.offsets[:-1]]
+    t = (panel.dates - origin[ids]) // DAY_NS / DAYS_PER_YEAR
+    t_mean = np.bincount(ids, t, minlength=panel.n_series) / lengths
+    y_mean = np.bincount(ids, panel.values, minlength=panel.n_series) / lengths
+    dt, dy = t - t_mean[ids], panel.values - y_mean[ids]
+    sxx = np.bincount(ids, dt * dt, minlength=panel.n_series)
+    sxy = np.bincount(ids, dt * dy, minlength=panel.n_series)
+    slope = np.divide(sxy, sxx, out=np.zeros_like(sxx), where=sxx > 0)
+    return t, y_mean - slope * t_mean, slope
+
+
+def _panel_robust_trend(panel, loss: str):
+    """Robust trend of every series: (t, intercepts, slopes, robust scales)."""
+    from src.robust import irls
+
+    t, _, _ = panel_trend(panel)
+    ids, positions = panel.series_ids, panel.positions
+    # Pad the series to one (series, rows, [1, t]) stack for batched IRLS
+    shape = (panel.n_series, int(panel.lengths.max()))
+    X = np.zeros(shape + (2,))
+    y, mask = np.zeros(shape), np.zeros(shape, dtype=bool)
+    X[ids, positions, 0] = 1.0
+    X[ids, positions, 1] = t
+    y[ids, positions] = panel.values
+    mask[ids, positions] = True
+    beta, scale, _ = irls(X, y, mask, loss=loss)
+    return t, beta[:, 0], beta[:, 1], scale
+
+
+def forecast_panel(
+    panel,
+    model: str = "linear",
+    horizon: int = 3,
+    z: float = 1.96,
+    return_states: bool = False,
+):
+    """
+    Batch forecast of every series in a Panel (see src/panel.py) with a
+    naive, linear or robust (huber, quantile) trend model, fitted on the
+    flat arrays. Same output layout and numbers as `forecast_series` with
+    that model. With `return_states`, returns (forecast, [state per
+    series]), each state as the model's backend would set it.
+    """
+    if model not in PANEL_MODELS:
+        raise ValueError(f"forecast_panel supports {PANEL_MODELS}, not '{model}'")
+    ids, lengths = panel.series_ids, panel.lengths
+    y = panel.values
+    last = panel.offsets[1:] - 1
+    origin = panel.dates[panel.offsets[:-1]]
+
+    last_dates = pd.DatetimeIndex(panel.dates[last].view("datetime64[ns]"))
+    future = np.stack(
+        [
+            (last_dates + pd.DateOffset(years=step)).as_unit("ns").asi8
+            for step in range(1, horizon + 1)
+        ],
+        axis=1,
+    )
+    t_future = (future - origin[:, None]) // DAY_NS / DAYS_PER_YEAR
+
+    if model == "naive":
+        previous = np.concatenate([y[:1], y[:-1]])
+        previous[panel.offsets[:-1]] = y[panel.offsets[:-1]]
+        residuals = y - previous
+        predictions = np.repeat(y[last][:, None], horizon, axis=1)
+    elif model in ROBUST_MODELS:
+        t, intercept, slope, robust_std = _panel_robust_trend(panel, model)
+        residuals = y - (intercept[ids] + slope[ids] * t)
+        predictions = intercept[:, None] + slope[:, None] * t_future
+    else:
+        t, intercept, slope = panel_trend(panel)
+        residuals = y - (intercept[ids] + slope[ids] * t)
+        predictions = intercept[:, None] + slope[:, None] * t_future
+    resid_mean = np.bincount(ids, residuals) / lengths
+    resid_std = np.sqrt(np.bincount(ids, (residuals - resid_mean[ids]) ** 2) / lengths)
+    if model in ROBUST_MODELS:
+        resid_std = robust_std
+
+    n_series = panel.n_series
+    rows = np.repeat(np.arange(n_series), horizon)
+    keys = panel.key_frame().iloc[rows].reset_index(drop=True)
+    margin = np.repeat(z * resid_std, horizon)
+    forecast = predictions.ravel()
+    forecast = keys.astype(object).assign(
+        date=future.ravel().view("datetime64[ns]"),
+        Forecast=forecast,
+        Lower_Bound=forecast - margin,
+        Upper_Bound=forecast + margin,
+        model=model,
+    )
+    if not return_states:
+        return forecast
+    if model == "naive":
+        states = [
+            {"last": float(value), "resid_std": float(std)}
+            for value, std in zip(y[last], resid_std)
+        ]
+    else:
+        states = [
+            {"coef": np.array([b]), "intercept": float(a), "resid_std": float(std)}
+            for a, b, std in zip(intercept, slope, resid_std)
+        ]
+    return forecast, states
+
+
+def _key_columns(key) -> dict:
+    key = key if isinstance(key, tuple) else (key,)
+    return dict(zip(SERIES_KEYS, key))
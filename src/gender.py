@@ -0,0 +1,133 @@
+"""
+Gender and location gap analytics.
+
+Gaps come from two places in the unified dataset:
+
+  - derived: indicators observed for both slices of a breakdown, where the
+    gap is male - female (gender) or urban - rural (location);
+  - reported: GENDER pillar indicators that are themselves gaps (those
+    with indicator_direction "lower_better", e.g. GEN_GAP_ACC).
+
+All gap series of all markets are built in one grouped pass, and their
+trends come from one batched regression over the resulting Panel. A gap
+whose trend points towards zero gets a projected closure date.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data import get_observations
+from src.forecast import DAY_NS, DAYS_PER_YEAR, panel_trend
+from src.panel import Panel
+
+# Slice pairs of each breakdown, gap = first - second
+GAP_PAIRS = {"gender": ("male", "female"), "location": ("urban", "rural")}
+GAP_KEYS = ["country", "indicator_code", "dimension", "source"]
+
+
+def slice_gaps(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per gap series and date: GAP_KEYS, date and gap. Several
+    observations of one slice on the same date are averaged.
+    """
+    obs = get_observations(raw).dropna(subset=["observation_date", "value_numeric"])
+    for dimension in GAP_PAIRS:
+        obs[dimension] = obs[dimension].astype("string").str.lower()
+
+    # Stack both breakdowns so a single groupby covers every slice
+    sliced = pd.concat(
+        [
+            obs[obs[dimension].isin(pair)].assign(
+                dimension=dimension, slice=obs[dimension]
+            )
+            for dimension, pair in GAP_PAIRS.items()
+        ]
+    )
+    levels = (
+        sliced.groupby(
+            ["country", "indicator_code", "dimension", "observation_date", "slice"]
+        )["value_numeric"]
+        .mean()
+        .unstack("slice")
+        .reindex(columns=[s for pair in GAP_PAIRS.values() for s in pair])
+    )
+    dimension = levels.index.get_level_values("dimension")
+    gap = np.where(
+        dimension == "gender",
+        levels["male"] - levels["female"],
+        levels["urban"] - levels["rural"],
+    )
+    derived = pd.DataFrame({"gap": gap}, index=levels.index).dropna().reset_index()
+    derived["source"] = "derived"
+
+    reported_mask = (obs["pillar"] == "GENDER") & (
+        obs["indicator_direction"] == "lower_better"
+    )
+    reported = (
+        obs[reported_mask]
+        .groupby(["country", "indicator_code", "observation_date"])["value_numeric"]
+        .mean()
+        .rename("gap")
+        .reset_index()
+        .assign(dimension="gender", source="reported")
+    )
+
+    gaps = pd.concat([derived, reported], ignore_index=True)
+    return gaps.rename(columns={"observation_date": "date"})[GAP_KEYS + ["date", "gap"]]
+
+
+def gap_summary(gaps: pd.DataFrame) -> pd.DataFrame:
+    """
+    Latest gap, trend (per year) and projected closure date of every gap
+    series. `status` is closing, widening, flat or insufficient_data (one
+    distinct date).
+    """
+    columns = GAP_KEYS + [
+        "n_obs",
+        "first_date",
+        "last_date",
+        "latest_gap",
+        "trend_per_year",
+        "years_to_close",
+        "closure_date",
+        "status",
+    ]
+    if gaps.empty:
+        return pd.DataFrame(columns=columns)
+
+    panel = Panel.from_frame(gaps, keys=GAP_KEYS, value_col="gap")
+    t, intercept, slope = panel_trend(panel)
+    first, last = panel.offsets[:-1], panel.offsets[1:] - 1
+    t_last = t[last]
+    fitted_last = intercept + slope * t_last
+
+    single = t_last == 0
+    closing = ~single & (slope != 0) & (np.sign(slope) == -np.sign(fitted_last))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        years_left = np.where(closing, -fitted_last / slope, np.nan)
+    closure_ns = panel.dates[last] + np.nan_to_num(years_left) * DAYS_PER_YEAR * DAY_NS
+    # Closures beyond the representable date range stay NaT (years_to_close is set)
+    representable = closing & (closure_ns < pd.Timestamp.max.value)
+    closure = pd.to_datetime(np.where(representable, closure_ns, 0).astype("int64"))
+    closure = closure.where(representable)
+
+    status = np.select(
+        [single, closing, slope == 0],
+        ["insufficient_data", "closing", "flat"],
+        "widening",
+    )
+    summary = panel.key_frame().astype(object)
+    summary["n_obs"] = panel.lengths
+    summary["first_date"] = panel.dates[first].view("datetime64[ns]")
+    summary["last_date"] = panel.dates[last].view("datetime64[ns]")
+    summary["latest_gap"] = panel.values[last]
+    summary["trend_per_year"] = np.where(single, np.nan, slope)
+    summary["years_to_close"] = years_left
+    summary["closure_date"] = closure
+    summary["status"] = status
+    return summary[columns]
+
+
+def gap_analytics(raw: pd.DataFrame) -> pd.DataFrame:
+    """Gap summary of every market and indicator with a breakdown."""
+    return gap_summary(slice_gaps(raw))
@@ -0,0 +1,377 @@
+"""
+Streaming ingestion of new observations.
+
+Operators deliver observation records in the unified schema, as JSON lines
+on stdin or as .jsonl/.csv files dropped into an inbox directory. Each
+micro-batch is validated, appended to the source dataset (CSV or
+partitioned), and the published outputs are updated incrementally:
+
+  - per-series tables (model_selection, series_forecast, series_quantiles,
+    impact_estimates)
+    are recomputed for the affected series only, reusing the selection
+    cache, model store and feature store; other series' rows are carried
+    over from the current version unchanged;
+  - the summary index folds the new observations into the affected rows;
+  - aggregate tables (inclusion_forecast, impact_matrix, gap_analytics)
+    are recomputed, which is cheap next to the per-series models.
+
+The result is published as a new version, so readers switch atomically.
+Everything is validated and computed from the already loaded dataset plus
+the batch before anything is written; the batch is appended to the source
+only once its version is published. A batch that fails at any point can
+be retried: until the append, its records are not in the source, so they
+are not rejected as duplicates.
+"""
+
+import json
+import logging
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data import (
+    DEFAULT_COUNTRY,
+    DEFAULT_DATA_PATH,
+    PROJECT_ROOT,
+    SERIES_KEYS,
+    filter_records,
+    get_events,
+    load_data,
+    resolve_path,
+    write_partitioned,
+)
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("record_id", "indicator_code", "observation_date", "value_numeric")
+# Descriptive fields copied from earlier records of the same indicator
+INDICATOR_FIELDS = ("pillar", "indicator", "indicator_direction", "unit")
+REFERENCE_CODES = PROJECT_ROOT / "data/raw/reference_codes.csv"
+INBOX_SUFFIXES = (".jsonl", ".json", ".csv")
+# Why a line or file could not be parsed; validate_records rejects the record
+PARSE_ERROR = "parse_error"
+
+
+def parse_line(line: str) -> dict:
+    """
+    One JSON-line record. A line that is not a JSON object becomes a record
+    with the `raw` line and its PARSE_ERROR, so it is rejected, not raised.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as exc:
+        return {"raw": line.rstrip("\n"), PARSE_ERROR: f"malformed JSON: {exc}"}
+    if not isinstance(record, dict):
+        return {"raw": line.rstrip("\n"), PARSE_ERROR: "not a JSON object"}
+    return record
+
+
+def read_records(path) -> pd.DataFrame:
+    """
+    Records from a .jsonl/.json (JSON lines) or .csv drop file. Malformed
+    lines, or a whole unreadable CSV, become records rejected with a reason.
+    """
+    path = Path(path)
+    try:
+        if path.suffix == ".csv":
+            return pd.read_csv(path, dtype=str)
+        lines = path.read_text(errors="replace").splitlines()
+    except ValueError as exc:
+        error = f"unreadable file: {type(exc).__name__}: {exc}"
+        return pd.DataFrame([{"raw": path.name, PARSE_ERROR: error}])
+    return pd.DataFrame([parse_line(line) for line in lines if line.strip()])
+
+
+def validate_records(records: pd.DataFrame, existing: pd.DataFrame):
+    """
+    Split incoming records into (valid, rejected). Valid records are
+    observations with an id not seen before, a parseable date, a finite
+    value and an indicator that is either known or comes with a valid
+    pillar; their descriptive fields are completed from earlier records of
+    the same indicator. Rejected records carry a `reason` column; records
+    that could not be parsed (see parse_line) keep their PARSE_ERROR as it.
+    """
+    records = records.reset_index(drop=True).copy()
+    parse_errors = records.pop(PARSE_ERROR) if PARSE_ERROR in records else None
+    for column in REQUIRED_FIELDS + ("record_type", "pillar", *SERIES_KEYS):
+        if column not in records.columns:
+            records[column] = np.nan
+    records["record_type"] = records["record_type"].fillna("observation")
+    records["country"] = records["country"].fillna(DEFAULT_COUNTRY)
+    dates = pd.to_datetime(records["observation_date"], format="mixed", errors="coerce")
+    values = pd.to_numeric(records["value_numeric"], errors="coerce")
+
+    known = existing.drop_duplicates("indicator_code", keep="last").set_index(
+        "indicator_code"
+    )
+    for field in INDICATOR_FIELDS:
+        if field not in records.columns:
+            records[field] = np.nan
+        records[field] = records[field].fillna(
+            records["indicator_code"].map(known[field])
+        )
+    valid_pillars = _reference_codes("pillar")
+
+    reason = pd.Series("", index=records.index, dtype=object)
+    if parse_errors is not None:
+        reason = parse_errors.fillna("").astype(object)
+    checks = [
+        (records[list(REQUIRED_FIELDS)].isna().any(axis=1), "missing required field"),
+        (records["record_type"] != "observation", "only observations can be ingested"),
+        (dates.isna(), "unparseable observation_date"),
+        (~np.isfinite(values), "non-numeric value_numeric"),
+        (records["record_id"].isin(existing["record_id"]), "duplicate record_id"),
+        (records["record_id"].duplicated(), "duplicate record_id in batch"),
+        (
+            ~records["pillar"].isin(valid_pillars),
+            "unknown indicator_code without a valid pillar",
+        ),
+    ]
+    for failed, message in checks:
+        reason = reason.mask(failed & (reason == ""), message)
+
+    ok = reason == ""
+    valid = records[ok].drop(columns="raw", errors="ignore")
+    valid = valid.assign(observation_date=dates[ok], value_numeric=values[ok])
+    rejected = records[~ok].assign(reason=reason[~ok])
+    return valid.reset_index(drop=True), rejected.reset_index(drop=True)
+
+
+def _reference_codes(field: str) -> set:
+    codes = pd.read_csv(REFERENCE_CODES)
+    return set(codes.loc[codes["field"] == field, "code"])
+
+
+def check_appendable(records: pd.DataFrame, data_path):
+    """Raise ValueError if `records` cannot be appended to the source dataset."""
+    path = resolve_path(data_path)
+    if path.is_dir():
+        return
+    columns = pd.read_csv(path, nrows=0).columns
+    if "country" not in columns and (records["country"] != DEFAULT_COUNTRY).any():
+        raise ValueError(
+            f"{path} has no country column; ingest other markets into a "
+            "partitioned dataset (python -m src partition)"
+        )
+
+
+def append_records(records: pd.DataFrame, data_path, columns):
+    """
+    Append validated records to the CSV or partitioned source dataset,
+    whose records (as loaded by `load_data`) have `columns`.
+    """
+    check_appendable(records, data_path)
+    path = resolve_path(data_path)
+    if path.is_dir():
+        write_partitioned(records.reindex(columns=columns), path, append=True)
+        return
+    rows = records.reindex(columns=pd.read_csv(path, nrows=0).columns)
+    rows["observation_date"] = rows["observation_date"].dt.strftime("%Y-%m-%d")
+    rows.to_csv(path, mode="a", header=False, index=False)
+
+
+def _parse_dates(frame: pd.DataFrame) -> pd.DataFrame:
+    """Published CSVs come back with string dates; parse the date columns."""
+    for column in frame.columns:
+        if column == "date" or column.endswith("_date"):
+            frame[column] = pd.to_datetime(frame[column], format="mixed")
+    return frame
+
+
+def _replace_series(table: pd.DataFrame, new: pd.DataFrame, affected: set):
+    """Rows of `table` for unaffected series, followed by `new`, in key order."""
+    if table.empty or not set(SERIES_KEYS) <= set(table.columns):
+        return new
+    keys = list(table[SERIES_KEYS].astype(str).itertuples(index=False, name=None))
+    kept = table[[key not in affected for key in keys]]
+    merged = pd.concat([_parse_dates(kept), new], ignore_index=True)
+    return merged.sort_values(SERIES_KEYS, kind="stable").reset_index(drop=True)
+
+
+def ingest_batch(
+    records: pd.DataFrame,
+    data_path=DEFAULT_DATA_PATH,
+    output_dir="data/processed",
+    budget_seconds=10.0,
+) -> dict:
+    """
+    Validate, publish and append one micro-batch. Returns a summary with
+    the accepted/rejected counts, affected series, rejected records and
+    the published version ("" when nothing was accepted). Outputs are
+    recomputed with the model and country/indicator filters of the run
+    that published them (see run_pipeline); accepted records outside those
+    filters are only appended to the source. Raises
+    FileNotFoundError, before touching the source, if nothing has been
+    published to `output_dir` yet (run the pipeline first).
+    """
+    from src.estimation import estimate_effects
+    from src.features import FeatureStore
+    from src.forecast import forecast_series
+    from src.gender import gap_analytics
+    from src.modeling import InclusionModeler, usage_score
+    from src.panel import Panel
+    from src.publish import open_version, publish
+    from src.quantiles import quantile_grid
+    from src.scenarios import impact_links
+    from src.selection import select_models, selected_models
+    from src.store import ModelStore
+    from src.summary import build_summary, update_summary, with_usage
+
+    output_dir = resolve_path(output_dir)
+    pinned = open_version(output_dir)
+    existing = load_data(data_path)
+    valid, rejected = validate_records(records, existing)
+    summary = {
+        "accepted": len(valid),
+        "rejected": len(rejected),
+        "rejects": rejected,
+        "series": [],
+        "version": "",
+    }
+    if valid.empty:
+        return summary
+    check_appendable(valid, data_path)
+    run = pinned.manifest.get("run", {})
+    scope = {key: run.get(key) for key in ("countries", "indicators")}
+    in_scope = filter_records(valid, **scope)
+    if in_scope.empty:
+        append_records(valid, data_path, existing.columns)
+        return summary
+
+    # The dataset as it will be after the append, without reading it again,
+    # restricted to what the published run covers
+    raw = filter_records(
+        pd.concat(
+            [existing, valid.reindex(columns=existing.columns)], ignore_index=True
+        ),
+        **scope,
+    )
+    affected = set(
+        in_scope[SERIES_KEYS]
+        .fillna("all")
+        .astype(str)
+        .itertuples(index=False, name=None)
+    )
+    panel = Panel.from_observations(raw)
+    panel = panel.take([i for i in range(panel.n_series) if panel.key(i) in affected])
+    series = panel.to_series_dict()
+    summary["series"] = sorted(series)
+
+    tables = {name: pinned.read(name) for name in pinned.names}
+
+    events = get_events(raw)["observation_date"].dropna()
+    features = FeatureStore(output_dir / "features", events=events)
+    selection = select_models(
+        series,
+        budget_seconds=budget_seconds,
+        cache_path=output_dir / "model_selection_cache.json",
+        events=events,
+    )
+    with ModelStore(output_dir / "model_store.sqlite") as store:
+        forecast, _ = forecast_series(
+            panel, selected_models(selection), store=store, features=features
+        )
+    links = impact_links(raw)
+    estimates = estimate_effects(series, links)
+    updates = {
+        "model_selection": selection.drop(columns="series"),
+        "series_forecast": forecast,
+        "series_quantiles": quantile_grid(forecast),
+        "impact_estimates": estimates,
+    }
+    for name, new in updates.items():
+        tables[name] = (
+            _replace_series(tables[name], new, affected) if name in tables else new
+        )
+
+    daily = usage_score(raw)
+    tables["inclusion_forecast"] = InclusionModeler(
+        daily, model=run.get("model", "linear"), feature_store=features
+    ).forecast_with_confidence()
+    tables["impact_matrix"] = InclusionModeler(
+        daily, feature_store=features
+    ).analyze_impact()
+    tables["gap_analytics"] = gap_analytics(raw)
+    tables["summary_index"] = with_usage(
+        (
+            update_summary(_parse_dates(tables["summary_index"]), in_scope, links)
+            if "summary_index" in tables
+            else build_summary(raw)
+        ),
+        tables["inclusion_forecast"],
+    )
+
+    summary["version"] = publish(tables, output_dir, pinned.manifest["format"], run=run)
+    append_records(valid, data_path, existing.columns)
+    logger.info(
+        json.dumps(
+            {
+                "event": "ingest",
+                "accepted": summary["accepted"],
+                "rejected": summary["rejected"],
+                "series": len(summary["series"]),
+                "version": summary["version"],
+            }
+        )
+    )
+    return summary
+
+
+def ingest_stream(stream=None, batch_size=500, **kwargs):
+    """
+    Ingest JSON-line records from `stream` (stdin by default) in micro-batches
+    of up to `batch_size` records. Yields each batch summary.
+    """
+    stream = stream or sys.stdin
+    batch = []
+    for line in stream:
+        if line.strip():
+            batch.append(parse_line(line))
+        if len(batch) >= batch_size:
+            yield ingest_batch(pd.DataFrame(batch), **kwargs)
+            batch = []
+    if batch:
+        yield ingest_batch(pd.DataFrame(batch), **kwargs)
+
+
+def ingest_inbox(inbox, **kwargs) -> dict:
+    """
+    Ingest every file waiting in `inbox` as one micro-batch. Processed files
+    move to `inbox/processed/`; rejected records are written next to them
+    as `<file>.rejects.jsonl`.
+    """
+    inbox = Path(inbox)
+    files = sorted(
+        (p for p in inbox.iterdir() if p.suffix in INBOX_SUFFIXES),
+        key=lambda p: p.stat().st_mtime,
+    )
+    if not files:
+        return None
+    frames = [read_records(path).assign(_source=path.name) for path in files]
+    summary = ingest_batch(pd.concat(frames, ignore_index=True), **kwargs)
+
+    done = inbox / "processed"
+    done.mkdir(exist_ok=True)
+    rejects = summary["rejects"]
+    for path in files:
+        own = rejects[rejects["_source"] == path.name].drop(columns="_source")
+        if not own.empty:
+            own.to_json(
+                done / f"{path.name}.rejects.jsonl", orient="records", lines=True
+            )
+        shutil.move(path, done / path.name)
+    return summary
+
+
+def watch_inbox(inbox, interval=5.0, **kwargs):
+    """Poll `inbox` every `interval` seconds and ingest new files (runs forever)."""
+    Path(inbox).mkdir(parents=True, exist_ok=True)
+    while True:
+        summary = ingest_inbox(inbox, **kwargs)
+        if summary is not None:
+            yield summary
+        time.sleep(interval)
@@ -1,22 +1,77 @@
 import pandas as pd
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from src.backends import get_model
+from src.data import (
+    DEFAULT_DATA_PATH,
+    MODEL_COLUMNS,
+    filter_records,
+    get_events,
+    load_data,
+    resolve_path,
+)
+from src.engine import aggregate_usage
+from src.estimation import estimate_effects
+from src.features import FeatureStore, compute_features
+from src.forecast import ROBUST_MODELS, forecast_series
+from src.gender import gap_analytics
+from src.panel import Panel
+from src.profiling import PipelineProfiler
+from src.publish import publish
+from src.quantiles import quantile_grid
+from src.robust import mad_anomalies
+from src.scenarios import impact_links
+from src.selection import select_models, selected_models
+from src.store import ModelStore
+from src.summary import build_summary, with_usage
+
+# Tables written by run_pipeline, by output name
+OUTPUT_NAMES = (
+    "gap_analytics",
+    "impact_estimates",
+    "impact_matrix",
+    "inclusion_forecast",
+    "model_selection",
+    "series_forecast",
+    "series_quantiles",
+    "summary_index",
+)
 
 
 class InclusionModeler:
-    def __init__(self, df):
+    # Engineered features, by feature store name (see src/features.py)
+    FEATURES = ("day_of_week", "month", "lag_1", "rolling_mean_3")
+
+    def __init__(
+        self,
+        df,
+        model="linear",
+        feature_store=None,
+        series_key=("usage_score",),
+        **model_params,
+    ):
         self.df = df.copy()
-        self.model = LinearRegression()
+        # Forecasting backend, see src/backends.py for the registry
+        self.model = get_model(model, **model_params)
+        self.robust = model in ROBUST_MODELS
+        # Shared store so features are computed once across modelers and runs
+        self.feature_store = feature_store
+        self.series_key = series_key
+
+    def features(self, names) -> pd.DataFrame:
+        """Named features for self.df, from the feature store when there is one."""
+        if self.feature_store is None:
+            features = compute_features(self.df, names)
+        else:
+            features = self.feature_store.get(self.series_key, self.df, names)
+        return features.set_axis(self.df.index)
 
     def preprocess(self):
         # Feature Engineering for Financial Inclusion Proxy
-        self.df["day_of_week"] = self.df["date"].dt.dayofweek
-        self.df["month"] = self.df["date"].dt.month
-        self.df["lag_1"] = self.df["value"].shift(1).fillna(0)
-        self.df["rolling_mean_3"] = self.df["value"].rolling(3).mean().fillna(0)
+        features = self.features(self.FEATURES).fillna(0)
+        for name in self.FEATURES:
+            self.df[name] = features[name]
         return self.df
 
     def analyze_impact(self):
@@ -26,10 +81,13 @@ class InclusionModeler:
         X = data[features]
         y = data["value"]
 
-        self.model.fit(X, y)
+        # Coefficients are read off a linear fit whatever the forecasting backend
+        linear = get_model("linear").fit(X, y)
 
         # heatmap data format
-        impact_df = pd.DataFrame({"Feature": features, "Coefficient": self.model.coef_})
+        impact_df = pd.DataFrame(
+            {"Feature": features, "Coefficient": linear.state["coef"]}
+        )
         return impact_df
 
     def forecast_with_confidence(self):
@@ -38,26 +96,29 @@ class InclusionModeler:
         X = data[features]
         y = data["value"]
 
-        # Train
-        self.model.fit(X, y)
+        # Train; robust models also leave out the MAD-flagged anomalies
+        if self.robust:
+            data["anomaly"] = mad_anomalies(y)
+            keep = ~data["anomaly"]
+            self.model.fit(X[keep], y[keep])
+        else:
+            self.model.fit(X, y)
         predictions = self.model.predict(X)
 
         # Calculate Confidence Intervals (95%)
-        residuals = y - predictions
-        std_dev = np.std(residuals)
-        margin_of_error = 1.96 * std_dev
+        lower, upper = self.model.interval(X, z=1.96)
 
         data["Forecast"] = predictions
-        data["Lower_Bound"] = predictions - margin_of_error
-        data["Upper_Bound"] = predictions + margin_of_error
+        data["Lower_Bound"] = lower
+        data["Upper_Bound"] = upper
 
         return data
 
 
-def run_pipeline():
-    print("Loading Data...")
-    # Load your specific file
-    df = pd.read_csv("data/raw/ethiopia_fi_unified_data.csv")
+def usage_score(raw: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate raw records to the daily "Usage Score" series."""
+    # Events and impact links are not measurements
+    df = raw[~raw["record_type"].isin(["event", "impact_link"])].copy()
 
     # MAPPING TO FINANCIAL INCLUSION CONTEXT
     # We treat 'value_numeric' as a proxy for "Digital Financial Service Usage"
@@ -72,19 +133,158 @@ def run_pipeline():
     daily["is_holiday"] = daily["date"].dt.dayofweek.apply(
         lambda x: 1 if x >= 5 else 0
     )  # Mock holiday
+    return daily
+
+
+def run_pipeline(
+    input_path=DEFAULT_DATA_PATH,
+    output_dir="data/processed",
+    countries=None,
+    indicators=None,
+    workers=1,
+    fmt="csv",
+    budget_seconds=60.0,
+    profiler=None,
+    prometheus_path=None,
+    engine="pandas",
+    model="linear",
+):
+    """
+    Run the modeling pipeline on `input_path` (CSV or partitioned dataset),
+    optionally restricted to some countries/indicator codes, and publish the outputs as a new version
+    under `output_dir` (see src/publish.py). Returns the version id.
+
+    The impact matrix, aggregate forecast, per-series and event estimation
+    stages are independent and run concurrently when workers > 1 (-1: all
+    cores); the per-series and estimation stages also use `workers` processes. Each stage is timed by
+    `profiler` (a default PipelineProfiler if None); `prometheus_path` also
+    writes the stage metrics as a Prometheus textfile. With an `engine`
+    other than "pandas" (see src/engine.py), the daily usage score is
+    aggregated by the query engine directly over `input_path`, before and
+    independently of the record frame, which then only holds the columns
+    the per-record stages read (MODEL_COLUMNS). `model` is
+    the backend of the aggregate forecast; a robust one ("huber",
+    "quantile") also adds an `anomaly` flag column to it.
+    """
+    if workers == -1:
+        workers = os.cpu_count() or 1
+    profiler = profiler or PipelineProfiler()
+    output_dir = resolve_path(output_dir)
+    print("Loading Data...")
+    if engine != "pandas":
+        # The usage score never goes through the in-memory record frame
+        with profiler.stage("aggregate") as stage:
+            daily = aggregate_usage(input_path, countries, indicators, engine)
+            stage["rows"] = len(daily)
+
+    with profiler.stage("load") as stage:
+        columns = None if engine == "pandas" else MODEL_COLUMNS
+        raw = filter_records(
+            load_data(input_path, countries=countries, columns=columns),
+            indicators=indicators,
+        )
+        stage["rows"] = len(raw)
 
-    modeler = InclusionModeler(daily)
+    if engine == "pandas":
+        with profiler.stage("aggregate", rows=len(raw)):
+            daily = usage_score(raw)
+    # Event dates for the event-proximity features (see src/features.py)
+    events = get_events(raw)["observation_date"].dropna()
+    features = FeatureStore(output_dir / "features", events=events)
+
+    with profiler.stage("gaps") as stage:
+        gaps = gap_analytics(raw)
+        stage["rows"] = len(gaps)
+
+    with profiler.stage("summary") as stage:
+        summary = build_summary(raw)
+        stage["rows"] = len(summary)
+
+    with profiler.stage("series") as stage:
+        # One Panel of every series: batched forecasts slice its arrays, the
+        # per-series selection and estimation share one dict of frames
+        panel = Panel.from_observations(raw)
+        series = panel.to_series_dict()
+        stage["rows"] = len(panel)
 
     # 1. Impacts
-    impacts = modeler.analyze_impact()
-    impacts.to_csv("data/processed/impact_matrix.csv", index=False)
+    def impacts_stage():
+        with profiler.stage("impacts", rows=len(daily)):
+            return InclusionModeler(daily, feature_store=features).analyze_impact()
 
     # 2. Forecasts with CI
-    forecast = modeler.forecast_with_confidence()
-    forecast.to_csv("data/processed/inclusion_forecast.csv", index=False)
+    def forecast_stage():
+        modeler = InclusionModeler(daily, model=model, feature_store=features)
+        with profiler.stage("preprocess", rows=len(daily)):
+            modeler.preprocess()
+        with profiler.stage("forecast", rows=len(daily)):
+            return modeler.forecast_with_confidence()
+
+    # 3. Per-indicator model selection (cheap models first, budgeted)
+    def series_stage():
+        with profiler.stage("selection") as stage:
+            selection = select_models(
+                series,
+                budget_seconds=budget_seconds,
+                cache_path=output_dir / "model_selection_cache.json",
+                n_jobs=workers,
+                events=events,
+            )
+            stage["rows"] = len(series)
+
+        with profiler.stage("series_forecast", rows=len(series)):
+            # Unchanged series reuse stored fits; changed ones warm-start
+            with ModelStore(output_dir / "model_store.sqlite") as store:
+                series_forecast, _ = forecast_series(
+                    panel,
+                    selected_models(selection),
+                    store=store,
+                    n_jobs=workers,
+                    features=features,
+                )
+        with profiler.stage("quantiles", rows=len(series_forecast)):
+            quantiles = quantile_grid(series_forecast)
+        return selection.drop(columns="series"), series_forecast, quantiles
+
+    # 4. Event effects estimated from the data, next to the impact_link priors
+    def estimation_stage():
+        with profiler.stage("estimation") as stage:
+            estimates = estimate_effects(series, impact_links(raw), n_jobs=workers)
+            stage["rows"] = len(estimates)
+        return estimates
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, 4))) as pool:
+        impacts = pool.submit(impacts_stage)
+        estimates = pool.submit(estimation_stage)
+        forecast = pool.submit(forecast_stage)
+        series_outputs = pool.submit(series_stage)
+        outputs = {
+            "impact_matrix": impacts.result(),
+            "inclusion_forecast": forecast.result(),
+            "impact_estimates": estimates.result(),
+            "gap_analytics": gaps,
+        }
+        # The KPI row reads the usage score's statistics from the index
+        outputs["summary_index"] = with_usage(summary, outputs["inclusion_forecast"])
+        (
+            outputs["model_selection"],
+            outputs["series_forecast"],
+            outputs["series_quantiles"],
+        ) = series_outputs.result()
+
+    with profiler.stage("write") as stage:
+        # Snapshot + atomic swap: readers never see a half-written run
+        run = {"model": model, "countries": countries, "indicators": indicators}
+        version = publish(outputs, output_dir, fmt, run=run)
+        stage["rows"] = sum(len(frame) for frame in outputs.values())
+
+    if prometheus_path:
+        profiler.write_prometheus(prometheus_path)
 
     print("✅ Pipeline Complete: Generated forecasts with confidence intervals.")
+    return version
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     run_pipeline()
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pandas as pd
+
+# File extension per supported output format
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Outputs fitted on the whole (shard) dataset rather than per series
+AGGREGATE_OUTPUTS = ("impact_matrix", "inclusion_forecast")
+
+# Outputs always stored as compact Parquet, whatever the format of the rest
+COMPACT_OUTPUTS = ("series_quantiles",)
+
+
+def write_output(df: pd.DataFrame, output_dir, name: str, fmt: str = "csv") -> Path:
+    """Write `df` as `<output_dir>/<name>.<ext>` in the requested format."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Choose from {', '.join(FORMATS)}")
+    if name in COMPACT_OUTPUTS:
+        from src.quantiles import write_quantiles
+
+        return write_quantiles(df, Path(output_dir) / f"{name}{FORMATS['parquet']}")
+    path = Path(output_dir) / f"{name}{FORMATS[fmt]}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(path)
+    return path
+
+
+def read_output(output_dir, name: str) -> pd.DataFrame:
+    """Read `<output_dir>/<name>` in whichever supported format it was written."""
+    for fmt, ext in FORMATS.items():
+        path = Path(output_dir) / f"{name}{ext}"
+        if path.exists():
+            if fmt == "csv":
+                return pd.read_csv(path)
+            if fmt == "parquet":
+                return pd.read_parquet(path)
+            return pd.read_feather(path)
+    raise FileNotFoundError(f"No output named '{name}' in {output_dir}")
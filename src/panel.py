@@ -0,0 +1,276 @@
+"""
+Compact array-backed container for many short time series.
+
+A Panel holds every series in three flat arrays, CSR style:
+
+    values   float64, all observations, series after series
+    dates    int64 nanoseconds since the epoch, ascending within a series
+    offsets  int64, series i is values[offsets[i]:offsets[i + 1]]
+
+plus one categorical array per key column (one entry per series). Slicing
+a series returns views, and conversions to pandas/Arrow share the value
+and date buffers instead of copying them (both ways for Arrow tables that
+are already in panel order, e.g. written by `to_arrow`).
+
+The modeling pipeline builds one Panel of all series (`from_observations`);
+`forecast_series` fits the batchable models on sub-panels (`take`) and the
+per-series stages read `to_series_dict`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data import SERIES_KEYS, get_observations
+
+# Period codes for `Panel.resample`, by pandas offset alias
+RESAMPLE_PERIODS = {"YS": "Y", "QS": "Q", "MS": "M", "W": "W"}
+RESAMPLE_HOW = ("last", "first", "mean", "sum", "min", "max")
+
+
+class Panel:
+    def __init__(self, keys: dict, dates, values, offsets):
+        # {key column: pd.Categorical with one entry per series}
+        self.keys = keys
+        self.dates = np.asarray(dates, dtype=np.int64)
+        self.values = np.asarray(values, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if len(self.dates) != len(self.values) or self.offsets[-1] != len(self):
+            raise ValueError("dates, values and offsets do not describe one panel")
+
+    # --- construction ---
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, keys=SERIES_KEYS, date_col="date", value_col="value"
+    ) -> "Panel":
+        """Build from a long frame with one row per (series, date)."""
+        keys = list(keys)
+        key_frame = df[keys].fillna("all").astype(str)
+        codes, uniques = pd.MultiIndex.from_frame(key_frame).factorize(sort=True)
+        dates = pd.to_datetime(df[date_col]).to_numpy("datetime64[ns]").view("i8")
+        order = np.lexsort((dates, codes))
+        counts = np.bincount(codes, minlength=len(uniques))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        key_arrays = {
+            name: pd.Categorical(uniques.get_level_values(i))
+            for i, name in enumerate(keys)
+        }
+        values = df[value_col].to_numpy(dtype=float)
+        return cls(key_arrays, dates[order], values[order], offsets)
+
+    @classmethod
+    def from_observations(cls, raw: pd.DataFrame, keys=SERIES_KEYS) -> "Panel":
+        """Observations of the unified dataset, one series per key (see get_series)."""
+        obs = get_observations(raw).dropna(subset=["observation_date", "value_numeric"])
+        return cls.from_frame(obs, keys, "observation_date", "value_numeric")
+
+    @classmethod
+    def from_series(cls, series: dict, keys=SERIES_KEYS) -> "Panel":
+        """From {key tuple: DataFrame[date, value]}, as returned by get_series."""
+        frames = list(series.values())
+        lengths = [len(frame) for frame in frames]
+        tuples = [key if isinstance(key, tuple) else (key,) for key in series]
+        key_arrays = {
+            name: pd.Categorical([key[i] for key in tuples])
+            for i, name in enumerate(keys[: len(tuples[0])] if tuples else keys)
+        }
+        if not frames:
+            return cls(key_arrays, [], [], [0])
+        dates = np.concatenate(
+            [frame["date"].to_numpy("datetime64[ns]").view("i8") for frame in frames]
+        )
+        values = np.concatenate([frame["value"].to_numpy(float) for frame in frames])
+        return cls(key_arrays, dates, values, np.concatenate([[0], np.cumsum(lengths)]))
+
+    @classmethod
+    def from_arrow(cls, table, keys=SERIES_KEYS) -> "Panel":
+        """
+        From an Arrow table with key, date and value columns. A table in
+        panel order (series contiguous, dates ascending; no nulls) is wrapped
+        without copying its date and value buffers; others are sorted.
+        """
+        import pyarrow as pa
+
+        table = table.combine_chunks()
+        date, value = table.column("date"), table.column("value")
+        if date.null_count or value.null_count or table.num_rows == 0:
+            return cls.from_frame(table.to_pandas(), keys)
+        key_arrays, codes = {}, []
+        for name in keys:
+            column = table.column(name).chunk(0)
+            if not pa.types.is_dictionary(column.type):
+                column = column.dictionary_encode()
+            key_arrays[name] = pd.Categorical.from_codes(
+                column.indices.to_numpy(), column.dictionary.to_pylist()
+            )
+            codes.append(key_arrays[name].codes)
+        dates = date.cast(pa.timestamp("ns")).chunk(0).to_numpy().view("i8")
+        series_start = np.ones(len(dates), dtype=bool)
+        series_start[1:] = np.any([c[1:] != c[:-1] for c in codes], axis=0)
+        keys_order = pd.MultiIndex.from_arrays(
+            [key_arrays[name][series_start] for name in keys]
+        )
+        # Every series one contiguous run, dates ascending within it
+        in_order = (
+            keys_order.is_unique
+            and (series_start[1:] | (dates[1:] >= dates[:-1])).all()
+        )
+        if not in_order:
+            return cls.from_frame(table.to_pandas(), keys)
+        starts = np.flatnonzero(series_start)
+        series_keys = {
+            name: pd.Categorical(np.asarray(column[starts]).astype(str))
+            for name, column in key_arrays.items()
+        }
+        values = value.chunk(0).to_numpy(zero_copy_only=True)
+        return cls(series_keys, dates, values, np.append(starts, len(dates)))
+
+    # --- access ---
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def n_series(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def series_ids(self) -> np.ndarray:
+        """Series index of every observation."""
+        return np.repeat(np.arange(self.n_series), self.lengths)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Position of every observation within its series."""
+        return np.arange(len(self)) - np.repeat(self.offsets[:-1], self.lengths)
+
+    def key(self, i: int) -> tuple:
+        return tuple(column[i] for column in self.keys.values())
+
+    def series(self, i: int):
+        """(dates as datetime64[ns], values) views of series i."""
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return self.dates[start:stop].view("datetime64[ns]"), self.values[start:stop]
+
+    def series_frame(self, i: int) -> pd.DataFrame:
+        """Series i as DataFrame[date, value], the get_series layout."""
+        dates, values = self.series(i)
+        return pd.DataFrame({"date": dates, "value": values})
+
+    def __iter__(self):
+        for i in range(self.n_series):
+            yield (self.key(i), *self.series(i))
+
+    def take(self, ids) -> "Panel":
+        """Sub-panel of the series at positions `ids`, in that order."""
+        ids = np.asarray(ids, dtype=np.int64)
+        lengths = self.lengths[ids]
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        rows = np.arange(offsets[-1]) + np.repeat(
+            self.offsets[ids] - offsets[:-1], lengths
+        )
+        keys = {name: column[ids] for name, column in self.keys.items()}
+        return Panel(keys, self.dates[rows], self.values[rows], offsets)
+
+    def row_hashes(self) -> np.ndarray:
+        """
+        Hash of every (date, value) observation: hashes of series i sliced
+        by the offsets give `fingerprint` of its series frame.
+        """
+        frame = pd.DataFrame(
+            {"date": self.dates.view("datetime64[ns]"), "value": self.values}
+        )
+        return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+    # --- conversion ---
+
+    def key_frame(self) -> pd.DataFrame:
+        """One row per series with its key columns."""
+        return pd.DataFrame(self.keys)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long frame: key columns (categorical), date, value."""
+        ids = self.series_ids
+        columns = {
+            name: pd.Categorical.from_codes(column.codes[ids], column.categories)
+            for name, column in self.keys.items()
+        }
+        columns["date"] = self.dates.view("datetime64[ns]")
+        columns["value"] = self.values
+        return pd.DataFrame(columns, copy=False)
+
+    def to_series_dict(self) -> dict:
+        """{key tuple: DataFrame[date, value]}, the get_series layout."""
+        return {self.key(i): self.series_frame(i) for i in range(self.n_series)}
+
+    def to_arrow(self):
+        """Arrow table sharing the date and value buffers; keys dictionary-encoded."""
+        import pyarrow as pa
+
+        ids = self.series_ids
+        columns = {
+            name: pa.DictionaryArray.from_arrays(
+                pa.array(column.codes[ids]), pa.array(column.categories.astype(str))
+            )
+            for name, column in self.keys.items()
+        }
+        columns["date"] = pa.array(self.dates.view("datetime64[ns]"))
+        columns["value"] = pa.array(self.values)
+        return pa.table(columns)
+
+    # --- batch operations ---
+
+    def features(self, names, events=()) -> pd.DataFrame:
+        """
+        Feature-store features (see src/features.py) for every observation,
+        computed in one pass over the flat arrays. Window features are NaN
+        where the window would reach into the previous series.
+        """
+        from src.features import compute_features, context_rows
+
+        frame = pd.DataFrame(
+            {"date": self.dates.view("datetime64[ns]"), "value": self.values}
+        )
+        features = compute_features(frame, names, events)
+        positions = self.positions
+        for name in names:
+            needed = context_rows([name])
+            if needed:
+                features.loc[positions < needed, name] = np.nan
+        return features
+
+    def resample(self, freq: str = "YS", how: str = "last") -> "Panel":
+        """Aggregate every series to period starts (YS, QS, MS or W)."""
+        if freq not in RESAMPLE_PERIODS:
+            raise ValueError(f"Unsupported frequency '{freq}'")
+        if how not in RESAMPLE_HOW:
+            raise ValueError(f"Unsupported aggregation '{how}'")
+        periods = (
+            pd.DatetimeIndex(self.dates.view("datetime64[ns]"))
+            .to_period(RESAMPLE_PERIODS[freq])
+            .start_time.as_unit("ns")
+            .asi8
+        )
+        ids = self.series_ids
+        # Rows are sorted by (series, date), so each bucket is one contiguous run
+        new_bucket = np.ones(len(self), dtype=bool)
+        new_bucket[1:] = (ids[1:] != ids[:-1]) | (periods[1:] != periods[:-1])
+        starts = np.flatnonzero(new_bucket)
+        if how == "last":
+            values = self.values[np.append(starts[1:], len(self)) - 1]
+        elif how == "first":
+            values = self.values[starts]
+        elif how == "mean":
+            values = np.add.reduceat(self.values, starts) / np.diff(
+                np.append(starts, len(self))
+            )
+        else:
+            ufunc = {"sum": np.add, "min": np.minimum, "max": np.maximum}[how]
+            values = ufunc.reduceat(self.values, starts)
+        counts = np.bincount(ids[starts], minlength=self.n_series)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return Panel(self.keys, periods[starts], values, offsets)
@@ -0,0 +1,211 @@
+"""
+Atomic, versioned publishing of pipeline outputs.
+
+Layout under the output root:
+
+    versions/<version>/<name>.<ext>   immutable snapshot of one pipeline run
+    versions/<version>/manifest.json  checksums and row counts per file
+    current -> versions/<version>     symlink swapped atomically on publish
+
+A snapshot is written to a temporary directory and renamed into place
+before `current` is swapped, so readers only ever see complete versions.
+Readers pin a version with `open_version` and read every table from it.
+Versions are ordered by their manifest's creation time; a superseded
+version is kept for at least GRACE_SECONDS, so pins stay readable even
+when publishes come every few seconds (e.g. per ingested micro-batch).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from src.outputs import AGGREGATE_OUTPUTS, read_output, write_output
+from src.summary import with_usage
+
+VERSIONS_DIR = "versions"
+CURRENT_LINK = "current"
+MANIFEST = "manifest.json"
+# Minimum lifetime of a version after a newer one replaced it
+GRACE_SECONDS = 3600.0
+
+
+def new_version_id() -> str:
+    return f"{pd.Timestamp.now('UTC'):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def publish(
+    frames: dict,
+    output_root,
+    fmt: str = "csv",
+    keep: int = 5,
+    grace_seconds: float = GRACE_SECONDS,
+    run: dict = None,
+) -> str:
+    """
+    Write `frames` ({name: DataFrame}) as a new version and make it current,
+    then prune old versions (see `prune_versions`). Returns the version id.
+    `run` (JSON-serialisable, e.g. the pipeline's model and filters) is
+    recorded in the manifest so later updates can reproduce the run.
+    """
+    output_root = Path(output_root)
+    versions = output_root / VERSIONS_DIR
+    versions.mkdir(parents=True, exist_ok=True)
+    version = new_version_id()
+    staging = versions / f".{version}.tmp"
+    staging.mkdir()
+
+    try:
+        files = {}
+        for name, frame in frames.items():
+            path = write_output(frame, staging, name, fmt)
+            files[name] = {
+                "file": path.name,
+                "rows": len(frame),
+                "bytes": path.stat().st_size,
+                "sha256": file_sha256(path),
+            }
+        manifest = {
+            "version": version,
+            "created": pd.Timestamp.now("UTC").isoformat(),
+            "format": fmt,
+            "files": files,
+            "run": run or {},
+        }
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        staging.rename(versions / version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Atomic swap: build the new link beside `current`, then rename over it
+    link = output_root / CURRENT_LINK
+    tmp_link = output_root / f".{CURRENT_LINK}.{uuid.uuid4().hex}"
+    os.symlink(Path(VERSIONS_DIR) / version, tmp_link)
+    os.replace(tmp_link, link)
+
+    prune_versions(output_root, keep, grace_seconds)
+    return version
+
+
+def current_version(output_root) -> str:
+    """Version id `current` points at, or "" if nothing was published."""
+    link = Path(output_root) / CURRENT_LINK
+    if not link.is_symlink():
+        return ""
+    return Path(os.readlink(link)).name
+
+
+def _created(path: Path) -> pd.Timestamp:
+    """Creation time from a version's manifest (its mtime if unreadable)."""
+    try:
+        return pd.Timestamp(json.loads((path / MANIFEST).read_text())["created"])
+    except (OSError, ValueError, KeyError):
+        return pd.Timestamp(path.stat().st_mtime, unit="s", tz="UTC")
+
+
+def list_versions(output_root) -> list:
+    """Published version ids, oldest first (by manifest creation time)."""
+    versions = Path(output_root) / VERSIONS_DIR
+    if not versions.exists():
+        return []
+    paths = [p for p in versions.iterdir() if not p.name.startswith(".")]
+    return [p.name for p in sorted(paths, key=lambda p: (_created(p), p.name))]
+
+
+def prune_versions(output_root, keep: int = 5, grace_seconds: float = GRACE_SECONDS):
+    """
+    Delete versions that are neither among the newest `keep` nor current,
+    and were superseded (a newer version was created) more than
+    `grace_seconds` ago. A reader's pin therefore stays readable for at
+    least `grace_seconds` after its version stopped being current.
+    """
+    root = Path(output_root) / VERSIONS_DIR
+    current = current_version(output_root)
+    versions = list_versions(output_root)
+    now = pd.Timestamp.now("UTC")
+    for version, newer in zip(versions[:-keep], versions[1:]):
+        superseded = _created(root / newer)
+        if version != current and (now - superseded).total_seconds() > grace_seconds:
+            shutil.rmtree(root / version, ignore_errors=True)
+
+
+class PublishedVersion:
+    """A pinned, read-only snapshot of the pipeline outputs."""
+
+    def __init__(self, output_root, version: str):
+        self.version = version
+        self.path = Path(output_root) / VERSIONS_DIR / version
+        manifest_path = self.path / MANIFEST
+        if not manifest_path.exists():
+            raise FileNotFoundError(
+                f"No published version '{version}' in {output_root}"
+            )
+        self.manifest = json.loads(manifest_path.read_text())
+
+    @property
+    def names(self) -> list:
+        return list(self.manifest["files"])
+
+    def read(self, name: str, verify: bool = False) -> pd.DataFrame:
+        """Read one table; with `verify`, check it against the manifest first."""
+        if verify:
+            self.verify(name)
+        return read_output(self.path, name)
+
+    def verify(self, name: str):
+        entry = self.manifest["files"][name]
+        if file_sha256(self.path / entry["file"]) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for {name} in version {self.version}")
+
+
+def open_version(output_root, version: str = None) -> PublishedVersion:
+    """Pin `version`, or whatever is current right now."""
+    version = version or current_version(output_root)
+    if not version:
+        raise FileNotFoundError(f"Nothing has been published to {output_root}")
+    return PublishedVersion(output_root, version)
+
+
+def merge_published(shard_roots: list, output_root, fmt: str = "csv") -> str:
+    """
+    Merge the current versions of pipeline runs sharded by indicator set and
+    publish the result. Per-series tables are concatenated; aggregate tables
+    (fitted per shard) are stacked with a `shard` column naming the source.
+    The usage score is a sum over indicators, so the summary index's usage
+    row is recomputed from the shards' scores summed by date.
+    """
+    pinned = [open_version(root) for root in shard_roots]
+    names = dict.fromkeys(name for version in pinned for name in version.names)
+    merged = {}
+    for name in names:
+        frames = []
+        for root, version in zip(shard_roots, pinned):
+            if name not in version.manifest["files"]:
+                continue
+            frame = version.read(name)
+            if name in AGGREGATE_OUTPUTS:
+                frame.insert(0, "shard", Path(root).name)
+            frames.append(frame)
+        merged[name] = pd.concat(frames, ignore_index=True).drop_duplicates()
+    if {"summary_index", "inclusion_forecast"} <= set(merged):
+        stacked = merged["inclusion_forecast"]
+        usage = (
+            stacked.assign(date=pd.to_datetime(stacked["date"]))
+            .groupby("date", as_index=False)[["value", "Forecast"]]
+            .sum(min_count=1)
+        )
+        merged["summary_index"] = with_usage(merged["summary_index"], usage)
+    return publish(merged, output_root, fmt)
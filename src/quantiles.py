@@ -0,0 +1,112 @@
+"""
+Quantile grids of the per-series forecasts in a compact columnar file.
+
+The forecast bands are normal (a point forecast plus/minus z residual
+standard deviations), so any quantile q of a forecast row is
+
+    Forecast + inv_cdf(q) * (Upper_Bound - Lower_Bound) / (2 * z)
+
+`quantile_grid` expands series_forecast to one row per series and horizon
+with a float32 column per quantile (q05 ... q95). `write_quantiles` stores
+it as Parquet sorted by series, with dictionary-encoded keys, zstd pages
+and small row groups, so `read_quantiles` reads only the requested quantile
+columns of the row groups whose key statistics can match the filter.
+"""
+
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from src.data import SERIES_KEYS
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Band width of the forecasts in standard deviations (see ModelBackend.interval)
+BAND_Z = 1.96
+# Small row groups keep a one-series read to a few KB of pages
+ROW_GROUP_ROWS = 4096
+COMPRESSION = "zstd"
+
+
+def quantile_column(q: float) -> str:
+    """Column name of quantile `q`: q05 for 0.05, q975 for 0.975."""
+    if not 0 < q < 1:
+        raise ValueError(f"Quantile must be in (0, 1), got {q}")
+    digits = f"{q:.6f}".rstrip("0")[2:]
+    return f"q{digits:0<2}"
+
+
+def quantile_grid(
+    forecast: pd.DataFrame, quantiles=QUANTILES, z: float = BAND_Z
+) -> pd.DataFrame:
+    """
+    One row per series and forecast date: the series keys, date, horizon
+    (1 for the first forecast year) and a float32 column per quantile.
+    """
+    columns = [quantile_column(q) for q in quantiles]
+    if forecast.empty:
+        return pd.DataFrame(columns=SERIES_KEYS + ["date", "horizon"] + columns)
+    keys = [c for c in SERIES_KEYS if c in forecast.columns]
+    grid = forecast[keys + ["date"]].reset_index(drop=True)
+    grid["horizon"] = (grid.groupby(keys, sort=False).cumcount() + 1).astype("int16")
+
+    centre = forecast["Forecast"].to_numpy(dtype=float)
+    scale = (
+        forecast["Upper_Bound"].to_numpy(dtype=float)
+        - forecast["Lower_Bound"].to_numpy(dtype=float)
+    ) / (2 * z)
+    normal = NormalDist()
+    for q, column in zip(quantiles, columns):
+        grid[column] = (centre + normal.inv_cdf(q) * scale).astype(np.float32)
+    return grid
+
+
+def write_quantiles(grid: pd.DataFrame, path) -> Path:
+    """
+    Write a quantile grid sorted by series, keys dictionary-encoded. Keys
+    stay plain strings in the Arrow schema: Arrow skips row groups by
+    statistics only for those, the pages are dictionary-encoded either way.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    keys = [c for c in SERIES_KEYS if c in grid.columns]
+    grid = grid.sort_values(keys + ["date"], kind="stable").reset_index(drop=True)
+    table = pa.Table.from_pandas(grid, preserve_index=False)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(
+        table,
+        path,
+        row_group_size=ROW_GROUP_ROWS,
+        compression=COMPRESSION,
+        use_dictionary=keys,
+    )
+    return path
+
+
+def read_quantiles(path, quantiles=None, **keys) -> pd.DataFrame:
+    """
+    Read a quantile grid, optionally only some `quantiles` (levels, e.g.
+    [0.05, 0.95]) of the series matching `keys` (e.g. indicator_code=...,
+    country=...). Row groups whose statistics rule the keys out are skipped.
+    """
+    import pyarrow.parquet as pq
+
+    unknown = set(keys) - set(SERIES_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown series keys {sorted(unknown)}")
+    schema = pq.read_schema(path)
+    stored = [name for name in schema.names if name.startswith("q")]
+    if quantiles is None:
+        values = stored
+    else:
+        values = [quantile_column(q) for q in quantiles]
+        missing = [name for name in values if name not in stored]
+        if missing:
+            raise ValueError(f"Quantiles {missing} not stored; available: {stored}")
+    index = [c for c in SERIES_KEYS + ["date", "horizon"] if c in schema.names]
+    filters = [(key, "=", value) for key, value in keys.items()] or None
+    table = pq.read_table(path, columns=index + values, filters=filters)
+    return table.to_pandas()
@@ -0,0 +1,152 @@
+"""
+Outlier-resistant regression and anomaly flags for noisy operator feeds.
+
+`irls` fits a stack of linear regressions at once by iteratively
+reweighted least squares: each iteration solves the batched weighted
+normal equations, then reweights every row from its residual, scaled by
+the robust (MAD) residual scale of its regression:
+
+    huber     weight 1 within `delta` scales of the fit, delta*s/|r| beyond
+    quantile  check loss of quantile q, weight q/|r| above the fit and
+              (1-q)/|r| below (q = 0.5 is least absolute deviations)
+
+so one report off by 1000x moves the fit by a bounded amount instead of
+dominating it, and the residual scale used for intervals ignores it too.
+
+`mad_anomalies` flags values far from their rolling median, in rolling MAD
+units, series by series but in one grouped pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+LOSSES = ("huber", "quantile")
+# Huber threshold in robust residual scales (95% efficiency under normal errors)
+HUBER_DELTA = 1.345
+# MAD of a normal sample times this estimates its standard deviation
+MAD_SCALE = 1.4826
+MAX_ITER = 100
+TOL = 1e-8
+# Residuals below this many scales count as this size when reweighting, so
+# the quantile weights 1/|r| stay bounded at rows the fit passes through
+SMOOTHING = 1e-3
+ANOMALY_WINDOW = 7
+ANOMALY_THRESHOLD = 5.0
+
+
+def _solve(X, y, w):
+    """Weighted least squares for each regression of the stack: (B, k)."""
+    Xw = X * w[..., None]
+    xtx = np.einsum("bni,bnj->bij", Xw, X)
+    xty = np.einsum("bni,bn->bi", Xw, y)
+    try:
+        return np.linalg.solve(xtx, xty[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        # Some regression of the stack is singular: minimum-norm solutions
+        return np.einsum("bij,bj->bi", np.linalg.pinv(xtx), xty)
+
+
+def _masked_median(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Median of each row over its masked entries (sort-based, unlike nanmedian's loop)."""
+    ordered = np.sort(np.where(mask, values, np.inf), axis=1)
+    count = mask.sum(axis=1)
+    rows = np.arange(len(values))
+    low = ordered[rows, np.maximum(count - 1, 0) // 2]
+    high = ordered[rows, np.maximum(count, 1) // 2 - (count == 0)]
+    return np.where(count > 0, (low + high) / 2, np.nan)
+
+
+def robust_scale(residuals: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """MAD_SCALE * median absolute deviation of each row's masked residuals."""
+    centre = _masked_median(residuals, mask)
+    return MAD_SCALE * _masked_median(np.abs(residuals - centre[:, None]), mask)
+
+
+def irls(
+    X: np.ndarray,
+    y: np.ndarray,
+    mask: np.ndarray = None,
+    loss: str = "huber",
+    delta: float = HUBER_DELTA,
+    quantile: float = 0.5,
+    start: np.ndarray = None,
+    max_iter: int = MAX_ITER,
+    tol: float = TOL,
+):
+    """
+    Robust fits of B regressions padded to n rows: X (B, n, k), y (B, n),
+    `mask` (B, n) marking real rows. Starts from `start` (B, k) or from
+    least squares. Returns (coefficients (B, k), residual scale (B,),
+    final row weights (B, n)).
+    """
+    if loss not in LOSSES:
+        raise ValueError(f"Unknown loss '{loss}', expected one of {LOSSES}")
+    X, y = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+    mask = np.ones(y.shape, dtype=bool) if mask is None else np.asarray(mask, bool)
+    y = np.where(mask, y, 0.0)
+    beta = _solve(X, y, mask.astype(float)) if start is None else np.array(start)
+    weights = mask.astype(float)
+
+    # Iterate only the regressions that have not converged yet
+    active = np.arange(len(y))
+    for _ in range(max_iter):
+        Xa, ya, ma = X[active], y[active], mask[active]
+        residuals = ya - np.einsum("bni,bi->bn", Xa, beta[active])
+        scale = robust_scale(residuals, ma)
+        # Floor keeps exactly fitted rows finite without letting them dominate
+        floor = np.maximum(scale, TOL * (1 + np.abs(ya).max(axis=1)))[:, None]
+        abs_r = np.maximum(np.abs(residuals), SMOOTHING * floor)
+        if loss == "huber":
+            w = np.minimum(1.0, delta * floor / abs_r)
+        else:
+            w = np.where(residuals >= 0, quantile, 1 - quantile) / abs_r
+        weights[active] = np.where(ma, w, 0.0)
+
+        new_beta = _solve(Xa, ya, weights[active])
+        change = np.abs(new_beta - beta[active]) > tol * (1 + np.abs(beta[active]))
+        beta[active] = new_beta
+        active = active[change.any(axis=1)]
+        if not len(active):
+            break
+
+    residuals = y - np.einsum("bni,bi->bn", X, beta)
+    return beta, robust_scale(residuals, mask), weights
+
+
+def mad_anomalies(
+    values,
+    groups=None,
+    window: int = ANOMALY_WINDOW,
+    threshold: float = ANOMALY_THRESHOLD,
+) -> np.ndarray:
+    """
+    Boolean flags (a Hampel filter): values more than `threshold` robust
+    scales from the median of the centred window around them, the scale
+    being the window's MAD (`groups` labels the series of each value; rows
+    of a series must be contiguous and in date order). The window MAD is
+    floored at the series' median window MAD, so windows that happen to
+    have little spread do not flag ordinary noise.
+    """
+    values = np.asarray(values, dtype=float)
+    groups = np.zeros(len(values)) if groups is None else np.asarray(groups)
+    if not len(values):
+        return np.zeros(0, dtype=bool)
+    half = window // 2
+
+    # Lay the series out with `half` NaNs around each, so that every centred
+    # window is one row of a sliding view and never crosses into a neighbour
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    series = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+    positions = np.arange(len(values)) + half * (2 * series + 1)
+    padded = np.full(len(values) + 2 * half * len(starts), np.nan)
+    padded[positions] = values
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    windows = windows[positions - half]
+    real = ~np.isnan(windows)
+
+    centre = _masked_median(windows, real)
+    spread = _masked_median(np.abs(windows - centre[:, None]), real)
+    overall = pd.Series(spread).groupby(series).transform("median").to_numpy()
+    scale = MAD_SCALE * np.maximum(spread, overall)
+    deviation = np.abs(values - centre)
+    return np.where(scale > 0, deviation > threshold * scale, deviation > 0)
@@ -0,0 +1,204 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.backends import MODEL_REGISTRY, get_model, process_pool
+from src.data import SERIES_KEYS, fingerprint
+from src.forecast import backend_design
+
+CHEAP_MODELS = ("naive", "linear", "ridge")
+EXPENSIVE_MODELS = ("ets", "arima", "gbm")
+
+
+def holdout_score(model: str, frame: pd.DataFrame, holdout: float = 0.2, events=()):
+    """
+    Fit `model` on the head of a series and score the held-out tail, on
+    the design it is forecast with (see backend_design, with `events`).
+    Score is the holdout MAE relative to the mean absolute level (lower is
+    better). Returns (score, fit seconds, status).
+    """
+    n_test = max(1, int(round(len(frame) * holdout)))
+    n_train = len(frame) - n_test
+    backend = get_model(model)
+    if n_train < backend.min_obs:
+        return np.nan, 0.0, "too_short"
+
+    X = backend_design(model, frame, events=events)
+    y = frame["value"].to_numpy(dtype=float)
+    start = time.perf_counter()
+    try:
+        backend.fit(X.iloc[:n_train], y[:n_train])
+        predictions = np.asarray(backend.predict(X))[n_train:]
+    except Exception:
+        return np.nan, time.perf_counter() - start, "failed"
+    seconds = time.perf_counter() - start
+
+    scale = np.mean(np.abs(y)) or 1.0
+    score = float(np.mean(np.abs(y[n_train:] - predictions)) / scale)
+    if not np.isfinite(score):
+        return np.nan, seconds, "failed"
+    return score, seconds, "scored"
+
+
+def _score_task(task):
+    key, model, frame, holdout, events = task
+    return key, model, *holdout_score(model, frame, holdout, events)
+
+
+def select_models(
+    series: dict,
+    cheap=CHEAP_MODELS,
+    expensive=EXPENSIVE_MODELS,
+    budget_seconds: float = 60.0,
+    tolerance: float = 0.1,
+    holdout: float = 0.2,
+    cache_path: str = None,
+    n_jobs: int = 1,
+    events=(),
+) -> pd.DataFrame:
+    """
+    Pick a model per series within a compute budget.
+
+    1. Every cheap model is scored on every series (in parallel with n_jobs).
+    2. Series whose best cheap score exceeds `tolerance` get expensive
+       candidates, worst series first, until `budget_seconds` (counted from
+       the start of the call) runs out. A series stops trying candidates as
+       soon as one scores within tolerance.
+    Winners are cached in `cache_path` (JSON) keyed by a fingerprint of the
+    series, candidate list and `events` (the event dates backends with
+    event features are scored on), so unchanged series are not rescored.
+
+    Returns one row per (series, candidate) with the series key columns,
+    score, fit seconds, status and a `selected` flag marking the winner.
+    """
+    for model in (*cheap, *expensive):
+        if model not in MODEL_REGISTRY:
+            raise ValueError(f"Unknown model '{model}'")
+
+    deadline = time.perf_counter() + budget_seconds
+    events = sorted(pd.to_datetime(pd.Series(list(events), dtype=object)))
+    config = ",".join((*cheap, "|", *expensive, f"tol={tolerance}"))
+    if events:
+        config += "|events=" + ",".join(str(d.date()) for d in events)
+    cache = _read_cache(cache_path)
+    fingerprints = {key: fingerprint(frame, config) for key, frame in series.items()}
+
+    records, pending = [], {}
+    for key, frame in series.items():
+        hit = cache.get(fingerprints[key])
+        if hit is not None:
+            score = np.nan if hit["score"] is None else hit["score"]
+            records.append(_record(key, hit["model"], score, 0.0, "cached"))
+        else:
+            pending[key] = frame
+
+    # Stage 1: cheap models on every uncached series
+    tasks = [
+        (key, model, frame, holdout, events)
+        for key, frame in pending.items()
+        for model in cheap
+    ]
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs > 1 and len(tasks) > 1:
+        with process_pool(n_jobs) as pool:
+            scored = list(
+                pool.map(
+                    _score_task, tasks, chunksize=max(1, len(tasks) // (n_jobs * 4))
+                )
+            )
+    else:
+        scored = list(map(_score_task, tasks))
+    records += [_record(*row) for row in scored]
+
+    # Stage 2: expensive candidates for poorly fitted series, worst first
+    best = _best_scores(records)
+    poor = sorted(
+        (key for key in pending if not best.get(key, np.inf) <= tolerance),
+        key=lambda key: -np.nan_to_num(best.get(key, np.inf), nan=np.inf),
+    )
+    for key in poor:
+        for model in expensive:
+            if time.perf_counter() >= deadline:
+                records.append(_record(key, model, np.nan, 0.0, "budget_exhausted"))
+                continue
+            score, seconds, status = holdout_score(model, pending[key], holdout, events)
+            records.append(_record(key, model, score, seconds, status))
+            if score <= tolerance:
+                break  # early stop: good enough
+
+    result = pd.DataFrame(records)
+    result["selected"] = False
+    for key, index in _winners(result).items():
+        result.loc[index, "selected"] = True
+        if key in pending:
+            row = result.loc[index]
+            cache[fingerprints[key]] = {
+                "model": row["model"],
+                "score": _json_float(row["score"]),
+            }
+    _write_cache(cache_path, cache)
+
+    keys = pd.DataFrame(result["series"].tolist(), columns=SERIES_KEYS)
+    return pd.concat([keys, result], axis=1)
+
+
+def selected_models(selection: pd.DataFrame) -> dict:
+    """{series key: winning model name} from a `select_models` result."""
+    winners = selection[selection["selected"]]
+    return dict(zip(winners["series"], winners["model"]))
+
+
+def _record(key, model, score, seconds, status):
+    return {
+        "series": key,
+        "model": model,
+        "score": score,
+        "fit_seconds": seconds,
+        "status": status,
+    }
+
+
+def _best_scores(records):
+    best = {}
+    for row in records:
+        if np.isfinite(row["score"]):
+            best[row["series"]] = min(best.get(row["series"], np.inf), row["score"])
+    return best
+
+
+def _winners(result: pd.DataFrame) -> dict:
+    """Index of the winning row per series; series never scored fall back to naive."""
+    winners = {}
+    for key, group in result.groupby("series", sort=False):
+        usable = group[group["status"].isin(["scored", "cached"])].dropna(
+            subset=["score"]
+        )
+        if not usable.empty:
+            winners[key] = usable["score"].idxmin()
+        else:
+            cached = group[group["status"] == "cached"]
+            naive = group[group["model"] == "naive"]
+            fallback = cached if not cached.empty else naive
+            winners[key] = fallback.index[0] if not fallback.empty else group.index[0]
+    return winners
+
+
+def _json_float(value):
+    return None if pd.isna(value) else float(value)
+
+
+def _read_cache(path):
+    if path and Path(path).exists():
+        return json.loads(Path(path).read_text())
+    return {}
+
+
+def _write_cache(path, cache):
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(cache, indent=1))
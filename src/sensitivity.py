@@ -0,0 +1,116 @@
+"""
+Analytic sensitivity of scenario forecasts to the impact_link parameters.
+
+The expected scenario (see src/scenarios.py) is linear in the effects:
+
+    level[r] = base[r] * (1 + sum_l sign[l] * mean[l] * w[l, r] / 100)
+
+with w the ramp weights. Its Jacobian therefore comes in closed form from
+the same (links, rows) weight matrix, for every link and forecast row at
+once, instead of one simulation per perturbed link:
+
+    d level[r] / d mean[l] = base[r] * sign[l] * w[l, r] / 100
+    d level[r] / d lag[l]  = base[r] * sign[l] * mean[l] / 100 * dw[l, r]/d lag
+
+where the ramp min(elapsed / lag, 1) has dw/dlag = -elapsed / lag**2 while
+the effect is ramping in, and 0 before the event and once it is complete.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data import SERIES_KEYS
+from src.scenarios import months_between, ramp_weights
+
+
+def ramp_lag_derivative(elapsed_months, lag_months):
+    """d ramp / d lag_months: -elapsed / lag**2 inside the ramp, else 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inside = (lag_months > 0) & (elapsed_months > 0) & (elapsed_months < lag_months)
+        return np.where(inside, -elapsed_months / lag_months**2, 0.0)
+
+
+def expected_scenario(
+    baseline: pd.DataFrame, links: pd.DataFrame, value_col: str = "Forecast"
+) -> np.ndarray:
+    """Level of every baseline row with each link's effect at its mean."""
+    level = baseline[value_col].to_numpy(dtype=float)
+    effects = links["sign"].to_numpy() * links["mean"].to_numpy()
+    return level * (1 + effects @ ramp_weights(links, baseline) / 100)
+
+
+def jacobian(baseline: pd.DataFrame, links: pd.DataFrame, value_col: str = "Forecast"):
+    """
+    (d_estimate, d_lag), two (links, rows) arrays: change of each baseline
+    row's expected level per percentage point of each link's effect, and
+    per month of its lag.
+    """
+    baseline = baseline.reset_index(drop=True)
+    level = baseline[value_col].to_numpy(dtype=float)
+    sign = links["sign"].to_numpy()[:, None]
+    mean = links["mean"].to_numpy()[:, None]
+
+    weights = ramp_weights(links, baseline)
+    elapsed = months_between(
+        links["event_date"].to_numpy()[:, None], baseline["date"].to_numpy()[None, :]
+    )
+    dw_dlag = ramp_lag_derivative(elapsed, links["lag_months"].to_numpy()[:, None])
+    # Same series mask as the weights: links only move their own indicator
+    dw_dlag = np.where(weights > 0, dw_dlag, 0.0)
+
+    d_estimate = level * sign * weights / 100
+    d_lag = level * sign * mean * dw_dlag / 100
+    return d_estimate, d_lag
+
+
+def sensitivity(
+    baseline: pd.DataFrame, links: pd.DataFrame, value_col: str = "Forecast"
+) -> pd.DataFrame:
+    """
+    One row per link and baseline row of its indicator: the baseline keys
+    and date, event_code, event_name, link_id, level (expected scenario),
+    d_estimate, d_lag and elasticity (percent change of the level per
+    percent change of the effect estimate).
+    """
+    baseline = baseline.reset_index(drop=True)
+    links = links.reset_index(drop=True)
+    d_estimate, d_lag = jacobian(baseline, links, value_col)
+    level = expected_scenario(baseline, links, value_col)
+
+    same_series = (
+        links["indicator_code"].to_numpy()[:, None]
+        == baseline["indicator_code"].to_numpy()[None, :]
+    ) & (
+        links["country"].to_numpy()[:, None] == baseline["country"].to_numpy()[None, :]
+    )
+    link_idx, row_idx = np.nonzero(same_series)
+    mean = links["mean"].to_numpy()[link_idx]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        elasticity = d_estimate[link_idx, row_idx] * mean / level[row_idx]
+
+    keys = [c for c in SERIES_KEYS if c in baseline.columns]
+    table = baseline.loc[row_idx, keys + ["date"]].reset_index(drop=True)
+    table["event_code"] = links["event_code"].to_numpy()[link_idx]
+    table["event_name"] = links["event_name"].to_numpy()[link_idx]
+    table["link_id"] = links["record_id"].to_numpy()[link_idx]
+    table["level"] = level[row_idx]
+    table["d_estimate"] = d_estimate[link_idx, row_idx]
+    table["d_lag"] = d_lag[link_idx, row_idx]
+    table["elasticity"] = np.where(np.isfinite(elasticity), elasticity, np.nan)
+    return table
+
+
+def sensitivity_matrix(table: pd.DataFrame, value: str = "elasticity") -> pd.DataFrame:
+    """
+    Event x indicator matrix of `value` at each series' last date (the
+    forecast horizon), summed over the links and markets of each pair.
+    """
+    keys = [c for c in SERIES_KEYS if c in table.columns]
+    horizon = table.groupby(keys)["date"].transform("max")
+    return table[table["date"] == horizon].pivot_table(
+        index="event_code",
+        columns="indicator_code",
+        values=value,
+        aggfunc="sum",
+        fill_value=0.0,
+    )
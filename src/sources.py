@@ -0,0 +1,370 @@
+"""
+Resolver for the source documents behind records (`source_url`).
+
+`resolve_sources` fetches the distinct source URLs of a set of records
+concurrently on one asyncio event loop, through a bounded pool of
+keep-alive HTTP/1.1 connections, and links every record to its cached
+copy. Documents are cached in a content-addressed store:
+
+    objects/<sha256[:2]>/<sha256>   document bodies, identical ones stored once
+    index.sqlite                    url -> sha256, status, size, fetch time
+
+Entries younger than the TTL are served without a request; older ones are
+refetched, and kept as a stale fallback when the source is unreachable.
+Past `max_bytes` of documents, least-recently-used entries are evicted.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import ssl
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import pandas as pd
+
+from src.data import resolve_path
+
+DEFAULT_CACHE_DIR = "data/sources"
+DEFAULT_TTL = 7 * 86_400
+MAX_CACHE_BYTES = 1 << 30
+MAX_CONNECTIONS = 16
+TIMEOUT = 30.0
+MAX_REDIRECTS = 5
+REDIRECTS = (301, 302, 303, 307, 308)
+USER_AGENT = "ethiopia-fi-sources/1.0"
+
+# Record columns carried into the record -> source links
+RECORD_COLUMNS = ["record_id", "source_name", "evidence_basis", "source_url"]
+
+
+class SourceError(Exception):
+    """A source could not be fetched (protocol error, redirect loop...)."""
+
+
+class SourceCache:
+    """
+    Content-addressed store of fetched source documents, indexed by URL in
+    a SQLite file (see the module docstring for the layout).
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+        self.conn = sqlite3.connect(self.root / "index.sqlite")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sources (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                final_url TEXT NOT NULL,
+                content_type TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                fetched REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS by_use ON sources (last_used)")
+
+    def object_path(self, sha256: str) -> Path:
+        return self.root / "objects" / sha256[:2] / sha256
+
+    def get(self, url: str, stale: bool = False):
+        """
+        Index entry (a dict) for `url`, or None if it is not cached or older
+        than the TTL (unless `stale`). Marks it as recently used.
+        """
+        row = self.conn.execute(
+            "SELECT url, sha256, final_url, content_type, bytes, fetched "
+            "FROM sources WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = dict(
+            zip(("url", "sha256", "final_url", "content_type", "bytes", "fetched"), row)
+        )
+        if not self.object_path(entry["sha256"]).exists():
+            return None
+        if not stale and time.time() - entry["fetched"] > self.ttl:
+            return None
+        self.conn.execute(
+            "UPDATE sources SET last_used = ? WHERE url = ?", (time.time(), url)
+        )
+        return entry
+
+    def put(self, url: str, body: bytes, final_url: str = None, content_type=""):
+        """Store `body` as the current document of `url`; returns its entry."""
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self.object_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{sha256}.{os.getpid()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+        now = time.time()
+        entry = {
+            "url": url,
+            "sha256": sha256,
+            "final_url": final_url or url,
+            "content_type": content_type,
+            "bytes": len(body),
+            "fetched": now,
+        }
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*entry.values(), now),
+        )
+        return entry
+
+    def evict(self):
+        """
+        Drop least-recently-used entries until the distinct documents fit in
+        `max_bytes`, then delete documents no entry refers to.
+        """
+        kept, total = set(), 0
+        rows = self.conn.execute(
+            "SELECT url, sha256, bytes FROM sources ORDER BY last_used DESC"
+        ).fetchall()
+        for url, sha256, size in rows:
+            if sha256 in kept:
+                continue
+            if total + size > self.max_bytes:
+                self.conn.execute("DELETE FROM sources WHERE url = ?", (url,))
+                continue
+            kept.add(sha256)
+            total += size
+        referenced = {
+            sha256 for (sha256,) in self.conn.execute("SELECT sha256 FROM sources")
+        }
+        for path in (self.root / "objects").glob("*/*"):
+            if path.name not in referenced and not path.name.startswith("."):
+                path.unlink(missing_ok=True)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+
+    def close(self):
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Minimal asyncio HTTP/1.1 GET client: at most `max_connections` requests
+    in flight, connections kept alive and reused per host.
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, timeout=TIMEOUT):
+        self.max_connections = max_connections
+        self.slots = asyncio.Semaphore(max_connections)
+        self.timeout = timeout
+        self.idle = {}  # (scheme, host, port) -> [(reader, writer)]
+        self.opened = 0  # connections opened, i.e. not reused
+
+    async def get(self, url: str):
+        """(final url, status, headers, body), following redirects."""
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers, body = await self._request(url)
+            if status not in REDIRECTS or "location" not in headers:
+                return url, status, headers, body
+            url = urljoin(url, headers["location"])
+        raise SourceError(f"More than {MAX_REDIRECTS} redirects")
+
+    async def _request(self, url: str):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise SourceError(f"Unsupported URL '{url}'")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = (
+            f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"User-Agent: {USER_AGENT}\r\nAccept-Encoding: identity\r\n\r\n"
+        ).encode("latin-1")
+
+        async with self.slots:
+            connection = self._idle_connection(key)
+            if connection is not None:
+                try:
+                    return await self._exchange(key, connection, request)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    pass  # the server closed the idle connection: reconnect
+            context = ssl.create_default_context() if key[0] == "https" else None
+            connection = await asyncio.wait_for(
+                asyncio.open_connection(key[1], port, ssl=context), self.timeout
+            )
+            self.opened += 1
+            return await self._exchange(key, connection, request)
+
+    def _idle_connection(self, key):
+        connections = self.idle.get(key)
+        while connections:
+            reader, writer = connections.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    async def _exchange(self, key, connection, request):
+        reader, writer = connection
+        try:
+            writer.write(request)
+            status, headers, body = await asyncio.wait_for(
+                _read_response(reader), self.timeout
+            )
+        except BaseException:
+            writer.close()
+            raise
+        reusable = headers.get("connection", "").lower() != "close"
+        # Idle connections count against the pool size too
+        if reusable and not reader.at_eof() and self._n_idle() < self.max_connections:
+            self.idle.setdefault(key, []).append(connection)
+        else:
+            writer.close()
+        return status, headers, body
+
+    def _n_idle(self):
+        return sum(len(connections) for connections in self.idle.values())
+
+    async def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle.clear()
+
+
+async def _read_response(reader):
+    """Status, lower-cased headers and body of one HTTP/1.1 response."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before the response")
+    try:
+        status = int(status_line.split()[1])
+    except (IndexError, ValueError):
+        raise SourceError(f"Malformed status line {status_line[:80]!r}")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()  # no trailers expected
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+    except ValueError:
+        raise SourceError("Malformed chunk size or Content-Length")
+    return status, headers, body
+
+
+async def fetch_sources(
+    urls,
+    cache: SourceCache,
+    max_connections=MAX_CONNECTIONS,
+    timeout=TIMEOUT,
+    refresh=False,
+) -> pd.DataFrame:
+    """
+    Fetch each distinct URL into `cache` (unless cached within the TTL or
+    `refresh`), concurrently over one ConnectionPool. One row per URL: the
+    cache entry columns, status, from_cache and error ("" on success).
+    """
+    pool = ConnectionPool(max_connections, timeout)
+
+    async def resolve(url):
+        entry = None if refresh else cache.get(url)
+        if entry is not None:
+            return {**entry, "status": 200, "from_cache": True, "error": ""}
+        status = None
+        try:
+            final_url, status, headers, body = await pool.get(url)
+            if status == 200:
+                entry = cache.put(url, body, final_url, headers.get("content-type", ""))
+                return {**entry, "status": status, "from_cache": False, "error": ""}
+            error = f"HTTP {status}"
+        except Exception as exc:
+            # Any failure of one source (refused, timed out, cut off mid-body,
+            # not HTTP...) is that URL's error, not the batch's
+            error = f"{type(exc).__name__}: {exc}"
+        # Unreachable or failing source: fall back to an expired copy
+        stale = cache.get(url, stale=True)
+        return {
+            **(stale or {"url": url}),
+            "status": status,
+            "from_cache": stale is not None,
+            "error": error,
+        }
+
+    try:
+        rows = await asyncio.gather(*(resolve(url) for url in dict.fromkeys(urls)))
+    finally:
+        await pool.close()
+    return pd.DataFrame(rows)
+
+
+def resolve_sources(
+    records: pd.DataFrame,
+    cache_dir=DEFAULT_CACHE_DIR,
+    ttl=DEFAULT_TTL,
+    max_connections=MAX_CONNECTIONS,
+    timeout=TIMEOUT,
+    refresh=False,
+    max_bytes=None,
+) -> pd.DataFrame:
+    """
+    Link every record with a source_url to its cached source document.
+    Returns one row per such record: RECORD_COLUMNS, then sha256, path (of
+    the cached copy), bytes, fetched (UTC), status, from_cache and error.
+    """
+    columns = [c for c in RECORD_COLUMNS if c in records.columns]
+    linked = records.loc[records["source_url"].notna(), columns].copy()
+    linked["source_url"] = linked["source_url"].astype(str).str.strip()
+    linked = linked[linked["source_url"] != ""].reset_index(drop=True)
+
+    cache_dir = resolve_path(cache_dir)
+    with SourceCache(cache_dir, ttl, max_bytes) as cache:
+        fetched = asyncio.run(
+            fetch_sources(
+                linked["source_url"], cache, max_connections, timeout, refresh
+            )
+        )
+    fetched = fetched.reindex(
+        columns=["url", "sha256", "bytes", "fetched", "status", "from_cache", "error"]
+    )
+    fetched["url"] = fetched["url"].astype(linked["source_url"].dtype)
+    fetched["path"] = [
+        str(cache_dir / "objects" / sha[:2] / sha) if isinstance(sha, str) else None
+        for sha in fetched["sha256"]
+    ]
+    fetched["fetched"] = pd.to_datetime(fetched["fetched"], unit="s", utc=True)
+    links = linked.merge(
+        fetched.rename(columns={"url": "source_url"}), on="source_url", how="left"
+    )
+    return links[
+        columns
+        + ["sha256", "path", "bytes", "fetched", "status", "from_cache", "error"]
+    ]
@@ -0,0 +1,96 @@
+import pickle
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+
+class ModelStore:
+    """
+    On-disk store of fitted models (backend state, residual stats and the
+    forecast rows they produced), keyed by a fingerprint of the series data
+    and model config.
+
+    Backed by a single SQLite file. Entries are evicted least-recently-used
+    once the store holds more than `max_entries`.
+    """
+
+    def __init__(self, path="data/processed/model_store.sqlite", max_entries=50000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS models (
+                fingerprint TEXT PRIMARY KEY,
+                series TEXT NOT NULL,
+                model TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS by_series ON models (series)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS by_use ON models (last_used)")
+
+    def get(self, fingerprint):
+        """Entry stored under `fingerprint`, or None. Marks it as recently used."""
+        row = self.conn.execute(
+            "SELECT payload FROM models WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute(
+            "UPDATE models SET last_used = ? WHERE fingerprint = ?",
+            (time.time(), fingerprint),
+        )
+        return _decode(row[0])
+
+    def latest(self, series):
+        """Most recently stored entry for a series key, used for warm starts."""
+        row = self.conn.execute(
+            "SELECT payload FROM models WHERE series = ? "
+            "ORDER BY last_used DESC LIMIT 1",
+            (_series_id(series),),
+        ).fetchone()
+        return None if row is None else _decode(row[0])
+
+    def put(self, fingerprint, series, model, entry):
+        """Store `entry` (a picklable dict) under `fingerprint`."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?)",
+            (fingerprint, _series_id(series), model, _encode(entry), time.time()),
+        )
+
+    def evict(self):
+        """Drop least-recently-used entries beyond `max_entries`."""
+        self.conn.execute(
+            "DELETE FROM models WHERE fingerprint IN ("
+            "SELECT fingerprint FROM models ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+
+    def close(self):
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _series_id(series):
+    return "|".join(map(str, series)) if isinstance(series, tuple) else str(series)
+
+
+def _encode(entry):
+    return zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def _decode(blob):
+    return pickle.loads(zlib.decompress(blob))
@@ -0,0 +1,175 @@
+"""
+Per-series summary index.
+
+One row per series (see SERIES_KEYS: an indicator within a market and
+slice) with what the KPI cards and data-quality views show: observation
+count, first/last date and value, min/max, CAGR, confidence mix and the
+latest event linked to the indicator. The pipeline publishes it with the
+other outputs, so the dashboard looks values up instead of scanning the
+dataset.
+
+Every statistic combines across batches of records (counts add, extremes
+compare, first/last follow the dates), so `update_summary` folds newly
+ingested observations into the affected rows without rereading the series.
+
+`with_usage` adds the aggregate usage score behind the dashboard's KPI row
+as one more row (USAGE_KEY), with its last fitted value in `last_forecast`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data import SERIES_KEYS, get_observations
+
+CONFIDENCE_LEVELS = ("high", "medium", "low", "estimated")
+CONFIDENCE_COLUMNS = [f"n_{level}" for level in CONFIDENCE_LEVELS] + ["n_unrated"]
+# Columns that combine across batches of records, besides the keys
+PARTIAL_COLUMNS = [
+    "n_obs",
+    "first_date",
+    "first_value",
+    "last_date",
+    "last_value",
+    "value_min",
+    "value_max",
+] + CONFIDENCE_COLUMNS
+EVENT_COLUMNS = ["latest_event_code", "latest_event_name", "latest_event_date"]
+SUMMARY_COLUMNS = (
+    SERIES_KEYS + PARTIAL_COLUMNS + ["cagr"] + EVENT_COLUMNS + ["last_forecast"]
+)
+# Series key of the aggregate usage score row (see with_usage)
+USAGE_KEY = ("all", "USAGE_SCORE", "all", "all")
+
+
+def _partial(records: pd.DataFrame) -> pd.DataFrame:
+    """Combinable statistics of the observations in `records`, per series."""
+    obs = get_observations(records).dropna(subset=["observation_date", "value_numeric"])
+    if obs.empty:
+        return pd.DataFrame(columns=SERIES_KEYS + PARTIAL_COLUMNS)
+    obs[SERIES_KEYS] = obs[SERIES_KEYS].fillna("all")
+    # Stable sort: on equal dates, the later record is the last value
+    obs = obs.sort_values("observation_date", kind="stable")
+    confidence = obs["confidence"] if "confidence" in obs.columns else np.nan
+    obs["confidence"] = pd.Series(confidence, index=obs.index).where(
+        lambda c: c.isin(CONFIDENCE_LEVELS), "unrated"
+    )
+
+    grouped = obs.groupby(SERIES_KEYS, sort=True)
+    partial = grouped.agg(
+        n_obs=("value_numeric", "size"),
+        first_date=("observation_date", "first"),
+        first_value=("value_numeric", "first"),
+        last_date=("observation_date", "last"),
+        last_value=("value_numeric", "last"),
+        value_min=("value_numeric", "min"),
+        value_max=("value_numeric", "max"),
+    )
+    mix = (
+        grouped["confidence"]
+        .value_counts()
+        .unstack(fill_value=0)
+        .reindex(columns=list(CONFIDENCE_LEVELS) + ["unrated"], fill_value=0)
+    )
+    mix.columns = CONFIDENCE_COLUMNS
+    return partial.join(mix).reset_index()
+
+
+def _combine(older: pd.DataFrame, newer: pd.DataFrame) -> pd.DataFrame:
+    """Statistics of two batches of records, `newer` appended after `older`."""
+    both = pd.concat(
+        [older[SERIES_KEYS + PARTIAL_COLUMNS], newer[SERIES_KEYS + PARTIAL_COLUMNS]],
+        ignore_index=True,
+    )
+    grouped = both.groupby(SERIES_KEYS, sort=True)
+    combined = grouped[["n_obs"] + CONFIDENCE_COLUMNS].sum()
+    combined["value_min"] = grouped["value_min"].min()
+    combined["value_max"] = grouped["value_max"].max()
+    # Older rows come first, so ties keep the older first value and take
+    # the newer last value, as a stable sort of all records would
+    by_first = both.sort_values("first_date", kind="stable").groupby(SERIES_KEYS)
+    by_last = both.sort_values("last_date", kind="stable").groupby(SERIES_KEYS)
+    combined[["first_date", "first_value"]] = by_first[
+        ["first_date", "first_value"]
+    ].first()
+    combined[["last_date", "last_value"]] = by_last[["last_date", "last_value"]].last()
+    return combined.reset_index()
+
+
+def _finish(partial: pd.DataFrame, links: pd.DataFrame) -> pd.DataFrame:
+    """Add CAGR and the latest linked event (links as from scenarios.impact_links)."""
+    summary = partial.copy()
+    years = (summary["last_date"] - summary["first_date"]) / pd.Timedelta(days=365.25)
+    first, last = summary["first_value"], summary["last_value"]
+    valid = (years > 0) & (first > 0) & (last > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = (last / first) ** (1 / years) - 1
+    summary["cagr"] = cagr.where(valid)
+
+    latest = (
+        links.sort_values("event_date", kind="stable")
+        .groupby(["country", "indicator_code"])[
+            ["event_code", "event_name", "event_date"]
+        ]
+        .last()
+        .rename(columns=lambda c: f"latest_{c}")
+        .reset_index()
+    )
+    summary = summary.merge(latest, on=["country", "indicator_code"], how="left")
+    return summary.reindex(columns=SUMMARY_COLUMNS)
+
+
+def build_summary(raw: pd.DataFrame) -> pd.DataFrame:
+    """Summary index of every series in the unified dataset."""
+    from src.scenarios import impact_links
+
+    return _finish(_partial(raw), impact_links(raw))
+
+
+def update_summary(
+    summary: pd.DataFrame, records: pd.DataFrame, links: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Fold newly appended `records` into `summary`. Only the rows of series
+    with new observations are recomputed; `links` (the impact links of the
+    full dataset) give the latest event of series seen for the first time.
+    """
+    new = _partial(records)
+    if new.empty:
+        return summary
+    keys = pd.MultiIndex.from_frame(summary[SERIES_KEYS].astype(str))
+    affected = keys.isin(pd.MultiIndex.from_frame(new[SERIES_KEYS].astype(str)))
+    updated = _finish(_combine(summary[affected], new), links)
+    merged = pd.concat([summary[~affected], updated], ignore_index=True)
+    return merged.sort_values(SERIES_KEYS, kind="stable").reset_index(drop=True)
+
+
+def with_usage(summary: pd.DataFrame, forecast: pd.DataFrame) -> pd.DataFrame:
+    """
+    `summary` with the USAGE_KEY row replaced by the statistics of the
+    aggregate usage score (inclusion_forecast: date, value, Forecast).
+    """
+    records = pd.DataFrame(
+        {
+            **dict(zip(SERIES_KEYS, USAGE_KEY)),
+            "record_type": "observation",
+            "observation_date": pd.to_datetime(forecast["date"]),
+            "value_numeric": forecast["value"],
+        }
+    )
+    no_links = pd.DataFrame(
+        columns=["country", "indicator_code", "event_code", "event_name"]
+    ).assign(event_date=pd.Series(dtype="datetime64[ns]"))
+    usage = _finish(_partial(records), no_links)
+    if len(usage):
+        usage["last_forecast"] = float(forecast["Forecast"].iloc[-1])
+    rest = summary[summary["indicator_code"] != USAGE_KEY[1]]
+    parts = [part for part in (rest, usage) if len(part)]
+    if not parts:
+        return summary.reindex(columns=SUMMARY_COLUMNS)
+    return pd.concat(parts, ignore_index=True).reindex(columns=SUMMARY_COLUMNS)
+
+
+def lookup(summary: pd.DataFrame) -> dict:
+    """{series key tuple: summary row as a dict}, for constant-time access."""
+    rows = summary.to_dict("records")
+    return {tuple(str(row[key]) for key in SERIES_KEYS): row for row in rows}
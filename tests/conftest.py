@@ -0,0 +1,38 @@
+"""Shared options: opt-in performance budgets and golden file regeneration."""
+
+import os
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--perf",
+        action="store_true",
+        help="run the time/memory budget tests (or set PERF_TESTS=1)",
+    )
+    parser.addoption(
+        "--update-golden",
+        action="store_true",
+        help="rewrite tests/golden/ from the current outputs",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "perf: time/memory budget test on generated large inputs"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--perf") or os.environ.get("PERF_TESTS") == "1":
+        return
+    skip = pytest.mark.skip(reason="performance budget: run with --perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def update_golden(request):
+    return request.config.getoption("--update-golden")
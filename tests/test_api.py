@@ -0,0 +1,177 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from src.api import ForecastService, start_server
+from src.publish import publish
+from src.quantiles import quantile_grid
+
+
+def publish_outputs(root, forecast_value=10.0):
+    dates = pd.date_range("2021-01-01", periods=3, freq="YS")
+    frames = {
+        "inclusion_forecast": pd.DataFrame(
+            {"date": dates, "value": [1.0, 2.0, 3.0], "Forecast": forecast_value}
+        ),
+        "impact_matrix": pd.DataFrame(
+            {"Feature": ["is_holiday"], "Coefficient": [0.5]}
+        ),
+        "series_forecast": pd.DataFrame(
+            {
+                "country": ["ETH", "KEN"],
+                "indicator_code": ["ACC_OWNERSHIP", "ACC_OWNERSHIP"],
+                "date": dates[:2],
+                "Forecast": [50.0, 60.0],
+            }
+        ),
+    }
+    frames["series_quantiles"] = quantile_grid(
+        frames["series_forecast"].assign(Lower_Bound=40.0, Upper_Bound=80.0)
+    )
+    return publish(frames, root)
+
+
+async def get(port, path):
+    """Minimal HTTP/1.1 client: returns (status, parsed JSON)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def run_with_server(root, scenario):
+    async def main():
+        service = ForecastService(root)
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await scenario(service, port)
+
+    return asyncio.run(main())
+
+
+def test_endpoints_and_version_switch(tmp_path):
+    publish_outputs(tmp_path)
+
+    async def scenario(service, port):
+        status, forecast = await get(port, "/forecast")
+        assert status == 200 and forecast[0]["Forecast"] == 10.0
+        _, rows = await get(port, "/forecast?country=KEN")
+        assert [row["Forecast"] for row in rows] == [60.0]
+        _, rows = await get(port, "/scenario?growth_rate=10")
+        assert rows[0]["Scenario_Forecast"] == 11.0
+        status, _ = await get(port, "/scenario?growth_rate=abc")
+        assert status == 400
+        _, rows = await get(port, "/quantiles?indicator=ACC_OWNERSHIP&q=0.5")
+        assert [row["q50"] for row in rows] == [50.0, 60.0]
+        status, _ = await get(port, "/quantiles?indicator=ACC_OWNERSHIP&q=0.3")
+        assert status == 400
+        status, _ = await get(port, "/nope")
+        assert status == 404
+
+        # A new publish is picked up without restarting the service
+        version = publish_outputs(tmp_path, forecast_value=20.0)
+        _, forecast = await get(port, "/forecast")
+        assert forecast[0]["Forecast"] == 20.0
+        _, payload = await get(port, "/version")
+        assert payload["version"] == version
+
+    run_with_server(tmp_path, scenario)
+
+
+def test_identical_concurrent_queries_are_coalesced(tmp_path):
+    publish_outputs(tmp_path)
+
+    async def scenario(service, port):
+        results = await asyncio.gather(
+            *(get(port, "/scenario?growth_rate=5") for _ in range(20))
+        )
+        assert {status for status, _ in results} == {200}
+        assert service.computations == 1
+
+    run_with_server(tmp_path, scenario)
+
+
+def test_event_effects_sensitivity_and_scenarios(tmp_path):
+    dates = pd.date_range("2026-01-01", periods=3, freq="YS")
+    publish(
+        {
+            "inclusion_forecast": pd.DataFrame(
+                {"date": dates, "value": 1.0, "Forecast": 1.0}
+            ),
+            "impact_matrix": pd.DataFrame(
+                {"Feature": ["is_holiday"], "Coefficient": [0.5]}
+            ),
+            "impact_estimates": pd.DataFrame(
+                {
+                    "country": "ETH",
+                    "indicator_code": ["ACC_OWNERSHIP", "USG_P2P_COUNT"],
+                    "event_code": ["EVT_FAYDA", "EVT_TELEBIRR"],
+                    "estimate": [8.0, 30.0],
+                    "status": "estimated",
+                }
+            ),
+            "series_forecast": pd.DataFrame(
+                {
+                    "country": "ETH",
+                    "indicator_code": "ACC_OWNERSHIP",
+                    "date": dates,
+                    "Forecast": 100.0,
+                }
+            ),
+        },
+        tmp_path,
+    )
+
+    async def scenario(service, port):
+        _, rows = await get(port, "/impacts?event=EVT_FAYDA")
+        assert [row["estimate"] for row in rows] == [8.0]
+        _, rows = await get(port, "/impacts?view=regression")
+        assert rows[0]["Coefficient"] == 0.5
+        # Telebirr and Fayda links of ACC_OWNERSHIP, at every forecast date
+        _, rows = await get(port, "/impacts?view=sensitivity&indicator=ACC_OWNERSHIP")
+        assert sorted({row["event_code"] for row in rows}) == [
+            "EVT_FAYDA",
+            "EVT_TELEBIRR",
+        ]
+        assert len(rows) == 6 and all(row["d_estimate"] == 1.0 for row in rows)
+
+        _, fan = await get(port, "/scenario?indicator=ACC_OWNERSHIP&paths=5000")
+        # Both effects fully ramped in: +15% and +10% on average
+        assert [round(row["Scenario_Mean"]) for row in fan] == [125, 125, 125]
+        assert all(row["p5"] < row["p50"] < row["p95"] for row in fan)
+        _, shifted = await get(
+            port, "/scenario?indicator=ACC_OWNERSHIP&shift=EVT_FAYDA:30&paths=5000"
+        )
+        assert shifted[0]["Scenario_Mean"] < fan[0]["Scenario_Mean"]
+
+        for query, expected in [
+            ("/impacts?view=nope", 400),
+            ("/scenario?indicator=ACC_OWNERSHIP&shift=EVT_FAYDA", 400),
+            ("/scenario?indicator=ACC_OWNERSHIP&paths=0", 400),
+            ("/scenario?indicator=NOPE", 404),
+        ]:
+            status, _ = await get(port, query)
+            assert status == expected, query
+
+    run_with_server(tmp_path, scenario)
+
+
+def test_handler_errors_answer_500(tmp_path):
+    publish_outputs(tmp_path)
+
+    async def scenario(service, port):
+        async def broken(query):
+            raise RuntimeError("boom")
+
+        service.routes["/impacts"] = broken
+        status, payload = await get(port, "/impacts")
+        assert status == 500 and payload == {"error": "RuntimeError: boom"}
+        status, _ = await get(port, "/health")
+        assert status == 200
+
+    run_with_server(tmp_path, scenario)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backends import MODEL_REGISTRY, ModelBackend, fit_many, get_model
+from src.forecast import forecast_series
+
+
+def trend(n=12, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n, dtype=float)
+    return pd.DataFrame({"t": t}), 10.0 + 2.0 * t + rng.normal(0, 0.5, n)
+
+
+@pytest.mark.parametrize("name", sorted(MODEL_REGISTRY))
+def test_every_backend_fits_and_forecasts(name):
+    X, y = trend()
+    backend = get_model(name).fit(X, y)
+    X_all = pd.DataFrame({"t": np.arange(len(X) + 3, dtype=float)})
+    predictions = np.asarray(backend.predict(X_all))
+    lower, upper = backend.interval(X_all)
+    assert predictions.shape == (len(X_all),) and np.isfinite(predictions).all()
+    assert (lower <= predictions).all() and (predictions <= upper).all()
+    assert backend.state and backend.name == name
+    with pytest.raises(ValueError, match="at least"):
+        get_model(name).fit(X[:0], y[:0])
+
+
+def test_backends_must_implement_fit_and_predict():
+    with pytest.raises(TypeError):
+        ModelBackend()
+
+    class Incomplete(ModelBackend):
+        def fit(self, X, y, warm_start=None):
+            return self
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(ValueError, match="Unknown model"):
+        get_model("nope")
+
+
+def test_warm_starts_reuse_the_previous_state():
+    X, y = trend()
+    ridge = get_model("ridge").fit(X, y)
+    warm = get_model("ridge").fit(X, y + 1, warm_start={"alpha": 123.0})
+    assert warm.state["alpha"] == 123.0 != ridge.state["alpha"]
+
+    arima = get_model("arima").fit(X, y)
+    resumed = get_model("arima").fit(X, y, warm_start=arima.state)
+    np.testing.assert_allclose(
+        resumed.state["params"], arima.state["params"], rtol=1e-3
+    )
+
+
+def test_gbm_warm_start_copies_and_caps_the_ensemble():
+    X, y = trend()
+    first = get_model("gbm", n_estimators=20, warm_trees=10, max_trees=40).fit(X, y)
+    state = first.state
+    grown = [20]
+    for _ in range(4):
+        backend = get_model("gbm", n_estimators=20, warm_trees=10, max_trees=40)
+        state = backend.fit(X, y, warm_start=state).state
+        grown.append(state["estimator"].n_estimators)
+    # 30, 40, then a refit from scratch instead of growing past max_trees
+    assert grown == [20, 30, 40, 20, 30]
+    # The stored estimator is not modified by later warm starts
+    assert first.state["estimator"].n_estimators == 20
+    assert len(first.state["estimator"].estimators_) == 20
+
+
+def test_fit_many_in_worker_processes():
+    series = {f"s{i}": trend(seed=i) for i in range(3)}
+    serial = fit_many(series, "ridge")
+    parallel = fit_many(series, "ridge", n_jobs=2)
+    for key in series:
+        np.testing.assert_allclose(
+            parallel[key].state["coef"], serial[key].state["coef"]
+        )
+
+
+def test_forecast_series_fits_other_models_per_series():
+    dates = pd.date_range("2011-01-01", periods=8, freq="YS")
+    series = {
+        ("ETH", f"IND_{i}", "all", "all"): pd.DataFrame(
+            {"date": dates, "value": trend(8, seed=i)[1]}
+        )
+        for i in range(3)
+    }
+    models = dict(zip(series, ["ridge", "linear", "gbm"]))
+    forecast, fitted = forecast_series(series, models)
+    assert forecast["model"].tolist() == ["ridge"] * 3 + ["linear"] * 3 + ["gbm"] * 3
+    # Panel models are fitted in one batch, the others one by one
+    assert set(fitted) == {key for key, model in models.items() if model != "linear"}
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from src.dag import Stage, dependencies, module_files, run_dag
+
+
+def copy_stage(root, name, source, target, calls, code=()):
+    """Stage upper-casing `source` into `target`, logging its runs in `calls`."""
+
+    def run():
+        calls.append(name)
+        (root / target).write_text((root / source).read_text().upper())
+
+    return Stage(name, run, inputs=[source], outputs=[target], code=code)
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "raw.txt").write_text("data")
+    return tmp_path
+
+
+def statuses(report):
+    return dict(zip(report["stage"], report["status"]))
+
+
+def test_reruns_only_changed_stages_and_their_dependents(root):
+    calls = []
+    stages = [
+        copy_stage(root, "clean", "raw.txt", "clean.txt", calls),
+        copy_stage(root, "model", "clean.txt", "model.txt", calls),
+        copy_stage(root, "figure", "raw.txt", "figure.txt", calls),
+    ]
+    assert dependencies(stages) == {"clean": set(), "model": {"clean"}, "figure": set()}
+
+    first = run_dag(stages, root=root, state_path="state.json")
+    assert set(first["status"]) == {"ran"} and (root / "model.txt").exists()
+
+    calls.clear()
+    assert set(run_dag(stages, root=root, state_path="state.json")["status"]) == {
+        "skipped"
+    }
+    assert calls == []
+
+    (root / "raw.txt").write_text("new data")
+    report = run_dag(stages, targets=["model"], root=root, state_path="state.json")
+    assert statuses(report) == {"clean": "ran", "model": "ran"}
+    assert (root / "model.txt").read_text() == "NEW DATA"
+
+    # Deleting an output reruns its stage even though the inputs are unchanged
+    (root / "figure.txt").unlink()
+    report = run_dag(stages, root=root, state_path="state.json")
+    assert (
+        statuses(report)["figure"] == "ran" and statuses(report)["model"] == "skipped"
+    )
+
+
+def test_code_changes_rerun_the_stage(root):
+    calls = []
+
+    def v1():
+        return 1
+
+    def v2():
+        return 2
+
+    stage = copy_stage(root, "figure", "raw.txt", "figure.txt", calls, code=[v1])
+    run_dag([stage], root=root, state_path="state.json")
+    stage.code = [v2]
+    run_dag([stage], root=root, state_path="state.json")
+    assert calls == ["figure", "figure"]
+
+
+def test_module_files_follow_imports(tmp_path):
+    pkg = tmp_path / "pkg"
+    pkg.mkdir()
+    (pkg / "main.py").write_text(
+        "import json\nfrom pkg.a import x\n\ndef f():\n    from pkg import b\n"
+    )
+    (pkg / "a.py").write_text("import pkg.c\nx = 1\n")
+    (pkg / "b.py").write_text("")
+    (pkg / "c.py").write_text("from pkg.main import f\n")
+    (pkg / "unused.py").write_text("")
+    assert module_files("pkg.main", tmp_path) == [
+        "pkg/a.py",
+        "pkg/b.py",
+        "pkg/c.py",
+        "pkg/main.py",
+    ]
+    # A module the modeling code imports joins its hash without being listed
+    assert "src/robust.py" in module_files("src.modeling")
+
+
+def test_independent_stages_run_in_parallel(root):
+    barrier = threading.Barrier(2, timeout=5)
+    stages = [
+        Stage(name, barrier.wait, inputs=["raw.txt"], outputs=[f"{name}.txt"])
+        for name in ("a", "b")
+    ]
+    # Each stage waits for the other: this only finishes if both run at once
+    report = run_dag(stages, jobs=2, root=root, state_path="state.json")
+    assert set(report["status"]) == {"ran"}
+
+
+def test_failures_block_downstream_and_cycles_are_rejected(root):
+    def fail():
+        raise OSError("disk full")
+
+    stages = [
+        Stage("clean", fail, inputs=["raw.txt"], outputs=["clean.txt"]),
+        copy_stage(root, "model", "clean.txt", "model.txt", []),
+    ]
+    with pytest.raises(RuntimeError, match="clean: OSError"):
+        run_dag(stages, root=root, state_path="state.json")
+
+    cyclic = [
+        copy_stage(root, "a", "b.txt", "a.txt", []),
+        copy_stage(root, "b", "a.txt", "b.txt", []),
+    ]
+    with pytest.raises(ValueError, match="cycle"):
+        dependencies(cyclic)
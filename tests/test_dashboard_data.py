@@ -0,0 +1,43 @@
+import pandas as pd
+
+from src.dashboard_data import CACHE_DIR_NAME, KEEP_VERSIONS, DashboardData
+from src.publish import publish
+
+
+def outputs(value):
+    summary = pd.DataFrame({"indicator_code": ["ACC_OWNERSHIP"], "last_value": [value]})
+    return {"summary_index": summary}
+
+
+def test_versions_without_series_forecast(tmp_path):
+    publish(outputs(1.0), tmp_path)
+    frames = DashboardData(tmp_path).get()
+    assert set(frames) == {"summary_index", "aggregates", "impact_links"}
+    assert frames["summary_index"]["last_value"].tolist() == [1.0]
+    assert len(frames["aggregates"]) and "n_forecast_series" not in frames["aggregates"]
+
+    # Memory-mapped, read-only views; a new version is picked up
+    assert not frames["summary_index"]["last_value"].to_numpy().flags.writeable
+    publish(outputs(2.0), tmp_path)
+    assert DashboardData(tmp_path).get()["summary_index"]["last_value"].tolist() == [
+        2.0
+    ]
+
+
+def test_pruning_keeps_other_country_scopes(tmp_path):
+    everything = DashboardData(tmp_path)
+    ethiopia = DashboardData(tmp_path, countries=["ETH"])
+    first = publish(outputs(0.0), tmp_path)
+    everything.get()
+
+    versions = []
+    for i in range(KEEP_VERSIONS + 2):
+        versions.append(publish(outputs(float(i)), tmp_path))
+        assert ethiopia.get()["summary_index"]["last_value"].tolist() == [float(i)]
+
+    cache = tmp_path / CACHE_DIR_NAME
+    assert sorted(p.name for p in (cache / "ETH").iterdir()) == sorted(
+        versions[-KEEP_VERSIONS:]
+    )
+    # The all-countries worker has not refreshed yet: its cache is intact
+    assert [p.name for p in (cache / "all").iterdir()] == [first]
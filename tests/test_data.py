@@ -0,0 +1,48 @@
+import pandas as pd
+
+from src.cli import main
+from src.data import DEFAULT_DATA_PATH, load_data, write_partitioned
+
+
+def test_partition_cli_writes_a_hive_dataset_per_country(tmp_path, capsys):
+    root = tmp_path / "dataset"
+    main(["partition", str(DEFAULT_DATA_PATH), "--output", str(root)])
+    # The unified CSV has no country column: --country names its market
+    main(
+        ["partition", str(DEFAULT_DATA_PATH), "--output", str(root), "--country", "KEN"]
+    )
+    assert "Partitioned" in capsys.readouterr().out
+
+    assert sorted(p.name for p in root.iterdir()) == ["country=ETH", "country=KEN"]
+    files = list((root / "country=KEN").glob("pillar=*/year=*/*.parquet"))
+    assert files and all(f.name == "part-0.parquet" for f in files)
+
+    source = load_data()
+    kenya = load_data(root, countries=["KEN"])
+    assert len(kenya) == len(source) and set(kenya["country"]) == {"KEN"}
+    assert len(load_data(root)) == 2 * len(source)
+    pd.testing.assert_series_equal(
+        kenya.sort_values("record_id")["value_numeric"].reset_index(drop=True),
+        source.sort_values("record_id")["value_numeric"].reset_index(drop=True),
+    )
+
+    # Inputs that carry their own country keep it
+    tagged = tmp_path / "tagged.csv"
+    source.assign(country="UGA").to_csv(tagged, index=False)
+    main(["partition", str(tagged), "--output", str(root), "--country", "KEN"])
+    assert len(load_data(root, countries=["UGA"])) == len(source)
+    assert len(load_data(root, countries=["KEN"])) == len(source)
+
+
+def test_rewriting_a_market_replaces_its_partitions(tmp_path):
+    root = tmp_path / "dataset"
+    source = load_data()
+    write_partitioned(source, root)
+    write_partitioned(source, root)
+    assert len(load_data(root)) == len(source)
+
+    recent = load_data(root, start="2024-01-01")
+    assert len(recent) and (recent["observation_date"].dt.year >= 2024).all()
+    pillar = source["pillar"].dropna().iloc[0]
+    access = load_data(root, pillars=[pillar])
+    assert set(access["pillar"]) == {pillar}
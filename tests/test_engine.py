@@ -0,0 +1,121 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src import engine
+from src.data import load_data, write_partitioned
+from src.engine import aggregate_usage, group_stats, indicator_summary, record_counts
+from src.modeling import run_pipeline, usage_score
+from src.publish import open_version
+
+try:
+    import duckdb  # noqa: F401
+
+    ENGINES = ["arrow", "pandas", "duckdb"]
+except ImportError:
+    ENGINES = ["arrow", "pandas"]
+
+
+def write_csv(path):
+    rows = [
+        ("obs", "observation", "ETH", "A", "2021", "10.5"),
+        ("obs", "observation", "ETH", "A", "2021-01-01", "1.5"),
+        ("obs", "observation", "KEN", "B", "2022-06-04", "2"),
+        ("obs", "target", "ETH", "B", "2022-06-04", "3"),
+        ("obs", "observation", "ETH", "B", "2023", "n/a"),
+        ("obs", "observation", "ETH", "B", "not a date", "4"),
+        ("evt", "event", "ETH", "", "2022-06-04", ""),
+        ("lnk", "impact_link", "ETH", "A", "2022-06-04", "9"),
+    ]
+    frame = pd.DataFrame(
+        rows,
+        columns=[
+            "record_id",
+            "record_type",
+            "country",
+            "indicator_code",
+            "observation_date",
+            "value_numeric",
+        ],
+    )
+    frame["record_id"] += frame.index.astype(str)
+    frame["pillar"] = "ACCESS"
+    frame.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("name", ENGINES)
+def test_usage_matches_pandas_reference(tmp_path, monkeypatch, name):
+    path = write_csv(tmp_path / "unified.csv")
+    # One Arrow batch per few rows, folded into the running aggregate each time
+    monkeypatch.setattr(engine, "CSV_BLOCK_SIZE", 100)
+    monkeypatch.setattr(engine, "COMPACT_EVERY", 2)
+
+    expected = usage_score(load_data(path))
+    assert_frame_equal(aggregate_usage(path, engine=name), expected)
+    assert list(expected["value"]) == [12.0, 5.0]
+
+    kenya = aggregate_usage(path, countries=["KEN"], engine=name)
+    assert list(kenya["value"]) == [2.0]
+    only_a = aggregate_usage(path, indicators=["A"], engine=name)
+    assert list(only_a["value"]) == [12.0]
+
+
+@pytest.mark.parametrize("name", ENGINES)
+def test_single_country_file_without_country_column(tmp_path, name):
+    path = tmp_path / "unified.csv"
+    pd.read_csv(write_csv(path)).query("country == 'ETH'").drop(
+        columns="country"
+    ).to_csv(path, index=False)
+    usage = aggregate_usage(path, countries=["ETH"], engine=name)
+    assert list(usage["value"]) == [12.0, 3.0]
+    stats = group_stats(path, ["country"], engine=name)
+    assert stats["country"].tolist() == ["ETH"]
+
+
+@pytest.mark.parametrize("name", [e for e in ENGINES if e != "pandas"])
+def test_pipeline_with_engine_matches_pandas(tmp_path, name):
+    outputs = {}
+    for engine_name in ("pandas", name):
+        run_pipeline(output_dir=tmp_path / engine_name, engine=engine_name)
+        outputs[engine_name] = open_version(tmp_path / engine_name)
+    for table in ("inclusion_forecast", "impact_matrix", "series_forecast"):
+        assert_frame_equal(outputs[name].read(table), outputs["pandas"].read(table))
+
+
+def test_partitioned_dataset_matches_csv(tmp_path):
+    path = write_csv(tmp_path / "unified.csv")
+    dataset = write_partitioned(load_data(path), tmp_path / "dataset")
+    assert_frame_equal(
+        aggregate_usage(dataset, engine="arrow"), aggregate_usage(path, engine="pandas")
+    )
+    assert_frame_equal(
+        indicator_summary(dataset, engine="arrow"),
+        indicator_summary(path, engine="pandas"),
+    )
+
+
+def test_indicator_summary_and_counts(tmp_path):
+    path = write_csv(tmp_path / "unified.csv")
+    summary = indicator_summary(path, engine="arrow").set_index(
+        ["country", "indicator_code"]
+    )
+    assert summary.loc[("ETH", "A"), "n_obs"] == 2
+    assert summary.loc[("ETH", "A"), "value_mean"] == 6.0
+    assert summary.loc[("ETH", "B"), "last_date"] == pd.Timestamp("2023-01-01")
+
+    counts = record_counts(path, engine="arrow")
+    assert counts.to_dict() == {
+        "event": 1,
+        "impact_link": 1,
+        "observation": 5,
+        "target": 1,
+    }
+    stats = group_stats(path, ["country"], engine="arrow").set_index("country")
+    assert stats.loc["ETH", "n_records"] == 5
+    assert stats.loc["ETH", "n_values"] == 4
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        engine.resolve_engine("spark")
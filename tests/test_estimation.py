@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+import src.estimation as estimation
+from src.estimation import estimate_effects
+from src.modeling import run_pipeline
+from src.publish import open_version
+
+
+def synthetic(effect_pct=20.0, n_series=3):
+    """Yearly series with a trend and a step of `effect_pct` at the event."""
+    dates = pd.date_range("2014-01-01", periods=10, freq="YS")
+    t = np.arange(10.0)
+    rng = np.random.default_rng(0)
+    series, links = {}, []
+    for i in range(n_series):
+        code = f"IND_{i}"
+        level = 100 + 2 * t
+        step = (dates >= "2019-01-01") * (100 + 2 * 5) * effect_pct / 100
+        value = level + step + rng.normal(0, 0.01, size=10)
+        series[("ETH", code, "all", "all")] = pd.DataFrame(
+            {"date": dates, "value": value}
+        )
+        links.append(
+            {
+                "record_id": f"IMP_{i}",
+                "event_code": "EVT_X",
+                "event_date": pd.Timestamp("2019-01-01"),
+                "country": "ETH",
+                "indicator_code": code,
+                "sign": 1.0,
+                "mean": 10.0,
+                "lag_months": 0.0,
+            }
+        )
+    return series, pd.DataFrame(links)
+
+
+def test_recovers_known_step_effect():
+    series, links = synthetic(effect_pct=20.0)
+    result = estimate_effects(series, links)
+    assert (result["status"] == "estimated").all()
+    np.testing.assert_allclose(result["estimate"], 20.0, atol=0.1)
+    assert (result["lower"] < result["estimate"]).all()
+    assert (result["upper"] > result["estimate"]).all()
+    assert (result["prior_estimate"] == 10.0).all()
+
+
+def test_short_series_are_flagged_not_fitted():
+    series, links = synthetic()
+    key = ("ETH", "IND_0", "all", "all")
+    series[key] = series[key].iloc[4:7]  # one point before the event
+    result = estimate_effects(series, links).set_index("indicator_code")
+    assert result.loc["IND_0", "status"] == "insufficient_data"
+    assert np.isnan(result.loc["IND_0", "estimate"])
+    assert result.loc["IND_1", "status"] == "estimated"
+
+
+def test_parallel_batches_match_serial(monkeypatch):
+    series, links = synthetic(n_series=6)
+    serial = estimate_effects(series, links)
+    monkeypatch.setattr(estimation, "MIN_CHUNK", 1)
+    pd.testing.assert_frame_equal(estimate_effects(series, links, n_jobs=2), serial)
+
+
+def test_no_pairs_keep_the_output_schema():
+    series, links = synthetic()
+    empty = estimate_effects(series, links.iloc[:0])
+    assert empty.empty and list(empty.columns) == estimation.ESTIMATE_COLUMNS
+
+
+def test_indicator_shards_estimate_their_events(tmp_path):
+    shards = {"linked": ["USG_P2P_COUNT"], "unlinked": ["ACC_FAYDA"]}
+    for name, indicators in shards.items():
+        run_pipeline(output_dir=tmp_path / name, indicators=indicators)
+    linked = open_version(tmp_path / "linked")
+    unlinked = open_version(tmp_path / "unlinked")
+
+    # Event rows survive the indicator filter, so the shard's links resolve
+    estimates = linked.read("impact_estimates")
+    assert not estimates.empty
+    assert set(estimates["indicator_code"]) == {"USG_P2P_COUNT"}
+    summary = linked.read("summary_index")
+    assert summary["latest_event_code"].notna().any()
+
+    # A shard without links publishes a readable, empty table
+    empty = unlinked.read("impact_estimates")
+    assert empty.empty and list(empty.columns) == estimation.ESTIMATE_COLUMNS
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.features as features_module
+from src.features import FeatureStore, compute_features
+from src.forecast import backend_design, forecast_series
+
+NAMES = [
+    "lag_2",
+    "rolling_mean_4",
+    "rolling_std_4",
+    "rolling_min_4",
+    "rolling_max_4",
+    "month",
+    "days_since_event",
+    "days_to_event",
+]
+EVENTS = [pd.Timestamp("2021-03-15"), pd.Timestamp("2021-07-01")]
+
+
+def frame(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2021-01-01", periods=n, freq="W"),
+            "value": rng.normal(1e6, 5e4, size=n),
+        }
+    )
+
+
+def test_rolling_features_match_pandas():
+    df = frame()
+    features = compute_features(df, NAMES[:5])
+    rolling = df["value"].rolling(4)
+    pd.testing.assert_series_equal(
+        features["lag_2"], df["value"].shift(2), check_names=False
+    )
+    for stat in ("mean", "std", "min", "max"):
+        expected = getattr(rolling, stat)()
+        np.testing.assert_allclose(features[f"rolling_{stat}_4"], expected, rtol=1e-9)
+
+
+def test_event_proximity():
+    df = frame(n=30)
+    features = compute_features(df, ["days_since_event", "days_to_event"], EVENTS)
+    first = df["date"].iloc[0]
+    assert np.isnan(features["days_since_event"].iloc[0])
+    assert features["days_to_event"].iloc[0] == (EVENTS[0] - first).days
+    last = df["date"].iloc[-1]
+    assert features["days_since_event"].iloc[-1] == (last - EVENTS[1]).days
+    assert np.isnan(features["days_to_event"].iloc[-1])
+
+
+def test_unknown_feature_is_rejected():
+    with pytest.raises(ValueError, match="Unknown feature"):
+        compute_features(frame(), ["lag_x"])
+
+
+def test_store_appends_incrementally(tmp_path, monkeypatch):
+    df = frame()
+    store = FeatureStore(tmp_path, events=EVENTS)
+    store.get("s", df.iloc[:30], NAMES)
+
+    computed_rows = []
+    original = features_module.compute_features
+
+    def spy(frame, names, events=()):
+        computed_rows.append(len(frame))
+        return original(frame, names, events)
+
+    monkeypatch.setattr(features_module, "compute_features", spy)
+    incremental = store.get("s", df, NAMES)
+    # Only the 10 new rows plus 3 rows of window context are computed
+    assert computed_rows == [13]
+    pd.testing.assert_frame_equal(
+        incremental, original(df, NAMES, EVENTS), check_dtype=False
+    )
+    # Reading an unchanged series computes nothing
+    store.get("s", df, NAMES)
+    assert computed_rows == [13]
+
+
+def test_backends_request_store_features_by_name(tmp_path):
+    df = frame(12).iloc[::4].reset_index(drop=True)
+    key = ("ETH", "IND", "all", "all")
+    store = FeatureStore(tmp_path, events=EVENTS)
+    dates = pd.date_range("2021-08-01", periods=2, freq="MS")
+
+    X = backend_design("gbm", df, dates, features=store, key=key)
+    assert list(X.columns) == ["t", "days_since_event", "days_to_event"]
+    expected = compute_features(
+        pd.concat([df, pd.DataFrame({"date": dates})], ignore_index=True),
+        ["days_since_event", "days_to_event"],
+        EVENTS,
+    ).fillna(-1)
+    pd.testing.assert_frame_equal(X.iloc[:, 1:], expected, check_dtype=False)
+    assert len(list(tmp_path.glob("*.parquet"))) == 1  # history went through the store
+    # Trend-only backends keep the trend design
+    assert list(backend_design("linear", df, dates).columns) == ["t"]
+
+    forecast, fitted = forecast_series({key: df}, {key: "gbm"}, features=store)
+    assert fitted[key].model.n_features_in_ == 3 and len(forecast) == 3
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from src.gender import gap_analytics, slice_gaps
+
+
+def observation(country, code, year, value, gender=None, location=None, **extra):
+    return {
+        "record_type": "observation",
+        "country": country,
+        "indicator_code": code,
+        "pillar": extra.get("pillar", "ACCESS"),
+        "indicator_direction": extra.get("direction", "higher_better"),
+        "gender": gender,
+        "location": location,
+        "observation_date": pd.Timestamp(f"{year}-01-01"),
+        "value_numeric": value,
+    }
+
+
+def raw():
+    rows = []
+    for year, male, female, urban, rural in [
+        (2014, 30, 20, 50, 20),
+        (2017, 40, 32, 55, 20),
+        (2021, 50, 46, 60, 15),
+    ]:
+        rows += [
+            observation("KEN", "ACC_OWNERSHIP", year, male, gender="Male"),
+            observation("KEN", "ACC_OWNERSHIP", year, female, gender="female"),
+            observation("ETH", "ACC_OWNERSHIP", year, urban, location="urban"),
+            observation("ETH", "ACC_OWNERSHIP", year, rural, location="rural"),
+        ]
+    rows += [
+        # Only one slice observed: no gap
+        observation("ETH", "USG_P2P", 2021, 5.0, gender="male"),
+        # Reported gap, two sources on one date
+        observation(
+            "ETH", "GEN_GAP_ACC", 2024, 20.0, pillar="GENDER", direction="lower_better"
+        ),
+        observation(
+            "ETH", "GEN_GAP_ACC", 2024, 18.0, pillar="GENDER", direction="lower_better"
+        ),
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_gaps_from_slices_and_reported_indicators():
+    gaps = slice_gaps(raw()).set_index(["country", "dimension", "source", "date"])
+    assert gaps.loc[("KEN", "gender", "derived", "2014-01-01"), "gap"] == 10.0
+    assert gaps.loc[("ETH", "location", "derived", "2021-01-01"), "gap"] == 45.0
+    assert gaps.loc[("ETH", "gender", "reported", "2024-01-01"), "gap"] == 19.0
+    assert "USG_P2P" not in set(gaps["indicator_code"])
+
+
+def test_trends_and_closure_dates():
+    summary = gap_analytics(raw()).set_index(["country", "dimension"])
+    ken = summary.loc[("KEN", "gender")]
+    assert ken["status"] == "closing" and ken["trend_per_year"] < 0
+    # Closure lies after the last observation, where the fitted gap reaches 0
+    assert ken["closure_date"] > ken["last_date"]
+    np.testing.assert_allclose(
+        ken["years_to_close"],
+        (ken["closure_date"] - ken["last_date"]) / pd.Timedelta(days=365.25),
+        rtol=1e-6,
+    )
+    assert summary.loc[("ETH", "location"), "status"] == "widening"
+    assert pd.isna(summary.loc[("ETH", "location"), "closure_date"])
+    assert summary.loc[("ETH", "gender"), "status"] == "insufficient_data"
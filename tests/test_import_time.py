@@ -0,0 +1,52 @@
+"""Import-time budget: heavy dependencies must only load on paths that use them."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+HEAVY = ("sklearn", "statsmodels", "scipy", "matplotlib", "seaborn", "plotly")
+
+# Cumulative import time allowed for the CLI module, in microseconds
+CLI_BUDGET_US = 150_000
+
+
+def import_times(*args):
+    """Run python -X importtime and return {module: cumulative microseconds}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def loaded_heavy(times):
+    return sorted({name.split(".")[0] for name in times} & set(HEAVY))
+
+
+def test_cli_help_is_fast():
+    times = import_times("-m", "src", "--help")
+    assert "pandas" not in times
+    assert loaded_heavy(times) == []
+    assert times["src.cli"] < CLI_BUDGET_US
+
+
+def test_modeling_import_skips_model_libraries():
+    times = import_times("-c", "import src.modeling")
+    assert loaded_heavy(times) == []
+
+
+def test_eda_import_skips_plotting_libraries():
+    times = import_times(
+        "-c", "import sys; sys.path.insert(0, 'notebooks'); import run_eda"
+    )
+    assert loaded_heavy(times) == []
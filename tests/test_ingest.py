@@ -0,0 +1,161 @@
+import io
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+import src.publish as publish_module
+
+from src.data import DEFAULT_DATA_PATH, SERIES_KEYS, load_data, resolve_path
+from src.ingest import ingest_batch, ingest_inbox, ingest_stream, validate_records
+from src.modeling import run_pipeline
+from src.publish import current_version, open_version
+
+NEW = {
+    "record_id": "OPS_0001",
+    "indicator_code": "USG_P2P_COUNT",
+    "observation_date": "2025-06-30",
+    "value_numeric": 150000000,
+}
+
+
+def test_validation_rejects_bad_records():
+    existing = load_data()
+    records = pd.DataFrame(
+        [
+            NEW,
+            {**NEW, "record_id": "REC_0001"},
+            {**NEW, "record_id": "OPS_2", "indicator_code": "NOT_KNOWN"},
+            {**NEW, "record_id": "OPS_3", "value_numeric": "lots"},
+            {**NEW, "record_id": "OPS_4", "record_type": "event"},
+        ]
+    )
+    valid, rejected = validate_records(records, existing)
+    assert valid["record_id"].tolist() == ["OPS_0001"]
+    assert valid.loc[0, "pillar"] == "USAGE"  # completed from earlier records
+    assert rejected["reason"].tolist() == [
+        "duplicate record_id",
+        "unknown indicator_code without a valid pillar",
+        "non-numeric value_numeric",
+        "only observations can be ingested",
+    ]
+
+
+def test_micro_batch_updates_only_affected_series(tmp_path):
+    data = tmp_path / "data.csv"
+    shutil.copy(resolve_path(DEFAULT_DATA_PATH), data)
+    output = tmp_path / "out"
+    run_pipeline(data, output, budget_seconds=5)
+    before = open_version(output).read("series_forecast")
+
+    # A malformed line is rejected; the valid records of its batch still go in
+    lines = io.StringIO('{"record_id": "OPS_9", \n' + json.dumps(NEW) + "\n")
+    (summary,) = ingest_stream(lines, data_path=data, output_dir=output)
+    assert (summary["accepted"], summary["rejected"]) == (1, 1)
+    assert summary["rejects"].loc[0, "reason"].startswith("malformed JSON")
+    assert summary["series"] == [("ETH", "USG_P2P_COUNT", "all", "all")]
+    assert current_version(output) == summary["version"]
+
+    after = open_version(output).read("series_forecast")
+    affected = after["indicator_code"] == "USG_P2P_COUNT"
+    pd.testing.assert_frame_equal(
+        after[~affected].reset_index(drop=True),
+        before[before["indicator_code"] != "USG_P2P_COUNT"].reset_index(drop=True),
+    )
+    assert after.loc[affected, "date"].min() > "2026"
+    assert len(after[SERIES_KEYS].drop_duplicates()) == len(
+        before[SERIES_KEYS].drop_duplicates()
+    )
+
+    index = open_version(output).read("summary_index").set_index("indicator_code")
+    assert index.loc["USG_P2P_COUNT", "last_date"] == "2025-06-30"
+    assert index.loc["USG_P2P_COUNT", "last_value"] == 150000000
+
+
+def test_inbox_moves_files_and_keeps_rejects(tmp_path):
+    data = tmp_path / "data.csv"
+    shutil.copy(resolve_path(DEFAULT_DATA_PATH), data)
+    output = tmp_path / "out"
+    run_pipeline(data, output, budget_seconds=5)
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    pd.DataFrame([NEW, {**NEW, "record_id": "REC_0001"}]).to_csv(
+        inbox / "ops.csv", index=False
+    )
+
+    (inbox / "broken.jsonl").write_text("{oops\n[1, 2]\n")
+
+    summary = ingest_inbox(inbox, data_path=data, output_dir=output)
+    assert (summary["accepted"], summary["rejected"]) == (1, 3)
+    assert not (inbox / "ops.csv").exists()
+    rejects = pd.read_json(inbox / "processed" / "ops.csv.rejects.jsonl", lines=True)
+    assert rejects["record_id"].tolist() == ["REC_0001"]
+    broken = pd.read_json(
+        inbox / "processed" / "broken.jsonl.rejects.jsonl", lines=True
+    )
+    assert broken["raw"].tolist() == ["{oops", "[1, 2]"]
+    assert broken["reason"].tolist()[1] == "not a JSON object"
+    assert ingest_inbox(inbox, data_path=data, output_dir=output) is None
+
+
+def test_failed_batches_leave_the_source_untouched_and_can_be_retried(
+    tmp_path, monkeypatch
+):
+    data = tmp_path / "data.csv"
+    shutil.copy(resolve_path(DEFAULT_DATA_PATH), data)
+    source = data.read_bytes()
+    output = tmp_path / "out"
+    batch = pd.DataFrame([NEW])
+
+    # Nothing published yet: fail before appending anything
+    with pytest.raises(FileNotFoundError):
+        ingest_batch(batch, data_path=data, output_dir=output)
+    assert data.read_bytes() == source
+
+    run_pipeline(data, output, budget_seconds=5)
+    published = current_version(output)
+
+    def broken_publish(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(publish_module, "publish", broken_publish)
+        with pytest.raises(OSError):
+            ingest_batch(batch, data_path=data, output_dir=output)
+    assert data.read_bytes() == source
+    assert current_version(output) == published
+
+    # The retry is not rejected as a duplicate
+    summary = ingest_batch(batch, data_path=data, output_dir=output)
+    assert summary["accepted"] == 1 and summary["version"] != published
+    assert load_data(data)["record_id"].tolist().count("OPS_0001") == 1
+
+
+def test_batches_reuse_the_published_runs_model_and_filters(tmp_path):
+    data = tmp_path / "data.csv"
+    shutil.copy(resolve_path(DEFAULT_DATA_PATH), data)
+    output = tmp_path / "out"
+    indicators = ["USG_P2P_COUNT", "ACC_OWNERSHIP"]
+    run_pipeline(data, output, indicators=indicators, budget_seconds=5, model="huber")
+
+    other = {**NEW, "record_id": "OPS_2", "indicator_code": "ACC_FAYDA"}
+    summary = ingest_batch(
+        pd.DataFrame([NEW, other]), data_path=data, output_dir=output
+    )
+    assert summary["accepted"] == 2
+    assert summary["series"] == [("ETH", "USG_P2P_COUNT", "all", "all")]
+    pinned = open_version(output)
+    assert pinned.manifest["run"]["model"] == "huber"
+    assert "anomaly" in pinned.read("inclusion_forecast")
+    codes = set(pinned.read("series_forecast")["indicator_code"])
+    assert codes <= set(indicators)
+
+    # Out of the run's filters: appended to the source, nothing republished
+    summary = ingest_batch(
+        pd.DataFrame([{**other, "record_id": "OPS_3", "observation_date": "2025-07"}]),
+        data_path=data,
+        output_dir=output,
+    )
+    assert summary["accepted"] == 1 and summary["version"] == ""
+    assert "OPS_3" in set(load_data(data)["record_id"])
@@ -0,0 +1,134 @@
+"""
+Numerical regression tests for InclusionModeler: preprocessing, the impact
+matrix and the forecast are pinned against golden files, and the optimized
+paths (feature store, incremental updates) against straightforward
+reference implementations. Regenerate the golden files with
+`pytest --update-golden` after an intended change of results.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.features import FeatureStore
+from src.modeling import InclusionModeler
+
+GOLDEN = Path(__file__).parent / "golden"
+# Golden values may differ in the last bits across BLAS builds
+RTOL = 1e-9
+
+
+def usage_frame(n=120, seed=0):
+    """Daily usage score with trend, weekly cycle and noise, as usage_score returns."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=n, freq="D")
+    t = np.arange(n)
+    value = 100 + 0.5 * t + 10 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 3, n)
+    return pd.DataFrame(
+        {
+            "date": dates,
+            "value": value,
+            "is_holiday": (dates.dayofweek >= 5).astype("int64"),
+        }
+    )
+
+
+def check_golden(name, frame, update):
+    path = GOLDEN / f"{name}.csv"
+    if update:
+        GOLDEN.mkdir(exist_ok=True)
+        frame.to_csv(path, index=False)
+    expected = pd.read_csv(path, parse_dates=["date"] if "date" in frame else None)
+    assert_frame_equal(
+        frame.reset_index(drop=True),
+        expected,
+        check_dtype=False,
+        check_exact=False,
+        rtol=RTOL,
+    )
+
+
+# --- golden files ---
+
+
+def test_preprocess_golden(update_golden):
+    check_golden(
+        "preprocess", InclusionModeler(usage_frame()).preprocess(), update_golden
+    )
+
+
+def test_impact_matrix_golden(update_golden):
+    check_golden(
+        "impact_matrix", InclusionModeler(usage_frame()).analyze_impact(), update_golden
+    )
+
+
+@pytest.mark.parametrize("model", ["linear", "naive"])
+def test_forecast_golden(update_golden, model):
+    forecast = InclusionModeler(usage_frame(), model=model).forecast_with_confidence()
+    check_golden(f"inclusion_forecast_{model}", forecast, update_golden)
+
+
+# --- optimized paths against reference implementations ---
+
+
+def reference_features(df):
+    return pd.DataFrame(
+        {
+            "day_of_week": df["date"].dt.dayofweek,
+            "month": df["date"].dt.month,
+            "lag_1": df["value"].shift(1),
+            "rolling_mean_3": df["value"].rolling(3).mean(),
+        }
+    ).fillna(0)
+
+
+def lstsq(X, y):
+    """(coef, intercept) of ordinary least squares with an intercept."""
+    design = np.column_stack([np.ones(len(X)), X])
+    beta = np.linalg.lstsq(design, y, rcond=None)[0]
+    return beta[1:], beta[0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 97])
+def test_preprocess_matches_reference(tmp_path, seed, n):
+    df = usage_frame(n, seed)
+    expected = reference_features(df)
+    features = list(InclusionModeler.FEATURES)
+
+    direct = InclusionModeler(df).preprocess()[features]
+    assert_frame_equal(direct, expected, check_dtype=False, rtol=1e-12)
+
+    # Through the feature store, grown in two appends
+    store = FeatureStore(tmp_path)
+    InclusionModeler(df.iloc[: n // 2], feature_store=store).preprocess()
+    stored = InclusionModeler(df, feature_store=store).preprocess()[features]
+    assert_frame_equal(stored, expected, check_dtype=False, rtol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_impact_coefficients_match_least_squares(seed):
+    df = usage_frame(60, seed)
+    impacts = InclusionModeler(df).analyze_impact()
+    X = df.assign(day_of_week=df["date"].dt.dayofweek)[["is_holiday", "day_of_week"]]
+    coef, _ = lstsq(X.to_numpy(float), df["value"].to_numpy())
+    np.testing.assert_allclose(impacts["Coefficient"], coef, rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_forecast_matches_least_squares(seed):
+    df = usage_frame(60, seed)
+    forecast = InclusionModeler(df).forecast_with_confidence()
+    X = reference_features(df).assign(is_holiday=df["is_holiday"])
+    X = X[["day_of_week", "month", "lag_1", "rolling_mean_3", "is_holiday"]]
+    coef, intercept = lstsq(X.to_numpy(float), df["value"].to_numpy())
+    fitted = X.to_numpy(float) @ coef + intercept
+    band = 1.96 * np.std(df["value"].to_numpy() - fitted)
+
+    np.testing.assert_allclose(forecast["Forecast"], fitted, rtol=1e-8)
+    np.testing.assert_allclose(forecast["Upper_Bound"] - fitted, band, rtol=1e-6)
+    np.testing.assert_allclose(fitted - forecast["Lower_Bound"], band, rtol=1e-6)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from src.backends import get_model
+from src.data import fingerprint, get_series, hash_rows, load_data
+from src.forecast import forecast_panel, forecast_series, future_dates, series_design
+from src.panel import Panel
+
+
+def series():
+    rng = np.random.default_rng(0)
+    out = {}
+    for i, n in enumerate([1, 4, 7]):
+        dates = pd.date_range("2015-01-01", periods=n, freq="YS")
+        out[("ETH", f"IND_{i}", "all", "all")] = pd.DataFrame(
+            {"date": dates, "value": rng.normal(50, 10, size=n)}
+        )
+    return out
+
+
+def test_round_trips_and_shares_buffers():
+    panel = Panel.from_series(series())
+    assert panel.n_series == 3 and len(panel) == 12
+    assert list(panel.lengths) == [1, 4, 7]
+
+    frame = panel.to_frame()
+    assert np.shares_memory(frame["value"].to_numpy(), panel.values)
+    table = panel.to_arrow()
+    assert np.shares_memory(table.column("value").to_numpy(), panel.values)
+
+    back = Panel.from_arrow(table)
+    # Already in panel order: the Arrow buffers are wrapped, not copied
+    assert np.shares_memory(back.values, table.column("value").to_numpy())
+    np.testing.assert_array_equal(back.values, panel.values)
+    np.testing.assert_array_equal(back.offsets, panel.offsets)
+    restored = back.to_series_dict()
+    for key, frame in series().items():
+        np.testing.assert_array_equal(restored[key]["value"], frame["value"])
+
+
+def test_from_frame_sorts_into_series():
+    long = pd.concat(
+        [frame.assign(indicator_code=key[1]) for key, frame in series().items()]
+    ).sample(frac=1, random_state=0)
+    panel = Panel.from_frame(long, keys=["indicator_code"])
+    assert [panel.key(i) for i in range(3)] == [("IND_0",), ("IND_1",), ("IND_2",)]
+    dates, _ = panel.series(2)
+    assert (np.diff(dates) > np.timedelta64(0)).all()
+
+
+def test_window_features_do_not_cross_series():
+    panel = Panel.from_series(series())
+    features = panel.features(["lag_1", "rolling_mean_2"])
+    first_rows = panel.offsets[:-1]
+    assert features.loc[first_rows, "lag_1"].isna().all()
+    assert features.loc[first_rows, "rolling_mean_2"].isna().all()
+    assert features["lag_1"].iloc[2] == panel.values[1]
+
+
+def test_resample_aggregates_within_series():
+    dates = pd.date_range("2020-01-01", periods=24, freq="MS")
+    frame = pd.DataFrame({"date": dates, "value": np.arange(24.0)})
+    panel = Panel.from_series({("ETH", "X", "all", "all"): frame})
+    yearly = panel.resample("YS", "sum")
+    np.testing.assert_array_equal(yearly.values, [66.0, 210.0])
+    assert list(yearly.dates.view("datetime64[ns]")) == list(
+        pd.to_datetime(["2020-01-01", "2021-01-01"])
+    )
+
+
+def test_batch_forecast_matches_per_series_backends():
+    data = {key: frame for key, frame in series().items() if len(frame) > 1}
+    for model in ("naive", "linear"):
+        batch = forecast_panel(Panel.from_series(data), model)
+        for i, (key, frame) in enumerate(data.items()):
+            X = series_design(frame["date"])
+            backend = get_model(model).fit(X, frame["value"])
+            future = series_design(
+                future_dates(frame["date"].iloc[-1]), frame["date"].iloc[0]
+            )
+            rows = batch.iloc[3 * i : 3 * i + 3]
+            np.testing.assert_allclose(rows["Forecast"], backend.predict(future))
+            lower, _ = backend.interval(future)
+            np.testing.assert_allclose(rows["Lower_Bound"], lower)
+
+
+def test_take_and_arrow_tables_out_of_order():
+    panel = Panel.from_series(series())
+    subset = panel.take([2, 0])
+    assert [subset.key(i)[1] for i in range(2)] == ["IND_2", "IND_0"]
+    np.testing.assert_array_equal(subset.series(0)[1], panel.series(2)[1])
+
+    shuffled = panel.to_arrow().take([11, 0, 5, 1, 2, 3, 4, 6, 7, 8, 9, 10])
+    back = Panel.from_arrow(shuffled)
+    np.testing.assert_array_equal(back.values, panel.values)
+    np.testing.assert_array_equal(back.offsets, panel.offsets)
+
+
+def test_observation_panel_matches_get_series():
+    raw = load_data()
+    panel = Panel.from_observations(raw)
+    expected = get_series(raw)
+    assert list(panel.to_series_dict()) == list(expected)
+    hashes = panel.row_hashes()
+    for i, (key, frame) in enumerate(expected.items()):
+        np.testing.assert_array_equal(panel.series(i)[1], frame["value"])
+        rows = hashes[panel.offsets[i] : panel.offsets[i + 1]]
+        assert hash_rows(rows, "x") == fingerprint(panel.series_frame(i), "x")
+
+    models = {
+        key: "linear" if len(frame) > 3 else "naive" for key, frame in expected.items()
+    }
+    from_panel, _ = forecast_series(panel, models)
+    from_dict, _ = forecast_series(expected, models)
+    pd.testing.assert_frame_equal(from_panel, from_dict)
@@ -0,0 +1,113 @@
+"""
+Time and memory budgets of the key stages on generated large inputs.
+Opt-in (`pytest --perf` or PERF_TESTS=1): timings depend on the machine,
+so the budgets are generous multiples of a laptop run and only catch
+regressions in complexity, not small slowdowns.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import compute_features
+from src.forecast import forecast_series
+from src.modeling import InclusionModeler, usage_score
+from src.profiling import PipelineProfiler
+
+pytestmark = pytest.mark.perf
+
+# {stage: (wall seconds, traced peak MB)}
+BUDGETS = {
+    "usage_score": (5.0, 1_000),
+    "preprocess": (3.0, 300),
+    "forecast": (15.0, 500),
+    # Robust fits keep the OLS forecast budget
+    "robust_forecast": (15.0, 500),
+    "rolling_features": (2.0, 400),
+    "series_forecast": (20.0, 500),
+}
+
+
+@pytest.fixture(scope="module")
+def profiler():
+    return PipelineProfiler("perf", trace_memory=True)
+
+
+def check_budget(record):
+    seconds, megabytes = BUDGETS[record["stage"]]
+    assert record["wall_seconds"] < seconds, record
+    assert record["peak_traced_mb"] < megabytes, record
+
+
+def raw_records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2000-01-01") + pd.to_timedelta(
+        rng.integers(0, 365 * 25, n), unit="D"
+    )
+    return pd.DataFrame(
+        {
+            "record_type": rng.choice(["observation", "event", "target"], n),
+            "observation_date": dates,
+            "value_numeric": rng.normal(50, 10, n),
+        }
+    )
+
+
+def daily_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1990-01-01", periods=n, freq="D")
+    return pd.DataFrame(
+        {
+            "date": dates,
+            "value": rng.normal(100, 10, n).cumsum(),
+            "is_holiday": (dates.dayofweek >= 5).astype("int64"),
+        }
+    )
+
+
+def test_usage_score_budget(profiler):
+    raw = raw_records(2_000_000)
+    with profiler.stage("usage_score", rows=len(raw)) as record:
+        usage_score(raw)
+    check_budget(record)
+
+
+def test_modeler_budget(profiler):
+    modeler = InclusionModeler(daily_frame(20_000))
+    with profiler.stage("preprocess") as record:
+        modeler.preprocess()
+    check_budget(record)
+    with profiler.stage("forecast") as record:
+        modeler.forecast_with_confidence()
+    check_budget(record)
+
+
+def test_robust_modeler_budget(profiler):
+    modeler = InclusionModeler(daily_frame(20_000), model="huber")
+    with profiler.stage("robust_forecast") as record:
+        modeler.forecast_with_confidence()
+    check_budget(record)
+
+
+def test_rolling_features_are_linear_in_window(profiler):
+    frame = daily_frame(1_000_000)
+    names = ["rolling_mean_500", "rolling_std_500", "rolling_max_500"]
+    with profiler.stage("rolling_features") as record:
+        compute_features(frame, names)
+    check_budget(record)
+
+
+def test_batched_series_forecast_budget(profiler):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2011-01-01", periods=12, freq="YS")
+    series = {
+        ("ETH", f"IND_{i}", "all", "all"): pd.DataFrame(
+            {"date": dates, "value": rng.normal(50, 5, len(dates))}
+        )
+        for i in range(5_000)
+    }
+    models = {key: ("linear" if i % 2 else "naive") for i, key in enumerate(series)}
+    with profiler.stage("series_forecast", rows=len(series)) as record:
+        forecast, _ = forecast_series(series, models)
+    check_budget(record)
+    assert len(forecast) == 3 * len(series)
@@ -0,0 +1,58 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.profiling import PipelineProfiler
+
+
+def allocate(profiler, name, mb):
+    with profiler.stage(name, rows=1):
+        block = np.ones(mb * 2**17)  # mb MB of float64
+        time.sleep(0.05)
+        del block
+
+
+def test_records_are_logged_and_exported(tmp_path):
+    profiler = PipelineProfiler("test", log_path=tmp_path / "stages.jsonl")
+    with profiler.stage("load") as record:
+        record["rows"] = 42
+    (logged,) = [json.loads(line) for line in open(tmp_path / "stages.jsonl")]
+    assert logged == profiler.records[0]
+    assert logged["stage"] == "load" and logged["rows"] == 42
+    assert logged["wall_seconds"] >= 0 and logged["process_peak_rss_mb"] > 0
+    assert "peak_traced_mb" not in logged
+
+    profiler.write_prometheus(tmp_path / "metrics.prom")
+    text = (tmp_path / "metrics.prom").read_text()
+    assert 'fi_pipeline_stage_rows{run="test",stage="load"} 42' in text
+    assert "# HELP fi_pipeline_stage_process_peak_rss_mb" in text
+
+
+def test_traced_stages_only_count_their_own_allocations():
+    profiler = PipelineProfiler("test", trace_memory=True)
+    held = np.ones(40 * 2**17)  # allocated before: not part of any stage
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(allocate, [profiler] * 2, ["a", "b"], [20, 10]))
+    elapsed = time.perf_counter() - start
+    del held
+    peaks = {record["stage"]: record["peak_traced_mb"] for record in profiler.records}
+    assert 19 < peaks["a"] < 23 and 9 < peaks["b"] < 13
+    # Traced stages ran one after the other
+    assert elapsed >= sum(record["wall_seconds"] for record in profiler.records)
+
+
+def test_profiled_stages_in_threads_each_get_a_dump(tmp_path):
+    # Python 3.12+ allows one active cProfile at a time
+    profiler = PipelineProfiler("test", profile_dir=tmp_path)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(allocate, [profiler] * 2, ["a", "b"], [1, 1]))
+    elapsed = time.perf_counter() - start
+    assert sorted(path.name for path in tmp_path.glob("*.prof")) == [
+        "a.prof",
+        "b.prof",
+    ]
+    assert elapsed >= sum(record["wall_seconds"] for record in profiler.records)
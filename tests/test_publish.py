@@ -0,0 +1,114 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import src.publish as publish_module
+from src.modeling import run_pipeline
+from src.publish import (
+    current_version,
+    list_versions,
+    merge_published,
+    open_version,
+    prune_versions,
+    publish,
+)
+from src.summary import USAGE_KEY
+
+
+def frames(value=1.0):
+    return {"forecast": pd.DataFrame({"date": ["2024-01-01"], "value": [value]})}
+
+
+def backdate(root, version, hours):
+    """Move a version's manifest creation time `hours` into the past."""
+    path = root / "versions" / version / "manifest.json"
+    manifest = json.loads(path.read_text())
+    created = pd.Timestamp(manifest["created"]) - pd.Timedelta(hours=hours)
+    manifest["created"] = created.isoformat()
+    path.write_text(json.dumps(manifest))
+
+
+def test_publish_pin_and_verify(tmp_path):
+    first = publish(frames(1.0), tmp_path)
+    pinned = open_version(tmp_path)
+    assert pinned.version == first == current_version(tmp_path)
+    assert pinned.names == ["forecast"]
+
+    second = publish(frames(2.0), tmp_path)
+    # The pin keeps reading its own snapshot after a newer publish
+    assert pinned.read("forecast")["value"].tolist() == [1.0]
+    assert open_version(tmp_path).read("forecast")["value"].tolist() == [2.0]
+    assert list_versions(tmp_path) == [first, second]
+    pinned.verify("forecast")
+
+    with pytest.raises(FileNotFoundError):
+        open_version(tmp_path / "empty")
+
+
+def test_versions_are_ordered_by_creation_not_name(tmp_path, monkeypatch):
+    ids = iter(["20240101T000000-ffffffff", "20240101T000000-00000000"])
+    monkeypatch.setattr(publish_module, "new_version_id", lambda: next(ids))
+    older = publish(frames(1.0), tmp_path)
+    newer = publish(frames(2.0), tmp_path)
+    # Same second: the random suffix would sort them the other way round
+    assert older > newer
+    assert list_versions(tmp_path) == [older, newer]
+    assert current_version(tmp_path) == newer
+
+
+def test_prune_keeps_recently_superseded_versions(tmp_path):
+    versions = [publish(frames(i), tmp_path, keep=1) for i in range(4)]
+    # Superseded seconds ago: readers may still hold a pin on them
+    assert list_versions(tmp_path) == versions
+
+    for version in versions:
+        backdate(tmp_path, version, hours=2)
+    prune_versions(tmp_path, keep=2)
+    assert list_versions(tmp_path) == versions[2:]
+
+    # Without a grace period only the newest `keep` remain
+    prune_versions(tmp_path, keep=1, grace_seconds=0)
+    assert list_versions(tmp_path) == versions[3:]
+
+
+def test_failed_publish_leaves_no_staging_dir(tmp_path, monkeypatch):
+    first = publish(frames(), tmp_path)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(publish_module, "write_output", fail)
+    with pytest.raises(OSError, match="disk full"):
+        publish(frames(), tmp_path)
+    assert os.listdir(tmp_path / "versions") == [first]
+    assert current_version(tmp_path) == first
+
+
+def test_merge_indicator_shards(tmp_path):
+    shards = {"p2p": ["USG_P2P_COUNT"], "fayda": ["ACC_FAYDA"]}
+    for name, indicators in shards.items():
+        run_pipeline(output_dir=tmp_path / name, indicators=indicators)
+    merge_published([tmp_path / name for name in shards], tmp_path / "merged")
+    merged = open_version(tmp_path / "merged")
+
+    forecast = merged.read("series_forecast")
+    assert set(forecast["indicator_code"]) == {"USG_P2P_COUNT", "ACC_FAYDA"}
+    # The fayda shard has no event links: its empty estimates merge cleanly
+    estimates = merged.read("impact_estimates")
+    assert not estimates.empty
+    assert set(estimates["indicator_code"]) == {"USG_P2P_COUNT"}
+    # Aggregate tables are fitted per shard and keep their source
+    aggregate = merged.read("inclusion_forecast")
+    assert set(aggregate["shard"]) == set(shards)
+    assert len(aggregate) == sum(
+        len(open_version(tmp_path / name).read("inclusion_forecast")) for name in shards
+    )
+    # One usage row, for the score over both shards' indicators
+    index = merged.read("summary_index")
+    usage = index[index["indicator_code"] == USAGE_KEY[1]]
+    assert len(usage) == 1
+    total = aggregate.groupby("date")["value"].sum()
+    assert usage["last_value"].iloc[0] == pytest.approx(total.iloc[-1])
+    assert usage["n_obs"].iloc[0] == len(total)
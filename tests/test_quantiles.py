@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from src.forecast import forecast_series
+from src.publish import open_version, publish
+from src.quantiles import (
+    ROW_GROUP_ROWS,
+    quantile_column,
+    quantile_grid,
+    read_quantiles,
+    write_quantiles,
+)
+
+
+def series_forecast(n_series=10, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2011-01-01", periods=8, freq="YS")
+    series = {
+        (country, f"IND_{i}", "all", "all"): pd.DataFrame(
+            {"date": dates, "value": rng.normal(50, 5, len(dates))}
+        )
+        for country in ("KEN", "ETH")
+        for i in range(n_series)
+    }
+    forecast, _ = forecast_series(series, {key: "linear" for key in series})
+    return forecast
+
+
+def test_quantile_column_names():
+    assert [quantile_column(q) for q in (0.05, 0.5, 0.975)] == ["q05", "q50", "q975"]
+    with pytest.raises(ValueError):
+        quantile_column(1.0)
+
+
+def test_grid_matches_the_forecast_bands():
+    forecast = series_forecast()
+    grid = quantile_grid(forecast, quantiles=(0.025, 0.5, 0.975))
+    assert grid["horizon"].tolist() == [1, 2, 3] * (len(forecast) // 3)
+    assert (grid[["q025", "q50", "q975"]].dtypes == np.float32).all()
+    np.testing.assert_allclose(grid["q50"], forecast["Forecast"], rtol=1e-6)
+    np.testing.assert_allclose(grid["q025"], forecast["Lower_Bound"], rtol=1e-5)
+    np.testing.assert_allclose(grid["q975"], forecast["Upper_Bound"], rtol=1e-5)
+
+
+def test_roundtrip_and_subset_reads(tmp_path):
+    grid = quantile_grid(series_forecast())
+    path = write_quantiles(grid, tmp_path / "q.parquet")
+
+    full = read_quantiles(path)
+    expected = grid.sort_values(["country", "indicator_code", "date"], kind="stable")
+    pd.testing.assert_frame_equal(
+        full, expected.reset_index(drop=True), check_dtype=False
+    )
+
+    subset = read_quantiles(path, [0.05, 0.95], country="KEN", indicator_code="IND_3")
+    assert list(subset.columns[-2:]) == ["q05", "q95"]
+    assert len(subset) == 3 and set(subset["country"]) == {"KEN"}
+    with pytest.raises(ValueError, match="not stored"):
+        read_quantiles(path, [0.1])
+    with pytest.raises(ValueError, match="Unknown series keys"):
+        read_quantiles(path, region="x")
+
+
+def test_file_layout_skips_row_groups(tmp_path):
+    n_series = ROW_GROUP_ROWS  # three row groups per country
+    path = write_quantiles(
+        quantile_grid(series_forecast(n_series)), tmp_path / "q.parquet"
+    )
+    metadata = pq.ParquetFile(path).metadata
+    column = metadata.row_group(0).column(0)
+    assert column.compression == "ZSTD"
+    assert "RLE_DICTIONARY" in column.encodings
+    assert pq.read_schema(path).field("q50").type == "float"
+
+    fragment = next(ds.dataset(path).get_fragments())
+    fragment.ensure_complete_metadata()
+    selected = fragment.subset(
+        filter=(pc.field("country") == "ETH") & (pc.field("indicator_code") == "IND_5")
+    )
+    assert len(selected.row_groups) < metadata.num_row_groups / 2
+
+
+def test_published_as_parquet_whatever_the_format(tmp_path):
+    forecast = series_forecast(3)
+    publish(
+        {"series_forecast": forecast, "series_quantiles": quantile_grid(forecast)},
+        tmp_path,
+        fmt="csv",
+    )
+    pinned = open_version(tmp_path)
+    assert pinned.manifest["files"]["series_quantiles"]["file"].endswith(".parquet")
+    assert len(pinned.read("series_quantiles")) == len(forecast)
+    # Empty forecasts still publish a (column-only) grid
+    assert list(quantile_grid(pd.DataFrame()).columns[-5:]) == [
+        "q05",
+        "q25",
+        "q50",
+        "q75",
+        "q95",
+    ]
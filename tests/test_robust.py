@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backends import get_model
+from src.forecast import forecast_series
+from src.modeling import InclusionModeler
+from src.robust import irls, mad_anomalies
+
+
+def line(n=30, seed=0, outlier=None):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float)
+    y = 2.0 + 0.5 * x + rng.normal(0, 0.3, n)
+    if outlier is not None:
+        y[outlier] += 1000.0
+    return x[:, None], y
+
+
+@pytest.mark.parametrize("model", ["huber", "quantile"])
+def test_outlier_influence_is_bounded(model):
+    X, y = line(outlier=12)
+    robust = get_model(model).fit(X, y)
+    ols = get_model("linear").fit(X, y)
+    assert abs(robust.state["coef"][0] - 0.5) < 0.05
+    assert abs(ols.state["coef"][0] - 0.5) > 1
+    # The robust scale ignores the outlier, so the interval stays narrow
+    assert robust.resid_std_ < 1 < ols.resid_std_
+
+
+def test_quantile_regression_splits_the_rows():
+    X, y = line(n=200)
+    fit = get_model("quantile", quantile=0.9).fit(X, y)
+    above = (y > fit.predict(X)).mean()
+    assert 0.05 < above < 0.15
+
+
+@pytest.mark.parametrize("loss", ["huber", "quantile"])
+def test_batched_fits_match_single_fits(loss):
+    lengths = [5, 9, 30, 12]
+    X = np.zeros((len(lengths), max(lengths), 2))
+    y = np.zeros(X.shape[:2])
+    mask = np.zeros(X.shape[:2], dtype=bool)
+    for b, n in enumerate(lengths):
+        x, values = line(n, seed=b, outlier=n // 2)
+        X[b, :n] = np.column_stack([np.ones(n), x])
+        y[b, :n], mask[b, :n] = values, True
+
+    beta, scale, _ = irls(X, y, mask, loss=loss)
+    for b, n in enumerate(lengths):
+        single, single_scale, _ = irls(X[b : b + 1, :n], y[b : b + 1, :n], loss=loss)
+        np.testing.assert_allclose(beta[b], single[0], rtol=1e-9)
+        np.testing.assert_allclose(scale[b], single_scale[0], rtol=1e-9)
+
+
+@pytest.mark.parametrize("model", ["huber", "quantile"])
+def test_panel_forecast_matches_backend(model):
+    rng = np.random.default_rng(1)
+    dates = pd.date_range("2011-01-01", periods=10, freq="YS")
+    series = {
+        ("ETH", f"IND_{i}", "all", "all"): pd.DataFrame(
+            {"date": dates[: 4 + i], "value": rng.normal(50, 5, 4 + i)}
+        )
+        for i in range(6)
+    }
+    series[("ETH", "IND_5", "all", "all")].loc[3, "value"] = 5_000.0
+    batched, _ = forecast_series(series, {key: model for key in series})
+
+    for key, frame in series.items():
+        # A panel of one series: the batch must not couple the fits
+        single, _ = forecast_series({key: frame}, {key: model})
+        rows = batched["indicator_code"] == key[1]
+        np.testing.assert_allclose(
+            batched.loc[rows, ["Forecast", "Upper_Bound"]].to_numpy(),
+            single[["Forecast", "Upper_Bound"]].to_numpy(),
+            rtol=1e-9,
+        )
+
+
+def test_mad_anomalies_per_series():
+    values = np.r_[np.linspace(10, 20, 20), np.linspace(100, 90, 20)]
+    values[[5, 30]] *= 10
+    groups = np.repeat(["a", "b"], 20)
+    flags = mad_anomalies(values, groups)
+    assert np.flatnonzero(flags).tolist() == [5, 30]
+    # A constant series has nothing to flag
+    assert not mad_anomalies(np.full(10, 3.0)).any()
+
+
+def test_robust_modeler_flags_and_skips_anomalies():
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "date": dates,
+            "value": 100 + np.arange(60) + rng.normal(0, 1, 60),
+            "is_holiday": (dates.dayofweek >= 5).astype("int64"),
+        }
+    )
+    df.loc[40, "value"] = 50_000.0
+    robust = InclusionModeler(df, model="huber").forecast_with_confidence()
+    ols = InclusionModeler(df).forecast_with_confidence()
+    assert robust["anomaly"].tolist() == [i == 40 for i in range(60)]
+    # Away from the rows whose lag features see the outlier
+    unaffected = ~robust.index.isin([40, 41, 42, 43])
+    error = (robust["Forecast"] - robust["value"])[unaffected].abs()
+    assert error.max() < 30
+    assert (ols["Forecast"] - ols["value"])[unaffected].abs().max() > 1_000
+    # The OLS path is unchanged: no anomaly column
+    assert "anomaly" not in ols
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+import src.scenarios as scenarios
+from src.scenarios import impact_links, simulate
+
+
+def raw_records():
+    event = {
+        "record_id": "EVT_1",
+        "record_type": "event",
+        "country": "ETH",
+        "indicator": "Interop Launch",
+        "indicator_code": "EVT_INTEROP",
+        "observation_date": pd.Timestamp("2026-01-01"),
+    }
+    link = {
+        "record_id": "IMP_1",
+        "record_type": "impact_link",
+        "parent_id": "EVT_1",
+        "indicator_code": "USG_P2P_COUNT",
+        "impact_direction": "increase",
+        "impact_magnitude": "medium",
+        "impact_estimate": 0.0,  # no estimate: magnitude default applies
+        "lag_months": 12.0,
+        "evidence_basis": "empirical",
+    }
+    return pd.DataFrame([event, link])
+
+
+def baseline():
+    dates = pd.to_datetime(["2025-01-01", "2026-07-02", "2027-01-01"])
+    return pd.DataFrame(
+        {
+            "country": "ETH",
+            "indicator_code": ["USG_P2P_COUNT"] * 3 + ["ACC_OWNERSHIP"] * 3,
+            "date": list(dates) * 2,
+            "Forecast": 100.0,
+        }
+    )
+
+
+def test_links_use_magnitude_defaults_and_evidence_spread():
+    links = impact_links(raw_records())
+    assert links.loc[0, ["event_code", "mean", "cv", "sign"]].tolist() == [
+        "EVT_INTEROP",
+        10.0,
+        0.25,
+        1.0,
+    ]
+
+
+def test_simulation_ramps_effects_and_leaves_unlinked_series_alone():
+    fan = simulate(baseline(), impact_links(raw_records()), n_paths=20_000)
+    p2p = fan[fan["indicator_code"] == "USG_P2P_COUNT"]
+    # before the event, half-way through the lag, fully ramped in
+    np.testing.assert_allclose(p2p["Scenario_Mean"], [100, 105, 110], rtol=5e-3)
+    assert (p2p["p5"] <= p2p["p50"]).all() and (p2p["p50"] <= p2p["p95"]).all()
+    unlinked = fan[fan["indicator_code"] == "ACC_OWNERSHIP"]
+    assert (unlinked[["p5", "p95"]] == 100.0).all().all()
+
+
+def test_shifting_an_event_earlier_brings_its_effect_forward():
+    links = impact_links(raw_records())
+    base = simulate(baseline(), links, seed=1)
+    earlier = simulate(baseline(), links, shifts={"EVT_INTEROP": -12}, seed=1)
+    assert earlier.loc[1, "p50"] > base.loc[1, "p50"] > 100.0
+
+
+def test_blocks_of_rows_give_the_same_fan(monkeypatch):
+    links = impact_links(raw_records())
+    whole = simulate(baseline(), links, n_paths=1_000)
+    # One row of 1,000 paths per block
+    monkeypatch.setattr(scenarios, "CHUNK_CELLS", 1_000)
+    blocked = simulate(baseline(), links, n_paths=1_000)
+    pd.testing.assert_frame_equal(blocked, whole, rtol=1e-12)
@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.selection import select_models, selected_models
+
+
+def series():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2011-01-01", periods=10, freq="YS")
+    t = np.arange(10.0)
+    return {
+        # A clean trend: naive lags behind it, a linear fit is near exact
+        ("ETH", "TREND", "all", "all"): pd.DataFrame(
+            {"date": dates, "value": 100 + 10 * t + rng.normal(0, 0.1, 10)}
+        ),
+        # Flat: the last value is already a good forecast
+        ("ETH", "FLAT", "all", "all"): pd.DataFrame(
+            {"date": dates, "value": 50 + rng.normal(0, 0.1, 10)}
+        ),
+    }
+
+
+def rows(selection, code):
+    return selection[selection["indicator_code"] == code]
+
+
+def test_records_the_winner_and_timings():
+    selection = select_models(series(), cheap=("naive", "linear"), expensive=())
+    assert selection.groupby("indicator_code")["selected"].sum().tolist() == [1, 1]
+    assert (selection["status"] == "scored").all()
+    assert (selection["fit_seconds"] > 0).all()
+    winners = selected_models(selection)
+    assert winners[("ETH", "TREND", "all", "all")] == "linear"
+    winner = rows(selection, "TREND").query("selected")
+    assert winner["score"].iloc[0] == rows(selection, "TREND")["score"].min()
+
+
+def test_expensive_candidates_stop_early():
+    selection = select_models(
+        series(), cheap=("naive",), expensive=("linear", "ridge"), tolerance=0.05
+    )
+    # FLAT is good enough on the cheap model; TREND stops at the first
+    # expensive candidate within tolerance
+    assert rows(selection, "FLAT")["model"].tolist() == ["naive"]
+    trend = rows(selection, "TREND")
+    assert trend["model"].tolist() == ["naive", "linear"]
+    assert trend.query("selected")["model"].tolist() == ["linear"]
+
+
+def test_budget_exhaustion_keeps_the_cheap_winner():
+    selection = select_models(
+        series(),
+        cheap=("naive",),
+        expensive=("linear", "ridge"),
+        tolerance=0.05,
+        budget_seconds=0,
+    )
+    trend = rows(selection, "TREND")
+    assert trend["status"].tolist() == [
+        "scored",
+        "budget_exhausted",
+        "budget_exhausted",
+    ]
+    assert trend["fit_seconds"].iloc[1:].eq(0).all()
+    assert trend.query("selected")["model"].tolist() == ["naive"]
+
+
+def test_rerun_hits_the_cache(tmp_path):
+    cache_path = tmp_path / "selection.json"
+    first = select_models(
+        series(), cheap=("naive", "linear"), expensive=(), cache_path=cache_path
+    )
+    assert len(json.loads(cache_path.read_text())) == 2
+
+    again = select_models(
+        series(), cheap=("naive", "linear"), expensive=(), cache_path=cache_path
+    )
+    assert (again["status"] == "cached").all() and len(again) == 2
+    assert (again["fit_seconds"] == 0).all()
+    assert selected_models(again) == selected_models(first)
+
+    # Changed data or candidates are rescored
+    changed = series()
+    changed[("ETH", "FLAT", "all", "all")].loc[9, "value"] = 80.0
+    rerun = select_models(
+        changed, cheap=("naive", "linear"), expensive=(), cache_path=cache_path
+    )
+    assert rows(rerun, "FLAT")["status"].tolist() == ["scored", "scored"]
+    assert rows(rerun, "TREND")["status"].tolist() == ["cached"]
+    other = select_models(
+        series(), cheap=("naive",), expensive=(), cache_path=cache_path
+    )
+    assert (other["status"] == "scored").all()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from src.scenarios import impact_links
+from src.sensitivity import expected_scenario, jacobian, sensitivity, sensitivity_matrix
+
+
+def links():
+    events = pd.DataFrame(
+        {
+            "record_id": ["EVT_1", "EVT_2"],
+            "record_type": "event",
+            "country": "ETH",
+            "indicator": ["Interop Launch", "Price Increase"],
+            "indicator_code": ["EVT_INTEROP", "EVT_PRICE"],
+            "observation_date": pd.to_datetime(["2026-01-01", "2025-06-01"]),
+        }
+    )
+    impact = pd.DataFrame(
+        {
+            "record_id": ["IMP_1", "IMP_2", "IMP_3"],
+            "record_type": "impact_link",
+            "parent_id": ["EVT_1", "EVT_1", "EVT_2"],
+            "indicator_code": ["USG_P2P_COUNT", "ACC_OWNERSHIP", "USG_P2P_COUNT"],
+            "impact_direction": ["increase", "increase", "decrease"],
+            "impact_magnitude": "medium",
+            "impact_estimate": [15.0, 0.0, 4.0],
+            "lag_months": [12.0, 6.0, 0.0],
+            "evidence_basis": "empirical",
+        }
+    )
+    return impact_links(pd.concat([events, impact], ignore_index=True))
+
+
+def baseline():
+    dates = pd.to_datetime(["2025-01-01", "2026-07-02", "2027-06-01"])
+    return pd.DataFrame(
+        {
+            "country": "ETH",
+            "indicator_code": ["USG_P2P_COUNT"] * 3 + ["ACC_OWNERSHIP"] * 3,
+            "date": list(dates) * 2,
+            "Forecast": [100.0, 120.0, 150.0, 40.0, 42.0, 45.0],
+        }
+    )
+
+
+def test_jacobian_matches_finite_differences():
+    base, lnk = baseline(), links()
+    d_estimate, d_lag = jacobian(base, lnk)
+    h = 1e-4
+    for i in range(len(lnk)):
+        for column, analytic in (("mean", d_estimate), ("lag_months", d_lag)):
+            up, down = lnk.copy(), lnk.copy()
+            up.loc[i, column] += h
+            down.loc[i, column] -= h
+            numeric = (expected_scenario(base, up) - expected_scenario(base, down)) / (
+                2 * h
+            )
+            np.testing.assert_allclose(analytic[i], numeric, rtol=1e-6, atol=1e-8)
+    # Mid-ramp rows react to the lag; finished and unlinked rows do not
+    assert d_lag[0, 1] < 0
+    assert d_lag[0, 2] == 0 and d_lag[0, 3] == 0
+
+
+def test_table_and_matrix():
+    table = sensitivity(baseline(), links())
+    assert len(table) == 3 * 2 + 3  # links x rows of their indicator
+    matrix = sensitivity_matrix(table)
+    assert matrix.loc["EVT_PRICE", "USG_P2P_COUNT"] < 0
+    assert matrix.loc["EVT_PRICE", "ACC_OWNERSHIP"] == 0
+    # At the horizon the interop effect is fully in: 15% of a level of
+    # 150 * (1 + 0.15 - 0.04)
+    assert np.isclose(matrix.loc["EVT_INTEROP", "USG_P2P_COUNT"], 0.15 / 1.11)
@@ -0,0 +1,157 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from src.sources import SourceCache, resolve_sources
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Local stand-in for the source sites: /doc/<name>, redirects, errors."""
+
+    protocol_version = "HTTP/1.1"
+    requests, active, peak = [], 0, 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(self.path)
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(0.02)
+            if self.path.startswith("/old/"):
+                self.send_response(302)
+                self.send_header("Location", self.path.replace("/old/", "/doc/"))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.path.startswith("/chunked/"):
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for part in (b"findex ", b"table"):
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+                self.wfile.write(b"0\r\n\r\n")
+            elif self.path.startswith("/truncated/"):
+                self.send_response(200)
+                self.send_header("Content-Length", "1000")
+                self.end_headers()
+                self.wfile.write(b"only the start")
+                self.close_connection = True
+            elif self.path.startswith("/garbage/"):
+                self.wfile.write(b"SSH-2.0-OpenSSH\r\n\r\n")
+                self.close_connection = True
+            elif self.path.startswith("/badchunk/"):
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self.wfile.write(b"zz\r\nnot hex\r\n")
+                self.close_connection = True
+            elif self.path.startswith("/doc/"):
+                # Same body for /doc/a?copy=..: stored once in the cache
+                body = f"document {self.path.split('?')[0]}".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_error(404)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StandIn.requests, StandIn.active, StandIn.peak = [], 0, 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def records(base, paths):
+    return pd.DataFrame(
+        {
+            "record_id": [f"REC_{i}" for i in range(len(paths))],
+            "source_name": "Global Findex",
+            "evidence_basis": "empirical",
+            "source_url": [None if p is None else base + p for p in paths],
+        }
+    )
+
+
+def test_fetches_concurrently_and_links_records(server, tmp_path):
+    paths = [f"/doc/{i}" for i in range(40)] + ["/doc/0", None]
+    links = resolve_sources(
+        records(server, paths), cache_dir=tmp_path, max_connections=4
+    )
+    assert len(links) == 41  # records without a source_url are not linked
+    assert (links["error"] == "").all() and (links["status"] == 200).all()
+    # Shared URLs are fetched once; the pool bounds concurrent requests
+    assert len(StandIn.requests) == 40
+    assert 1 < StandIn.peak <= 4
+    first = links.iloc[0]
+    assert open(first["path"], "rb").read() == b"document /doc/0"
+    assert links.iloc[40]["sha256"] == first["sha256"]
+
+    # Within the TTL everything comes from the cache
+    again = resolve_sources(records(server, paths), cache_dir=tmp_path)
+    assert again["from_cache"].all() and len(StandIn.requests) == 40
+
+
+def test_redirects_chunks_errors_and_stale_fallback(server, tmp_path):
+    paths = ["/old/a", "/chunked/b", "/missing", "/doc/a?copy=1"]
+    links = resolve_sources(records(server, paths), cache_dir=tmp_path)
+    assert links["status"].tolist() == [200, 200, 404, 200]
+    assert links.loc[2, "error"] == "HTTP 404" and pd.isna(links.loc[2, "path"])
+    assert open(links.loc[1, "path"], "rb").read() == b"findex table"
+    # Content-addressed: the redirected and the direct copy share one object
+    assert links.loc[0, "path"] == links.loc[3, "path"]
+    with SourceCache(tmp_path) as cache:
+        assert len(cache) == 3
+        assert cache.get(server + "/old/a")["final_url"] == server + "/doc/a"
+
+    # Expired entries are refetched; an unreachable source keeps its stale copy
+    dead = records("http://127.0.0.1:9", ["/doc/z"])
+    with SourceCache(tmp_path) as cache:
+        cache.put(dead.loc[0, "source_url"], b"old copy")
+    links = resolve_sources(dead, cache_dir=tmp_path, ttl=0, timeout=2)
+    assert links.loc[0, "from_cache"] and links.loc[0, "error"]
+    assert open(links.loc[0, "path"], "rb").read() == b"old copy"
+
+
+def test_records_without_sources(tmp_path):
+    links = resolve_sources(records("", [None, None]), cache_dir=tmp_path)
+    assert links.empty and "sha256" in links
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    with SourceCache(tmp_path, max_bytes=10) as cache:
+        cache.put("http://a", b"aaaaaa")
+        cache.put("http://b", b"bbbbbb")
+        cache.get("http://a")
+    with SourceCache(tmp_path) as cache:
+        assert cache.get("http://a") is not None
+        assert cache.get("http://b") is None
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 1
+
+
+def test_broken_responses_fail_only_their_url(server, tmp_path):
+    paths = ["/truncated/a", "/garbage/b", "/badchunk/c", "/doc/ok"]
+    links = resolve_sources(records(server, paths), cache_dir=tmp_path)
+    errors = links.set_index("source_url")["error"]
+    assert errors[server + "/truncated/a"].startswith("IncompleteReadError")
+    assert errors[server + "/garbage/b"].startswith("SourceError: Malformed status")
+    assert errors[server + "/badchunk/c"].startswith("SourceError: Malformed chunk")
+    assert errors[server + "/doc/ok"] == ""
+    assert open(links.loc[3, "path"], "rb").read() == b"document /doc/ok"
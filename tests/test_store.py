@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backends import get_model
+from src.data import fingerprint
+from src.forecast import forecast_series, series_design
+from src.store import ModelStore
+
+
+def series():
+    dates = pd.date_range("2011-01-01", periods=8, freq="YS")
+    return {
+        ("ETH", f"IND_{i}", "all", "all"): pd.DataFrame(
+            {"date": dates, "value": 10.0 * i + np.arange(8.0) ** 1.5}
+        )
+        for i in range(3)
+    }
+
+
+def test_fingerprints_follow_data_and_config():
+    frame = series()[("ETH", "IND_1", "all", "all")]
+    key = fingerprint(frame, "linear")
+    assert fingerprint(frame.copy(), "linear") == key
+    assert fingerprint(frame, "ridge") != key
+    changed = frame.copy()
+    changed.loc[3, "value"] += 1e-9
+    assert fingerprint(changed, "linear") != key
+
+
+def test_reruns_skip_unchanged_series_and_warm_start_changed_ones(tmp_path):
+    path = tmp_path / "store.sqlite"
+    models = {key: "ridge" for key in series()}
+    with ModelStore(path) as store:
+        first, fitted = forecast_series(series(), models, store=store)
+        assert len(fitted) == 3 and len(store) == 3
+
+    with ModelStore(path) as store:
+        again, fitted = forecast_series(series(), models, store=store)
+    assert fitted == {}
+    pd.testing.assert_frame_equal(again, first)
+
+    changed = series()
+    key = ("ETH", "IND_2", "all", "all")
+    changed[key].loc[7, "value"] += 5.0
+    with ModelStore(path) as store:
+        previous = store.latest(key)
+        _, fitted = forecast_series(changed, models, store=store)
+        assert list(fitted) == [key]
+        # Warm-started: the penalty chosen by the first fit is reused
+        assert fitted[key].state["alpha"] == previous["state"]["alpha"]
+        assert len(store) == 4
+
+
+def test_lru_eviction(tmp_path):
+    with ModelStore(tmp_path / "store.sqlite", max_entries=2) as store:
+        for name in ("a", "b"):
+            store.put(name, ("ETH", name), "linear", {"state": name})
+            time.sleep(0.01)
+        assert store.get("a") == {"state": "a"}  # now more recent than b
+        time.sleep(0.01)
+        store.put("c", ("ETH", "c"), "linear", {"state": "c"})
+
+    with ModelStore(tmp_path / "store.sqlite", max_entries=2) as store:
+        assert len(store) == 2
+        assert store.get("b") is None
+        assert store.get("a") is not None and store.get("c") is not None
+        assert store.latest(("ETH", "c")) == {"state": "c"}
+
+
+def test_batched_fits_store_their_state(tmp_path):
+    data = series()
+    models = {key: model for key, model in zip(data, ("naive", "linear", "huber"))}
+    with ModelStore(tmp_path / "store.sqlite") as store:
+        forecast_series(data, models, store=store)
+        for key, model in models.items():
+            frame = data[key]
+            single = get_model(model).fit(series_design(frame["date"]), frame["value"])
+            state = store.latest(key)["state"]
+            assert state.keys() == single.state.keys()
+            for name, value in single.state.items():
+                np.testing.assert_allclose(state[name], value, rtol=1e-6)
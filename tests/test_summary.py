@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from src.data import load_data
+from src.scenarios import impact_links
+from src.summary import USAGE_KEY, build_summary, lookup, update_summary, with_usage
+
+
+def test_update_matches_full_build():
+    raw = load_data()
+    observations = raw.index[raw["record_type"] == "observation"]
+    # The last observations arrive later, one of them on an existing date
+    new = raw.loc[observations[-6:]]
+    extra = new.iloc[[0]].assign(record_id="OPS_1", value_numeric=1.0)
+    full = pd.concat([raw, extra], ignore_index=True)
+
+    old = build_summary(raw.drop(observations[-6:]))
+    updated = update_summary(
+        old, pd.concat([new, extra], ignore_index=True), impact_links(full)
+    )
+    assert_frame_equal(updated, build_summary(full))
+
+
+def test_statistics():
+    rows = [
+        ("2020-01-01", 100.0, "high"),
+        ("2022-01-01", 121.0, "low"),
+        ("2021-01-01", 90.0, None),
+    ]
+    raw = pd.DataFrame(
+        {
+            "record_id": [f"R{i}" for i in range(3)],
+            "record_type": "observation",
+            "country": "ETH",
+            "indicator_code": "ACC_X",
+            "gender": np.nan,
+            "location": np.nan,
+            "observation_date": pd.to_datetime([r[0] for r in rows]),
+            "value_numeric": [r[1] for r in rows],
+            "confidence": [r[2] for r in rows],
+        }
+    )
+    events = pd.DataFrame(
+        {
+            "record_id": ["EVT_1", "EVT_2", "LNK_1", "LNK_2"],
+            "record_type": ["event", "event", "impact_link", "impact_link"],
+            "country": "ETH",
+            "indicator_code": ["EVT_LATE", "EVT_EARLY", "ACC_X", "ACC_X"],
+            "indicator": ["Late launch", "Early launch", None, None],
+            "observation_date": pd.to_datetime(["2021-06-01", "2019-01-01"] * 2),
+            "parent_id": [None, None, "EVT_1", "EVT_2"],
+        }
+    )
+    raw = pd.concat([raw, events], ignore_index=True).reindex(
+        columns=load_data().columns
+    )
+    row = lookup(build_summary(raw))[("ETH", "ACC_X", "all", "all")]
+    assert row["n_obs"] == 3
+    assert (row["first_value"], row["last_value"]) == (100.0, 121.0)
+    assert (row["value_min"], row["value_max"]) == (90.0, 121.0)
+    assert abs(row["cagr"] - 0.1) < 1e-3
+    assert (row["n_high"], row["n_low"], row["n_unrated"]) == (1, 1, 1)
+    assert row["latest_event_code"] == "EVT_LATE"
+    assert row["latest_event_date"] == pd.Timestamp("2021-06-01")
+
+
+def test_usage_score_row_for_the_kpis():
+    summary = build_summary(load_data())
+    forecast = pd.DataFrame(
+        {
+            "date": pd.date_range("2020-01-01", periods=4, freq="YS"),
+            "value": [5.0, 9.0, 7.0, 8.0],
+            "Forecast": [5.5, 8.0, 7.5, 8.5],
+        }
+    )
+    indexed = with_usage(summary, forecast)
+    row = lookup(indexed)[USAGE_KEY]
+    assert (row["last_value"], row["value_max"], row["last_forecast"]) == (
+        8.0,
+        9.0,
+        8.5,
+    )
+    assert len(indexed) == len(summary) + 1
+
+    # A new run replaces the row instead of adding one
+    again = with_usage(indexed, forecast.assign(Forecast=1.0))
+    assert len(again) == len(indexed)
+    assert lookup(again)[USAGE_KEY]["last_forecast"] == 1.0